@@ -0,0 +1,58 @@
+" Records the lines changed in a taskmage buffer between saves,
+" so that only the changed lines need to be re-lexed on save.
+"
+" ex:   b:taskmage_changes = [[lnum, end, added], ...]
+"       (see ``:help listener_add()`` )
+
+
+function! taskmage#changes#is_supported()
+    """ Check if vim can report changed lines.
+    " Returns:
+    "   int: 0(false), 1(true)
+    """
+    return exists('*listener_add')
+endfunction
+
+
+function! taskmage#changes#listen()
+    """ Starts recording changes to the current buffer (ignores if already recording).
+    """
+    let b:taskmage_changes = []
+    if !taskmage#changes#is_supported() || exists('b:taskmage_listener_id')
+        return
+    endif
+    let b:taskmage_listener_id = listener_add(function('s:on_change'))
+endfunction
+
+
+function! taskmage#changes#is_listening()
+    """ Check if changes to the current buffer are being recorded.
+    " Returns:
+    "   int: 0(false), 1(true)
+    """
+    return exists('b:taskmage_listener_id')
+endfunction
+
+
+function! taskmage#changes#pop()
+    """ Returns changes to the current buffer since the last pop, and clears them.
+    " Returns:
+    "   list: ``[[lnum, end, added], ...]`` in the order they occurred
+    """
+    if !taskmage#changes#is_listening()
+        return []
+    endif
+    call listener_flush()
+    let l:changes = b:taskmage_changes
+    let b:taskmage_changes = []
+    return l:changes
+endfunction
+
+
+function! s:on_change(bufnr, start, end, added, changes)
+    let l:recorded = getbufvar(a:bufnr, 'taskmage_changes', [])
+    for l:change in a:changes
+        call add(l:recorded, [l:change.lnum, l:change.end, l:change.added])
+    endfor
+    call setbufvar(a:bufnr, 'taskmage_changes', l:recorded)
+endfunction
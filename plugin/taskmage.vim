@@ -51,6 +51,11 @@ endfunc
 " Configuration
 " =============
 
+if !exists('g:taskmage_profile')
+    " if 1, echoes the number of lines changed, and the time spent updating buffers
+    let g:taskmage_profile = 0
+endif
+
 let g:tagbar_type_taskmage = {
         \ 'ctagstype': 'taskmage',
         \ 'ctagsbin': s:scriptroot . '/../bin/taskmage2ctags.py',
@@ -70,8 +75,8 @@ let g:tagbar_type_taskmage = {
 " Commands
 " ========
 
-command TaskMageCreateProject     pyx taskmage2.vim_plugin.create_project()
-command TaskMageArchiveCompleted  pyx taskmage2.vim_plugin.archive_completed_tasks()
+command          TaskMageCreateProject     pyx taskmage2.vim_plugin.create_project()
+command -nargs=? TaskMageArchiveCompleted  pyx taskmage2.vim_plugin.archive_completed_tasks('<args>')
 
 command -nargs=* TaskMageOpenCounterpart   pyx taskmage2.vim_plugin.open_counterpart('<args>')
 command          TaskMageToggle            pyx taskmage2.vim_plugin.open_counterpart('edit')
@@ -79,6 +84,7 @@ command          TaskMageSplit             pyx taskmage2.vim_plugin.open_counter
 command          TaskMageVSplit            pyx taskmage2.vim_plugin.open_counterpart('vsplit')
 command -nargs=1 TaskMageSearch            pyx taskmage2.vim_plugin.search_keyword('<args>')
 command -nargs=* TaskMageLatest            pyx taskmage2.vim_plugin.search_latest('<f-args>')
+command -nargs=* TaskMageDiff              pyx taskmage2.vim_plugin.show_diff('<args>')
 
 
 " ========
@@ -89,4 +95,4 @@ autocmd BufReadCmd          *.mtask  call pyxeval('taskmage2.vim_plugin.handle_o
 autocmd BufNewFile,BufRead  *.mtask  set filetype=taskmage
 autocmd BufWritePre         *.mtask  call TaskMageSaveStart()
 autocmd BufWritePost        *.mtask  call TaskMageSaveEnd()
-
+autocmd BufWipeout          *.mtask  exec 'pyx taskmage2.vim_plugin.handle_wipeout_mtask(' . expand('<abuf>') . ')'
@@ -1,7 +1,10 @@
 import uuid
 import sys
+import hashlib
 
 from taskmage2.asttree import nodedata
+from taskmage2.utils import timezone
+from taskmage2.vendor import six
 if sys.version_info[0] < 3:  # pragma: no cover
     from taskmage2.vendor import enum
 else: # pragma: no cover
@@ -18,6 +21,90 @@ class NodeType(enum.Enum):
     file = 'file'
 
 
+class _ChildList(list):
+    """ The list of a node's children (or of an AST's top-level nodes).
+
+    Each change to any ``_ChildList`` increments :py:attr:`modcount` , so
+    that indexes of the tree (see :py:meth:`taskmage2.asttree.asttree.AbstractSyntaxTree.get` )
+    know when they need to be rebuilt. It also records a change to the
+    node that owns the list (see :py:attr:`Node.version` ).
+    """
+    __slots__ = ('owner',)
+
+    modcount = 0  # number of changes made to any _ChildList
+
+    def __init__(self, items=(), owner=None):
+        list.__init__(self, items)
+        self.owner = owner  # the Node (or AbstractSyntaxTree) these are the children of
+
+    @staticmethod
+    def mark_modified():
+        """ Records a change to the structure of a tree that was made without a ``_ChildList`` method.
+        """
+        _ChildList.modcount += 1
+
+    def _changed(self):
+        _ChildList.modcount += 1
+        if self.owner is not None:
+            self.owner._invalidate()
+
+    def append(self, item):
+        self._changed()
+        list.append(self, item)
+
+    def append_loaded(self, item):
+        """ Appends `item` without recording a change to the owner, for trees that are being loaded
+        (nothing has read their versions or digests yet).
+        """
+        _ChildList.modcount += 1
+        list.append(self, item)
+
+    def extend(self, items):
+        self._changed()
+        list.extend(self, items)
+
+    def insert(self, index, item):
+        self._changed()
+        list.insert(self, index, item)
+
+    def remove(self, item):
+        self._changed()
+        list.remove(self, item)
+
+    def pop(self, *args):
+        self._changed()
+        return list.pop(self, *args)
+
+    def clear(self):
+        self._changed()
+        del self[:]
+
+    def __setitem__(self, index, item):
+        self._changed()
+        list.__setitem__(self, index, item)
+
+    def __delitem__(self, index):
+        self._changed()
+        list.__delitem__(self, index)
+
+    def __iadd__(self, items):
+        self._changed()
+        return list.__iadd__(self, items)
+
+    def __imul__(self, num):
+        self._changed()
+        return list.__imul__(self, num)
+
+    # python2 list slices
+    def __setslice__(self, i, j, items):  # pragma: no cover
+        self._changed()
+        list.__setslice__(self, i, j, items)
+
+    def __delslice__(self, i, j):  # pragma: no cover
+        self._changed()
+        list.__delslice__(self, i, j)
+
+
 class Node(object):
     """
     A single node in an Abstract-Syntax-Tree. Nodes are nested to create a view
@@ -41,6 +128,13 @@ class Node(object):
 
     """
 
+    __slots__ = (
+        '_name', 'parent', '_children', '__id', '_type', '_data',
+        '_digests', '_final', '_changed', '_version', '_version_stale', '_dirty',
+    )
+
+    last_version = 0  # the last version given to any change, see version
+
     # maps nodetype enum-values to their `data` class
     # (ex: task `data` class has status, created, ...)
     _data_map = (
@@ -49,6 +143,11 @@ class Node(object):
         (NodeType.file,     nodedata.FileData),
     )
 
+    # lookup tables, so they are not rebuilt for each node
+    _data_classes = dict(_data_map)  # {NodeType.task: nodedata.TaskData, ...}
+    # {'task': NodeType.task, NodeType.task: NodeType.task, ...}
+    _ntypes = dict([(t.value, t) for t in NodeType] + [(t, t) for t in NodeType])
+
     def __init__(self, _id, ntype, name, data=None, children=None, parent=None):
         """ Constructor.
 
@@ -68,7 +167,7 @@ class Node(object):
             name (str): ``(ex: 'clean dishes' )``
                 the name of the task, file, section etc.
 
-            data (dict, optional):
+            data (dict, nodedata._NodeData, optional):
                 metadata associated with the node. format varies by nodetype.
 
             children (list, optional):
@@ -85,15 +184,31 @@ class Node(object):
         if data is None:
             data = {}
 
-        ntype = NodeType(ntype)
-        data_map = dict(self._data_map)
+        ntype = self._ntypes.get(ntype) or NodeType(ntype)
+        data_cls = self._data_classes[ntype]
 
-        self.name = name
+        self._digests = None  # (outline, digest) see _get_digests()
+        self._final = False   # True if finalize() has nothing to change
+        self._changed = Node._next_version()  # version of the last change to this node's own fields
+        self._version = self._changed  # see version
+        self._version_stale = True     # True if `_version` must be computed again
+        self._dirty = False            # see dirty
+        self._name = name
         self.parent = parent
-        self.children = children  # list of nodes
+        self._children = _ChildList(children, self)  # list of nodes
+        for child in self._children:
+            child.parent = self
+            if child._dirty:
+                self._dirty = True
+        _ChildList.modcount += 1
         self.__id = _id
         self._type = ntype
-        self._data = data_map[ntype](**data)
+        if isinstance(data, nodedata._NodeData):
+            if not isinstance(data, data_cls):
+                raise TypeError('Expected `data` to be of type: "{}"'.format(data_cls))
+            self._data = data
+        else:
+            self._data = data_cls(**data)
 
     def __repr__(self):
         # get parentid
@@ -110,9 +225,22 @@ class Node(object):
     def __eq__(self, obj):
         """ Tests equality of node, and it's children *ignoring it's parent* .
         """
-        for attr in ('name', 'children', 'id', 'type', 'data'):
-            if getattr(self, attr) != getattr(obj, attr):
+        stack = [iter([(self, obj)])]
+        while stack:
+            pair = next(stack[-1], None)
+            if pair is None:
+                stack.pop()
+                continue
+            (node, other) = pair
+            if node is other:
+                continue
+            for attr in ('name', 'id', 'type', 'data'):
+                if getattr(node, attr) != getattr(other, attr):
+                    return False
+            (children, other_children) = (node.children, other.children)
+            if len(children) != len(other_children):
                 return False
+            stack.append(iter(six.moves.zip(children, other_children)))
         return True
 
     def __ne__(self, obj):
@@ -150,6 +278,37 @@ class Node(object):
     def id(self):
         return self.__id
 
+    @property
+    def name(self):
+        """
+        Returns:
+            str: the name of the task, file, section etc.
+        """
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        if name != self._name:
+            self._name = name
+            self._invalidate()
+
+    @property
+    def children(self):
+        """
+        Returns:
+            list: list of :py:obj:`Node` objects with a child relationship to this node.
+        """
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        children = _ChildList(children, self)
+        for child in children:
+            child.parent = self
+        _ChildList.modcount += 1
+        self._children = children
+        self._invalidate()
+
     @property
     def type(self):
         """
@@ -158,6 +317,66 @@ class Node(object):
         """
         return self._type.value
 
+    @type.setter
+    def type(self, ntype):
+        """
+        Args:
+            ntype (str, NodeType): ``(ex: 'task', 'section', 'file', NodeType.task )``
+        """
+        ntype = self._ntypes.get(ntype) or NodeType(ntype)
+        if ntype is not self._type:
+            self._type = ntype
+            self._invalidate()
+
+    @property
+    def version(self):
+        """ Increases each time this node, or one of it's descendants is changed
+        (through :py:attr:`name` , :py:attr:`type` , :py:attr:`data` , or :py:attr:`children` ).
+        If a node's version has not changed, neither has it's subtree.
+
+        Each change gets a number from a counter shared by all nodes, and the version
+        is the latest change in the subtree. It is computed when read, only visiting the
+        nodes changed since it was last read.
+
+        Returns:
+            int: ``(ex: 3)``
+        """
+        if not self._version_stale:
+            return self._version
+
+        # children first, subtrees whose version is known are skipped
+        for (node, parent, depth, index) in walk([self], 'post', prune=_has_version):
+            if not node._version_stale:
+                continue
+            version = node._changed
+            for child in node._children:
+                if child._version > version:
+                    version = child._version
+            node._version = version
+            node._version_stale = False
+        return self._version
+
+    @staticmethod
+    def _next_version():
+        Node.last_version += 1
+        return Node.last_version
+
+    @property
+    def dirty(self):
+        """ True if this node, or one of it's descendants has changed since it was
+        created, or since :py:meth:`mark_clean` .
+
+        Returns:
+            bool
+        """
+        return self._dirty
+
+    def mark_clean(self):
+        """ Clears :py:attr:`dirty` on this node, and all of it's descendants.
+        """
+        for (node, parent, depth, index) in walk([self], prune=_is_clean):
+            node._dirty = False
+
     @property
     def data(self):
         """
@@ -176,124 +395,543 @@ class Node(object):
                 accepts a dict, or an already instantiated NodeData object.
         """
         if not isinstance(data, type(self._data)):
-            data_map = dict(self._data_map)
-            data_cls = data_map[NodeType(self._type)]
+            data_cls = self._data_classes[self._type]
             raise TypeError(
                 (
                     'Expected `data` to be of type: "{}".\n'
                     'Received: "{}"'
                 ).format(data_cls, type(data))
             )
-        self._data = data
+        if data is not self._data:
+            self._data = data
+            self._invalidate()
+
+    def digest(self):
+        """ Returns a digest of this node, and all of it's children.
+
+        The digest is a SHA-1 of the id, type, name, data, and the digests of
+        the children (in order). If two subtrees have the same digest, they are
+        the same. Digests are cached until the node, or one of it's descendants
+        is changed. Changes are found using each node's :py:attr:`parent` .
+
+        Returns:
+            bytes: a 20 byte SHA-1 digest
+        """
+        return self._get_digests()[1]
+
+    def _get_digests(self):
+        """ Returns digests of this node, computing them if they are not cached.
+
+        Returns:
+            tuple: ``(outline, digest)``
+
+                * outline: only the id, type, name, status, and the outlines of the children.
+                  Matches the info available from a tasklist.
+                * digest: see :py:meth:`digest` . The same as `outline` if no node in the subtree
+                  has a created, finished, or modified date.
+        """
+        if self._digests is not None:
+            return self._digests
+
+        if not self._children:
+            self._digests = _compute_digests(self)
+            return self._digests
+
+        # children first, subtrees with cached digests are skipped
+        for (node, parent, depth, index) in walk([self], 'post', prune=_has_digests):
+            if node._digests is None:
+                node._digests = _compute_digests(node)
+        return self._digests
 
-    def touch(self):
+    def _invalidate(self):
+        """ Records a change to this node. Marks this node, and each of it's parents dirty,
+        marks their versions to be computed again, and discards their cached digests.
+
+        Stops at the first parent that is already invalidated, it's parents were invalidated with it
+        (digests, versions, finalize, and mark_clean are never updated on a parent without it's children).
+        """
+        self._changed = Node._next_version()
+        node = self
+        while True:
+            node._version_stale = True
+            node._dirty = True
+            node._digests = None
+            node._final = False
+            node = node.parent
+            if node is None or _is_invalidated(node):
+                return
+
+    def touch(self, context=None):
         """ Finalizes fields, and sets modified-date on this node,
         and all of it's children.
+
+        Args:
+            context (taskmage2.asttree.nodedata.OperationContext, optional):
+                the operation this is part of. Every node gets it's timestamp.
         """
-        if self.id is None:
-            self.__id = uuid.uuid4().hex.upper()
+        if context is None:
+            context = nodedata.OperationContext()
 
-        # NOTE: NodeData is immutable
-        self.data = self.data.touch()
+        for (node, parent, depth, index) in walk([self]):
+            if node.__id is None:
+                node._assign_id()
 
-        # also update all children
-        for child in self.children:
-            child.touch()
+            # NOTE: NodeData is immutable
+            node.data = node.data.touch(context)
 
-    def finalize(self):
+    def finalize(self, context=None):
         """ Finalizes null-fields where appropriate so node is ready to save.
         Does not change modified-date unless it is not set.
+
+        Subtrees that have not changed since they were last finalized are skipped.
+
+        Args:
+            context (taskmage2.asttree.nodedata.OperationContext, optional):
+                the operation this is part of. Every date that is set gets it's timestamp.
         """
-        if self.id is None:
-            self.__id = uuid.uuid4().hex.upper()
+        if context is None:
+            context = nodedata.OperationContext()
 
-        # NOTE: NodeData is immutable
-        self.data = self.data.finalize()
+        # children first, a node is final once all of it's children are
+        for (node, parent, depth, index) in walk([self], 'post', prune=_is_final):
+            if node._final:
+                continue
 
-        # also update all children
-        for child in self.children:
-            child.finalize()
+            if node.__id is None:
+                node._assign_id()
+
+            # NOTE: NodeData is immutable
+            node.data = node.data.finalize(context)
+            node._final = True
 
-    def update(self, node):
+    def _assign_id(self):
+        self.__id = uuid.uuid4().hex.upper()
+        _ChildList.mark_modified()
+        self._invalidate()
+
+    def update(self, node, index=None, moved=None, context=None):
         """ Merges non-null fields from `node` on top of this one.
         Only changes modified-dates where changes were necessary.
 
+        Each of `node`'s descendants is merged with the node that has the same id
+        wherever it is in `index` , even if it has moved to a different parent.
+
         Args:
             node (taskmage2.asttree.astnode.Node):
                 another ast node to merge on top of this one.
+
+            index (dict, optional):
+                ``{id: (node, parent, depth)}`` of the nodes that `node`'s descendants are merged with.
+                Entries are removed as they are merged. Defaults to this node's descendants.
+                See :py:func:`build_index` .
+
+            moved (list, optional):
+                ids of the nodes that moved to a different parent are appended to this list.
+
+            context (taskmage2.asttree.nodedata.OperationContext, optional):
+                the operation this is part of. Every date that is changed gets it's timestamp.
+
+        Returns:
+            list: ids of the nodes that moved to a different parent.
         """
         if self.id != node.id:
             raise RuntimeError('cannot update nodes with different ids')
 
+        if moved is None:
+            moved = []
+
+        if context is None:
+            context = nodedata.OperationContext()
+
+        # subtree is unchanged, merging would not change anything
+        if self._is_merged(node):
+            if index is not None:
+                _pop_descendants(self, index)
+            return moved
+
+        if index is None:
+            index = build_index(self.children, self)
+
+        self._update_fields(node, context)
+        _merge_children(self, node.children, index, moved, context)
+        return moved
+
+    def _update_fields(self, node, context):
+        """ Merges the name, type and data of `node` on top of this one (not the children).
+        """
         changed = False
         if self.name != node.name:
             self.name = node.name
             changed = True
 
-        if self._type != NodeType(node.type):
-            self._type = NodeType(node.type)
+        if self.type != node.type:
+            self.type = node.type
             changed = True
 
         # data.update() sets changed if it has changed
-        _data = self.data.update(node.data)
+        _data = self.data.update(node.data, context)
 
         # update modified date
         if changed:
-            _data = _data.touch()
+            _data = _data.touch(context)
 
         self.data = _data
-        self.children = self._update_children(node)
 
-    def _update_children(self, node):
-        # update children now
-        my_children = {}
-        for child in self.children:
-            my_children[child.id] = child
-
-        # handle add/remove and updates
-        children = []
-        for other_child in node.children:
-            if other_child.id in my_children:
-                my_children[other_child.id].update(other_child)
-                children.append(my_children[other_child.id])
-            else:
-                children.append(other_child)
+    def _is_merged(self, node):
+        """ Returns True if merging `node` on top of this node (see :py:meth:`update` ) would not change it.
 
-        return children
+        This is the case if both have the same outline (ids, types, names, statuses and structure),
+        and `node` 's subtree has no dates, or has the same dates as this one.
+        """
+        (outline, full) = self._get_digests()
+        (other_outline, other_full) = node._get_digests()
+        if outline != other_outline:
+            return False
+        return other_full == other_outline or other_full == full
 
     def is_complete(self):
         """ Returns True if self, and all children statuses are in done or skip.
+
+        Sections are complete if they are not empty, and all of their children are complete.
+        Files are never complete.
         """
-        if self.type == 'section':
-            return self._is_section_complete()
-        elif self.type == 'task':
-            return self._is_taskchain_complete()
+        for (node, parent, depth, index) in walk([self]):
+            if node._type is NodeType.task:
+                # task completion is determined by task-status
+                if node.data.status not in ('done', 'skip'):
+                    return False
+            elif node._type is NodeType.section:
+                # empty sections may be left as placeholders.
+                if not node.children:
+                    return False
+            else:
+                return False
+        return True
+
+
+def walk(nodes, order='pre', parent=None, prune=None):
+    """ Iterates over `nodes` , and all of their descendants without recursion.
+
+    Args:
+        nodes (list):
+            list of :py:obj:`Node` objects.
+
+        order (str, optional): ``(ex: 'pre', 'post')``
+            ``pre`` yields each node before it's children, ``post`` yields each node after it's children.
+
+        parent (Node, optional):
+            the parent of `nodes` , if they have one.
+
+        prune (callable, optional):
+            Called with each ``(node, parent, depth, index)`` before it is yielded.
+            If it returns True, the node's children are not visited.
+
+    Yields:
+        tuple: ``(node, parent, depth, index)`` the node, it's parent (None if a top-level node),
+        it's depth (0 for `nodes` ), and it's index within it's parent's children.
+
+        In ``pre`` order, the children of a node are read after it is yielded.
+    """
+    if order == 'pre':
+        return _walk_pre(nodes, parent, prune)
+    elif order == 'post':
+        return _walk_post(nodes, parent, prune)
+    raise ValueError('`order` must be one of (pre, post). received {}'.format(repr(order)))
+
+
+def _walk_pre(nodes, parent, prune):
+    # each frame is ``[parent, children, depth, next-index]``
+    stack = [[parent, tuple(nodes), 0, 0]]
+    while stack:
+        frame = stack[-1]
+        (parent, siblings, depth, index) = frame
+        if index == len(siblings):
+            stack.pop()
+            continue
+        frame[3] = index + 1
+
+        entry = (siblings[index], parent, depth, index)
+        pruned = prune is not None and prune(entry)
+        yield entry
+
+        node = entry[0]
+        children = node.children
+        if children and not pruned:
+            stack.append([node, tuple(children), depth + 1, 0])
+
+
+def _walk_post(nodes, parent, prune):
+    # each frame is ``[parent-entry, children, depth, next-index]``
+    stack = [[(parent, None, -1, None), tuple(nodes), 0, 0]]
+    while stack:
+        frame = stack[-1]
+        (parent_entry, siblings, depth, index) = frame
+        if index == len(siblings):
+            stack.pop()
+            if stack:
+                yield parent_entry
+            continue
+        frame[3] = index + 1
+
+        node = siblings[index]
+        entry = (node, parent_entry[0], depth, index)
+        children = node.children
+        if not children or (prune is not None and prune(entry)):
+            yield entry
+            continue
+        stack.append([entry, tuple(children), depth + 1, 0])
+
+
+def build_index(nodes, parent=None):
+    """ Indexes `nodes` , and all of their descendants by id.
+
+    Args:
+        nodes (list):
+            list of :py:obj:`Node` objects.
+
+        parent (Node, optional):
+            the parent of `nodes` , if they have one.
+
+    Returns:
+
+        .. code-block:: python
+
+            {
+                # id: (node, parent, depth)
+                '6FE476CAD8774F8A874D1B5305867F4F': (Node(...), None, 0),
+                'A910AC72BFF74C7185F3A9DACDE5B50B': (Node(...), Node(...), 1),
+                ...
+            }
+
+    """
+    index = {}
+    depth = 0
+    level = [(parent, nodes)]  # [(parent, children), ...]
+    while level:
+        next_level = []
+        for (parent, nodes) in level:
+            for node in nodes:
+                index[node.id] = (node, parent, depth)
+                if node.children:
+                    next_level.append((node, node.children))
+        level = next_level
+        depth += 1
+    index.pop(None, None)
+    return index
+
+
+def get_completion(nodes):
+    """ Determines if each of `nodes` , and all of their descendants are complete
+    (see :py:meth:`Node.is_complete` ), visiting each node once.
+
+    Args:
+        nodes (list):
+            list of :py:obj:`Node` objects.
+
+    Returns:
+
+        .. code-block:: python
+
+            {
+                # id(node): is_complete
+                140097284573968: True,
+                140097284574224: False,
+                ...
+            }
+
+    """
+    complete = {}
+    for (node, parent, depth, index) in walk(nodes, 'post'):
+        children = node.children
+        if node._type is NodeType.task:
+            is_complete = node.data.status in ('done', 'skip')
+        elif node._type is NodeType.section:
+            # empty sections may be left as placeholders.
+            is_complete = bool(children)
         else:
-            return False
+            is_complete = False
 
-    def _is_taskchain_complete(self):
-        # task completion is determined by task-status
-        if self.data.status not in ('done', 'skip'):
-            return False
+        if is_complete:
+            for child in children:
+                if not complete[id(child)]:
+                    is_complete = False
+                    break
+        complete[id(node)] = is_complete
+    return complete
 
-        if not self.children:
-            return True
 
-        return self._are_children_complete()
+def _pop_descendants(node, index):
+    """ Removes the descendants of `node` from `index` (see :py:meth:`Node.update` ).
+    """
+    stack = [node]
+    while stack:
+        for child in stack.pop().children:
+            index.pop(child.id, None)
+            if child.children:
+                stack.append(child)
 
-    def _is_section_complete(self):
-        # section completion is determined by it's contents.
-        # empty sections may be left as placeholders.
-        if not self.children:
-            return False
 
-        return self._are_children_complete()
+def _date_key(date):
+    """ Returns a hashable key for a TaskData date, for :py:meth:`Node.digest` .
+    Dates that render differently have different keys.
+    """
+    if date is None or date is False:
+        return date
+    if isinstance(date, timezone.LazyDatetime):
+        return date.isoformat()  # not parsed
+    return (date, date.utcoffset())
 
-    def _are_children_complete(self):
-        for child in self.children:
-            if not child.is_complete():
-                return False
+
+def _date_text(date):
+    """ Returns a TaskData date as it is rendered, for :py:meth:`Node.digest` .
+    """
+    if date is None:
+        return None
+    if date is False:
+        return 'false'
+    return date.isoformat()  # LazyDatetime returns it's string, without parsing
+
+
+def _merge_nodes(parent, other_nodes, index, moved, context):
+    """ Merges `other_nodes` with the nodes in `index` that have the same ids.
+
+    Args:
+        parent (Node, None):
+            the node the merged nodes will be children of (None if top-level).
+
+        other_nodes (list):
+            the nodes to merge, in their new order.
+
+        index (dict):
+            ``{id: (node, parent, depth)}`` . See :py:meth:`Node.update` .
+
+        moved (list):
+            ids of nodes whose parent changed are appended to this list.
+
+        context (taskmage2.asttree.nodedata.OperationContext):
+            the operation the merge is part of.
+
+    Returns:
+        list: the merged nodes. Nodes that were not in `index` are used as-is.
+    """
+    nodes = []
+    for other_node in other_nodes:
+        entry = index.pop(other_node.id, None)
+        if entry is None:
+            # a new node, it's children may still be nodes that moved beneath it
+            node = other_node
+            if node.children:
+                _merge_children(node, list(node.children), index, moved, context)
+        else:
+            node = entry[0]
+            node.update(other_node, index, moved, context)
+            if entry[1] is not parent:
+                moved.append(node.id)
+                node.data = node.data.touch(context)
+        node.parent = parent
+        nodes.append(node)
+    return nodes
+
+
+def _merge_children(parent, other_children, index, moved, context):
+    """ Merges `other_children` , and all of their descendants on top of the
+    children of `parent` without recursion (see :py:func:`_merge_nodes` ).
+    """
+    stack = [(parent, iter(other_children), [])]  # [(parent, other_children, merged_children), ...]
+    while stack:
+        (parent, other_children, nodes) = stack[-1]
+        other_node = next(other_children, None)
+        if other_node is None:
+            stack.pop()
+            if _is_changed(parent.children, nodes):
+                parent.children = nodes
+            continue
+
+        entry = index.pop(other_node.id, None)
+        if entry is None:
+            # a new node, it's children may still be nodes that moved beneath it
+            node = other_node
+            if node.children:
+                stack.append((node, iter(list(node.children)), []))
+        else:
+            node = entry[0]
+            if node._is_merged(other_node):
+                _pop_descendants(node, index)
+            else:
+                node._update_fields(other_node, context)
+                stack.append((node, iter(other_node.children), []))
+            if entry[1] is not parent:
+                moved.append(node.id)
+                node.data = node.data.touch(context)
+        node.parent = parent
+        nodes.append(node)
+
+
+def _is_changed(nodes, other_nodes):
+    """ Returns True unless both lists contain the same node objects, in the same order.
+    """
+    if len(nodes) != len(other_nodes):
         return True
+    for (node, other_node) in zip(nodes, other_nodes):
+        if node is not other_node:
+            return True
+    return False
+
+
+def _compute_digests(node):
+    """ Returns the ``(outline, digest)`` of a node whose children all have cached digests.
+    See :py:meth:`Node._get_digests` .
+    """
+    outlines = []
+    fulls = []
+    dated = False
+    for child in node._children:
+        (child_outline, child_full) = child._digests
+        outlines.append(child_outline)
+        fulls.append(child_full)
+        if child_full != child_outline:
+            dated = True
+
+    data = node._data
+    status = None
+    dates = None
+    if node._type is NodeType.task:
+        status = data.status
+        if data.created is not None or data.finished or data.modified is not None:
+            dates = (_date_text(data.created), _date_text(data.finished), _date_text(data.modified))
+
+    outline = _sha1(('outline', node.id, node._type._value_, node._name, status), outlines)
+    if dates is None and not dated:
+        return (outline, outline)
+    else:
+        return (outline, _sha1(('full',) + (dates or (None, None, None)), [outline] + fulls))
+
+
+def _sha1(fields, digests):
+    """ Returns the SHA-1 of a tuple of text fields (or None), followed by other digests.
+    The fields are hashed by their repr, which is different for every different tuple.
+    """
+    return hashlib.sha1(b''.join([repr(fields).encode('utf-8')] + digests)).digest()
+
+
+def _has_digests(entry):
+    return entry[0]._digests is not None
+
+
+def _is_final(entry):
+    return entry[0]._final
+
+
+def _has_version(entry):
+    return not entry[0]._version_stale
+
+
+def _is_clean(entry):
+    return not entry[0]._dirty
+
+
+def _is_invalidated(node):
+    return node._version_stale and node._dirty and node._digests is None and not node._final
 
 
 if __name__ == '__main__':  # pragma: no cover
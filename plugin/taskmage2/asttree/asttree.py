@@ -1,4 +1,4 @@
-from taskmage2.asttree import renderers, astnode
+from taskmage2.asttree import renderers, astnode, nodedata
 from taskmage2.vendor.six.moves import UserList
 
 
@@ -55,9 +55,148 @@ class AbstractSyntaxTree(UserList):
             if not isinstance(node, astnode.Node):
                 raise TypeError('expected `node` to be of type `taskmage2.astnode.Node`')
 
+        self._index = None          # {id: (node, parent, depth)}  see get_index()
+        self._index_modcount = -1   # astnode._ChildList.modcount when index was built
         self.data = data
+        self._dirty = False         # True if the top-level nodes were changed, see is_dirty()
 
-    def render(self, renderer):
+    @property
+    def data(self):
+        """
+        Returns:
+            list: the top-level :py:obj:`taskmage2.asttree.astnode.Node` objects.
+        """
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        astnode._ChildList.mark_modified()
+        self._data = astnode._ChildList(data, self)
+        self._dirty = True
+
+    def is_dirty(self):
+        """ Returns True if any node in the tree was changed, added or removed since
+        the tree was created (or since :py:meth:`mark_clean` ).
+        Only the top-level nodes are checked (see :py:attr:`taskmage2.asttree.astnode.Node.dirty` ).
+
+        Returns:
+            bool
+        """
+        if self._dirty:
+            return True
+        for node in self.data:
+            if node.dirty:
+                return True
+        return False
+
+    def mark_clean(self):
+        """ Clears the changes recorded by :py:meth:`is_dirty` .
+        """
+        for node in self.data:
+            node.mark_clean()
+        self._dirty = False
+
+    def _invalidate(self):
+        # called when the top-level nodes change. see astnode._ChildList
+        self._dirty = True
+
+    def get(self, _id, default=None):
+        """ Returns the node with id `_id` , at any depth in the tree.
+
+        Args:
+            _id (str): ``(ex: '6a027ca647644d70ab05458fdc99378c')``
+                id of the node
+
+            default (object, optional):
+                returned if there is no node with that id
+
+        Returns:
+            taskmage2.asttree.astnode.Node: the node, or `default`
+        """
+        entry = self.get_index().get(_id)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def parent_of(self, _id):
+        """ Returns the parent of the node with id `_id` .
+
+        Raises:
+            KeyError: if there is no node with that id
+
+        Returns:
+            taskmage2.asttree.astnode.Node: the parent node, or None if it is a top-level node.
+        """
+        return self.get_index()[_id][1]
+
+    def path_to(self, _id):
+        """ Returns the nodes leading to the node with id `_id` .
+
+        Raises:
+            KeyError: if there is no node with that id
+
+        Returns:
+            list: ``[toplevel_node, ..., parent_node, node]``
+        """
+        index = self.get_index()
+        (node, parent, depth) = index[_id]
+        path = [node]
+        while parent is not None:
+            (node, parent, depth) = index[parent.id]
+            path.append(node)
+        path.reverse()
+        return path
+
+    def get_index(self):
+        """ Returns an index of every node in the tree by id.
+
+        The index is built when first needed, and rebuilt after the tree is changed
+        (see :py:obj:`taskmage2.asttree.astnode._ChildList` ). Nodes without an id are not indexed.
+
+        Returns:
+
+            .. code-block:: python
+
+                {
+                    # id: (node, parent, depth)
+                    '6FE476CAD8774F8A874D1B5305867F4F': (Node(...), None, 0),
+                    'A910AC72BFF74C7185F3A9DACDE5B50B': (Node(...), Node(...), 1),
+                    ...
+                }
+
+        """
+        if self._index is None or self._index_modcount != astnode._ChildList.modcount:
+            self._index = astnode.build_index(self.data)
+            self._index_modcount = astnode._ChildList.modcount
+        return self._index
+
+    def walk(self, order='pre'):
+        """ Iterates over every node in the tree, without recursion.
+
+        Args:
+            order (str, optional): ``(ex: 'pre', 'post')``
+                ``pre`` yields each node before it's children, ``post`` yields each node after it's children.
+
+        Yields:
+            tuple: ``(node, parent, depth, index)`` the node, it's parent (None if a top-level node),
+            it's depth (0 for top-level nodes), and it's index within it's parent's children.
+
+        Example:
+
+            .. code-block:: python
+
+                >>> for (node, parent, depth, index) in ast.walk():
+                >>>     print('{}{}'.format('  ' * depth, node.name))
+                home
+                  clean kitchen
+                  wash dishes
+
+        See Also:
+            :py:func:`taskmage2.asttree.astnode.walk`
+        """
+        return astnode.walk(self.data, order)
+
+    def render(self, renderer, **kwargs):
         """ Render tree to an output format.
 
         Args:
@@ -66,6 +205,10 @@ class AbstractSyntaxTree(UserList):
                 that will be used to render this parser
                 object.
 
+            **kwargs:
+                passed to the renderer's constructor
+                ``(ex: cache=renderers.RenderCache() )``
+
         Example:
 
             .. code-block:: python
@@ -87,38 +230,61 @@ class AbstractSyntaxTree(UserList):
                 'Must specify output format'
             )
 
-        renderer_instance = renderer(self)
+        renderer_instance = renderer(self, **kwargs)
         return renderer_instance.render()
 
-    def touch(self):
+    def touch(self, context=None):
         """ Update modified times, create ids if necessary, update metadata.
+
+        Args:
+            context (taskmage2.asttree.nodedata.OperationContext, optional):
+                the operation this is part of. Every node gets it's timestamp.
         """
+        if context is None:
+            context = nodedata.OperationContext()
+
         for node in self.data:
-            node.touch()
+            node.touch(context)
 
-    def finalize(self):
+    def finalize(self, context=None):
         """ Finalizes null-fields on nodes where appropriate so node is ready to save.
         Only sets modified-date where it is not present.
+
+        Args:
+            context (taskmage2.asttree.nodedata.OperationContext, optional):
+                the operation this is part of. Every date that is set gets it's timestamp.
         """
+        if context is None:
+            context = nodedata.OperationContext()
+
         for node in self.data:
-            node.finalize()
+            node.finalize(context)
 
-    def update(self, other_ast):
+    def update(self, other_ast, context=None):
         """ Merge changes from another AST on top of this one.
-        """
-        my_nodes = {}
-        for node in self.data:
-            my_nodes[node.id] = node
 
-        new_ast = []
-        for node in other_ast:
-            if node.id in my_nodes:
-                my_nodes[node.id].update(node)
-                new_ast.append(my_nodes[node.id])
-            else:
-                new_ast.append(node)
+        Each node in `other_ast` is merged with the node that has the same id
+        anywhere in this tree, so tasks that were moved keep their data.
+        The result has the structure of `other_ast` .
 
-        self.data = new_ast
+        Args:
+            other_ast (AbstractSyntaxTree):
+                the tree to merge on top of this one.
+
+            context (taskmage2.asttree.nodedata.OperationContext, optional):
+                the operation this is part of (ex: a save). Every date that is changed gets it's timestamp.
+
+        Returns:
+            list: ids of the nodes that moved to a different parent.
+        """
+        if context is None:
+            context = nodedata.OperationContext()
+
+        # copy, merged nodes are removed from the index as they are found
+        index = dict(self.get_index())
+        moved = []
+        self.data = astnode._merge_nodes(None, other_ast, index, moved, context)
+        return moved
 
     def get_completed_taskchains(self):
         """ Returns all top-level nodes whose children statuses are all completed (done, or skip).
@@ -133,16 +299,259 @@ class AbstractSyntaxTree(UserList):
                 completed_taskchains.append(node)
         return completed_taskchains
 
-    def archive_completed(self, archive_ast=None):
+    def archive_completed(self, archive_ast=None, nested=False):
+        """ Moves entirely completed task-chains from this tree to `archive_ast` .
+
+        Args:
+            archive_ast (taskmage2.asttree.asttree.AbstractSyntaxTree, optional):
+                the tree completed nodes are moved to.
+
+            nested (bool, optional):
+                If True, completed task-chains (and sections) within sections/files
+                that are not complete are archived as well. Their sections/files are
+                added to `archive_ast` if they are not already there.
+
+        Returns:
+            taskmage2.asttree.asttree.AbstractSyntaxTree: `archive_ast`
+        """
         if archive_ast is None:
             archive_ast = AbstractSyntaxTree()
 
-        # remove completed from active, add to archive
-        completed_nodes = self.get_completed_taskchains()
-
-        for node in self.data:
-            if node in completed_nodes:
-                self.data.remove(node)
-                archive_ast.append(node)
+        complete = astnode.get_completion(self.data)
+        archive_index = dict([(_id, entry[0]) for (_id, entry) in archive_ast.get_index().items()])
+
+        # pre-order, so nodes are archived in the same order as they are in this tree
+        stack = [(None, self.data, [])]  # [(parent, children, [ancestor, ...]), ...]
+        while stack:
+            (parent, children, ancestors) = stack.pop()
+            active = []
+            containers = []
+            for node in children:
+                if complete[id(node)]:
+                    _archive_node(archive_ast, archive_index, node, ancestors)
+                    continue
+                active.append(node)
+                if nested and node.type != 'task':
+                    containers.append((node, node.children, ancestors + [node]))
+            stack.extend(reversed(containers))
+
+            if len(active) == len(children):
+                continue
+            if parent is None:
+                self.data = active
+            else:
+                parent.children = active
 
         return archive_ast
+
+
+class Changeset(object):
+    """ The differences between two versions of a tree. See :py:func:`diff` .
+
+    Nodes are identified by their ids.
+
+    Example:
+
+        .. code-block:: python
+
+            >>> changeset = diff(old_ast, new_ast)
+            >>> changeset.modified
+            {'6FE476CAD8774F8A874D1B5305867F4F': ['name', 'status']}
+            >>> bool(changeset)
+            True
+    """
+    def __init__(self):
+        self.added = []      # [id, ...]  nodes only in the new tree
+        self.removed = []    # [id, ...]  nodes only in the old tree
+        self.modified = {}   # {id: [field, ...]}  changed fields  (ex: 'name', 'type', 'status', 'created', ...)
+        self.moved = []      # [id, ...]  nodes with a different parent
+        self.reordered = []  # [id, ...]  nodes at a different position among the siblings they kept
+
+    def __repr__(self):
+        return 'Changeset(added={}, removed={}, modified={}, moved={}, reordered={})'.format(
+            len(self.added),
+            len(self.removed),
+            len(self.modified),
+            len(self.moved),
+            len(self.reordered),
+        )
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.modified or self.moved or self.reordered)
+
+    __nonzero__ = __bool__  # python2
+
+    def as_dict(self):
+        """
+        Returns:
+
+            .. code-block:: python
+
+                {
+                    'added': ['6FE476CAD8774F8A874D1B5305867F4F', ...],
+                    'removed': [...],
+                    'modified': {'A910AC72BFF74C7185F3A9DACDE5B50B': ['status', 'finished'], ...},
+                    'moved': [...],
+                    'reordered': [...],
+                }
+
+        """
+        return {
+            'added': list(self.added),
+            'removed': list(self.removed),
+            'modified': dict(self.modified),
+            'moved': list(self.moved),
+            'reordered': list(self.reordered),
+        }
+
+
+def diff(old_ast, new_ast):
+    """ Finds the changes between two versions of a tree, in linear time.
+
+    Fields that are not set in `new_ast` (dates that are None, or an unset finished-date)
+    are not compared, the same as in :py:meth:`taskmage2.asttree.astnode.Node.update` .
+    This lets a tree read from a TaskList buffer (which has no dates) be compared with
+    the tree in it's saved file. Nodes without an id are ignored.
+
+    Args:
+        old_ast (AbstractSyntaxTree):
+            the previous version of the tree (ex: the saved file)
+
+        new_ast (AbstractSyntaxTree):
+            the new version of the tree (ex: the vim buffer)
+
+    Returns:
+        Changeset: the changes from `old_ast` to `new_ast` (ids are listed in the order they appear).
+    """
+    old_index = old_ast.get_index()
+    new_index = new_ast.get_index()
+    changeset = Changeset()
+
+    # ids of the children each parent kept, in order  {parent_id: [id, ...]}
+    kept_children = {}
+    kept = []  # [id, ...]  in the order they appear
+    for (node, parent, depth, index) in new_ast.walk():
+        entry = old_index.get(node.id)
+        if entry is None:
+            if node.id is not None:
+                changeset.added.append(node.id)
+            continue
+
+        fields = _get_changed_fields(entry[0], node)
+        if fields:
+            changeset.modified[node.id] = fields
+
+        parentid = _get_id(parent)
+        if _get_id(entry[1]) != parentid:
+            changeset.moved.append(node.id)
+        else:
+            kept_children.setdefault(parentid, []).append(node.id)
+            kept.append(node.id)
+
+    old_kept_children = {}
+    for (node, parent, depth, index) in old_ast.walk():
+        entry = new_index.get(node.id)
+        if entry is None:
+            if node.id is not None:
+                changeset.removed.append(node.id)
+            continue
+
+        parentid = _get_id(parent)
+        if _get_id(entry[1]) == parentid:
+            old_kept_children.setdefault(parentid, []).append(node.id)
+
+    reordered = set()
+    for (parentid, ids) in kept_children.items():
+        old_ids = old_kept_children.get(parentid, [])
+        for (_id, old_id) in zip(ids, old_ids):
+            if _id != old_id:
+                reordered.add(_id)
+    changeset.reordered = [_id for _id in kept if _id in reordered]
+
+    return changeset
+
+
+def _get_changed_fields(old_node, node):
+    """ Returns the names of the fields that differ between two versions of a node.
+    Data-fields that are not set on `node` are ignored (see :py:func:`diff` ).
+    """
+    fields = []
+    if old_node.name != node.name:
+        fields.append('name')
+
+    if old_node.type != node.type:
+        fields.append('type')
+        return fields
+
+    data = node.data
+    old_data = old_node.data
+    for i in range(len(data._attrs)):
+        value = data[i]
+        if value is None or value is False:
+            continue
+        if value != old_data[i]:
+            fields.append(data._attrs[i])
+    return fields
+
+
+def _get_id(node):
+    if node is None:
+        return None
+    return node.id
+
+
+def _archive_node(archive_ast, archive_index, node, ancestors):
+    """ Adds an archived node to `archive_ast` beneath it's `ancestors` ,
+    adding copies of the ancestors that are not archived yet.
+
+    Args:
+        archive_ast (AbstractSyntaxTree):
+            the tree the node is archived in.
+
+        archive_index (dict):
+            ``{id: node}`` of the nodes in `archive_ast` . Updated with the added nodes.
+
+        node (taskmage2.asttree.astnode.Node):
+            the node to archive.
+
+        ancestors (list):
+            the sections/files `node` was in, starting with the top-level one.
+    """
+    parent = None
+    for ancestor in ancestors:
+        archived = archive_index.get(ancestor.id)
+        if archived is None:
+            archived = astnode.Node(ancestor.id, ancestor.type, ancestor.name, data=ancestor.data, parent=parent)
+            _append_archived(archive_ast, parent, archived)
+            archive_index[archived.id] = archived
+        parent = archived
+
+    archived = archive_index.get(node.id)
+    if archived is None:
+        _append_archived(archive_ast, parent, node)
+        archive_index[node.id] = node
+        return
+
+    # previously archived part of a section, that is now complete.
+    # merged by id at every level, parts of it's sub-sections may be archived too.
+    stack = [(archived, node)]
+    while stack:
+        (archived, node) = stack.pop()
+        children = []
+        for child in node.children:
+            archived_child = archive_index.get(child.id)
+            if archived_child is None:
+                children.append(child)
+                archive_index[child.id] = child
+            else:
+                stack.append((archived_child, child))
+        if children:
+            archived.children = list(archived.children) + children
+
+
+def _append_archived(archive_ast, parent, node):
+    node.parent = parent
+    if parent is None:
+        archive_ast.append(node)
+    else:
+        parent.children.append(node)
@@ -22,10 +22,45 @@
 """
 import datetime
 import collections
+import operator
 
 from taskmage2.utils import timezone
 
 
+class OperationContext(object):
+    """ State shared by every node changed in one operation (ex: one save), so that they all
+    get the same timestamp. The clock is read once, the first time it is needed.
+
+    Example:
+
+        .. code-block:: python
+
+            context = OperationContext()
+            ast.update(other_ast, context=context)
+            ast.finalize(context=context)  # same modified/created/finished dates as the update
+    """
+    __slots__ = ('_utcnow',)
+
+    def __init__(self, utcnow=None):
+        """ Constructor.
+
+        Args:
+            utcnow (datetime.datetime, optional):
+                the timestamp to use. Defaults to the time it is first needed.
+        """
+        self._utcnow = utcnow
+
+    @property
+    def utcnow(self):
+        """
+        Returns:
+            datetime.datetime: the time of the operation, in UTC
+        """
+        if self._utcnow is None:
+            self._utcnow = datetime.datetime.now(timezone.utc)
+        return self._utcnow
+
+
 class _NodeData(tuple):
     """ BaseClass for type-validated namdetuples.
 
@@ -46,7 +81,14 @@ class _NodeData(tuple):
             print(status.created)
             >>> datetime.datetime(...)
 
+    Notes:
+        Subclasses should expose each attribute in :py:attr:`_attrs` as a
+        property that reads it's index directly (see :py:obj:`TaskData` ).
+        ``__getattr__`` is only a fallback, it searches :py:attr:`_attrs` on each access.
+
     """
+    __slots__ = ()
+
     def __new__(cls, data):
         if not isinstance(cls._attrs, tuple):
             raise AttributeError(
@@ -60,6 +102,17 @@ class _NodeData(tuple):
 
         return tuple.__new__(cls, data)
 
+    @classmethod
+    def from_trusted_dict(cls, data):
+        """ Creates an instance from a dictionary that is known to be valid
+        (ex: from a file with a valid stamp), without validating it.
+
+        Args:
+            data (dict):
+                dictionary with every key in :py:attr:`_attrs`
+        """
+        return tuple.__new__(cls, [data[attr] for attr in cls._attrs])
+
     def __repr__(self):
         return '{}({})'.format(
             self.__class__.__name__,
@@ -140,17 +193,21 @@ class _NodeData(tuple):
 
         return type(self)(data)
 
-    def touch(self):
+    def touch(self, context=None):
         """ Assigns default metadata to unassigned, updates modified-time.
+
+        Args:
+            context (OperationContext, optional):
+                the operation this is part of. Dates are set to it's timestamp.
         """
         raise NotImplementedError()  # pragma: no cover
 
-    def finalize(self):
+    def finalize(self, context=None):
         """ Finalizes null-fields on nodes where appropriate so node is ready to save.
         """
         raise NotImplementedError()  # pragma: no cover
 
-    def update(self, data):
+    def update(self, data, context=None):
         """ Creates a new nodedata object, with the merged contents of self, and the provided node-data.
         """
         raise NotImplementedError()  # pragma: no cover
@@ -160,40 +217,42 @@ class FileData(_NodeData):
     """ Immutable Object "data" dict of a file node.
     """
     _attrs = tuple()
+    __slots__ = ()
 
     def __new__(cls):
         return _NodeData.__new__(cls, tuple())
 
-    def touch(self):
+    def touch(self, context=None):
         return FileData()
 
-    def finalize(self):
+    def finalize(self, context=None):
         """ Finalizes null-fields on nodes where appropriate so node is ready to save.
         """
-        return FileData()
+        return self
 
-    def update(self, data):
-        return FileData()
+    def update(self, data, context=None):
+        return self
 
 
 class SectionData(_NodeData):
     """ Immutable Object "data" dict of a section node.
     """
     _attrs = tuple()
+    __slots__ = ()
 
     def __new__(cls):
         return _NodeData.__new__(cls, tuple())
 
-    def touch(self):
+    def touch(self, context=None):
         return SectionData()
 
-    def finalize(self):
+    def finalize(self, context=None):
         """ Finalizes null-fields on nodes where appropriate so node is ready to save.
         """
-        return SectionData()
+        return self
 
-    def update(self, data):
-        return SectionData()
+    def update(self, data, context=None):
+        return self
 
 
 class TaskData(_NodeData):
@@ -218,6 +277,13 @@ class TaskData(_NodeData):
 
     """
     _attrs = ('status', 'created', 'finished', 'modified')
+    __slots__ = ()
+
+    # read by index, in the same order as `_attrs`
+    status = property(operator.itemgetter(0))
+    created = property(operator.itemgetter(1))
+    finished = property(operator.itemgetter(2))
+    modified = property(operator.itemgetter(3))
 
     def __new__(cls, status, created=None, finished=False, modified=None):
         """ Constructor.
@@ -263,7 +329,7 @@ class TaskData(_NodeData):
         if created is None:
             return
 
-        if not isinstance(created, datetime.datetime):
+        if not isinstance(created, (datetime.datetime, timezone.LazyDatetime)):
             message = ('`created` expects a datetime object. '
                        'received {}').format(str(type(created)))
             raise TypeError(message)
@@ -279,7 +345,7 @@ class TaskData(_NodeData):
         if finished is False:
             return
 
-        if not isinstance(finished, datetime.datetime):
+        if not isinstance(finished, (datetime.datetime, timezone.LazyDatetime)):
             message = ('`finished` expects a datetime object. '
                        'received {}').format(str(type(finished)))
             raise TypeError(message)
@@ -295,15 +361,19 @@ class TaskData(_NodeData):
         if modified is None:
             return
 
-        if not isinstance(modified, datetime.datetime):
+        if not isinstance(modified, (datetime.datetime, timezone.LazyDatetime)):
             raise TypeError('modified')
         elif not modified.tzinfo:
             raise TypeError('modified')
 
-    def touch(self):
+    def touch(self, context=None):
         """ Updates fields, updates modified date (even if no changes).
+
+        Args:
+            context (OperationContext, optional):
+                the operation this is part of. Dates are set to it's timestamp.
         """
-        utcnow = datetime.datetime.now(timezone.UTC())
+        utcnow = (context or OperationContext()).utcnow
         new_data = self.as_dict()
         new_data['modified'] = utcnow
         new_data['created'] = self._get_updated_created_status(utcnow)
@@ -311,10 +381,23 @@ class TaskData(_NodeData):
 
         return TaskData(**new_data)
 
-    def finalize(self):
+    def finalize(self, context=None):
         """ Finalizes null-fields on nodes where appropriate so node is ready to save.
+        Returns this object if there is nothing to finalize.
+
+        Args:
+            context (OperationContext, optional):
+                the operation this is part of. Dates are set to it's timestamp.
         """
-        utcnow = datetime.datetime.now(timezone.UTC())
+        # nothing to finalize
+        if all([
+            self.created is not None,
+            self.modified is not None,
+            bool(self.finished) == (self.status in ('done', 'skip')),
+        ]):
+            return self
+
+        utcnow = (context or OperationContext()).utcnow
         new_data = self.as_dict()
         new_data['created'] = self._get_updated_created_status(utcnow)
         new_data['finished'] = self._get_updated_finished_status(utcnow)
@@ -325,7 +408,7 @@ class TaskData(_NodeData):
 
         return TaskData(**new_data)
 
-    def update(self, data):
+    def update(self, data, context=None):
         """ Returns a new taskdata object, with non-null values from `data` assigned to it.
 
         Example:
@@ -336,22 +419,30 @@ class TaskData(_NodeData):
                 data_B = TaskData(status='skip', created=datetime(...))
                 data_merged = data_A.update(data_B)
 
+        Args:
+            data (TaskData):
+                the data to merge on top of this one.
+
+            context (OperationContext, optional):
+                the operation this is part of. Dates are set to it's timestamp.
+
         Returns:
             TaskData:
-                a new taskdata object
+                a new taskdata object (or this object, if there are no changes)
         """
-        utcnow = datetime.datetime.now(timezone.UTC())
-        new_data = self.as_dict()
-
         # if no changes, nothing to do
-        # (not same as equality, ignores None values on `data`)
+        # (not same as equality, ignores None values on `data`.
+        #  an unset finished-date is ignored too, tasklists do not store them)
         if all([
             self.status == data.status,
             (self.created == data.created or data.created is None),
-            (self.finished == data.finished or data.finished is None),
+            (self.finished == data.finished or not data.finished),
             (self.modified == data.modified or data.modified is None),
         ]):
-            return TaskData(**new_data)
+            return self
+
+        utcnow = (context or OperationContext()).utcnow
+        new_data = self.as_dict()
 
         # we know there is some change, so update modified
         new_data['modified'] = utcnow
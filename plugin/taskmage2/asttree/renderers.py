@@ -5,7 +5,7 @@ Created :       Jul 27, 2018
 Author :        Will Pittman
 Contact :       willjpittman@gmail.com
 ________________________________________________________________________________
-Description :   A collection of classes to render a Parser object
+Description :   A collection of classes to render an AST
                 into different formats.
 ________________________________________________________________________________
 """
@@ -14,7 +14,9 @@ from __future__ import absolute_import, division, print_function
 import os
 import abc
 import json
+import collections
 from taskmage2.parser import fmtdata
+from taskmage2.asttree import astnode
 
 
 # external
@@ -23,10 +25,14 @@ from taskmage2.parser import fmtdata
 
 class Renderer(object):  # pragma: no cover
     """ Abstract-Base-class for all renderers. Renders a
-    :py:obj:`taskmage2.parser.parsers.Parser` object into various formats.
+    :py:obj:`taskmage2.asttree.asttree.AbstractSyntaxTree` into various formats.
     """
     __metaclass__ = abc.ABCMeta
 
+    # indexes of lines that :py:meth:`iter_render` yields placeholders for,
+    # until every other line is rendered. See :py:meth:`render_deferred` .
+    deferred_lines = ()
+
     def __init__(self, ast):
         super(Renderer, self).__init__()
         self._ast = ast
@@ -37,9 +43,68 @@ class Renderer(object):  # pragma: no cover
 
     def render(self):
         """ render AST in provided format.
+
+        Returns:
+            list: the rendered lines
+        """
+        lines = list(self.iter_render())
+        for (index, line) in self.render_deferred().items():
+            lines[index] = line
+        return lines
+
+    def iter_render(self):
+        """ Yields the rendered lines one at a time. Lines in :py:attr:`deferred_lines`
+        are placeholders, with the same length as the lines that replace them.
         """
         raise NotImplementedError
 
+    def render_deferred(self):
+        """ Returns the lines that replace the placeholders in :py:attr:`deferred_lines` ,
+        once :py:meth:`iter_render` has finished.
+
+        Returns:
+            dict: ``{index: line}``
+        """
+        return {}
+
+    def write(self, fd, chunksize=65536):
+        """ Writes the render to a file object, a chunk at a time.
+        Lines are separated by newlines (like ``'\\n'.join(self.render())`` ).
+
+        Args:
+            fd (file):
+                a seekable file object, opened for writing text
+
+            chunksize (int, optional):
+                approximate number of characters written at once
+        """
+        chunk = []
+        size = 0
+        offsets = {}  # {index: offset} of deferred lines
+        for (index, line) in enumerate(self.iter_render()):
+            if index:
+                chunk.append('\n')
+            if index in self.deferred_lines:
+                fd.write(''.join(chunk))
+                del chunk[:]
+                size = 0
+                offsets[index] = fd.tell()
+
+            chunk.append(line)
+            size += len(line) + 1
+            if size >= chunksize:
+                fd.write(''.join(chunk))
+                del chunk[:]
+                size = 0
+        fd.write(''.join(chunk))
+
+        if offsets:
+            end = fd.tell()
+            for (index, line) in self.render_deferred().items():
+                fd.seek(offsets[index])
+                fd.write(line)
+            fd.seek(end)
+
 
 class TaskList(Renderer):
     """ `AST` to ReStructuredText inspired TaskList format.
@@ -68,73 +133,46 @@ class TaskList(Renderer):
     def __init__(self, ast):
         super(TaskList, self).__init__(ast)
 
-    def render(self):
+    def iter_render(self):
         """
-        Renders the parser's Abstract-Syntax-Tree.
+        Renders the parser's Abstract-Syntax-Tree, one line at a time.
 
-        Returns:
+        Yields:
 
             .. code-block:: python
 
-                [
-                    '* task1',
-                    '    * subtask1',
-                    '* task2',
-                    ...
-                ]
-
-        """
-        render = []
-
-        for node in self.ast:
-            render = self._render_node(render, node, parent=None, indent=0)
-
-        return render
+                '* task1'
+                '    * subtask1'
+                '* task2'
+                ...
 
-    def _render_node(self, render, node, parent, indent=0):
         """
-        Recursively renders a node, until all children have been descended
-        into.
-
-        Returns:
-            The current render.
-
-            .. code-block:: python
-
-                [
-                    'line1',
-                    'line2',
-                    'line3',
-                    ...
-                ]
+        indents = {}  # {id(node): indent}  of nodes with children
 
-        """
-        # TODO: now that all nodes contain a reference to their
-        #       parent node, this can probably be simplified
         node_renderer_map = {
             'file':    self._render_fileheader,
             'section': self._render_sectionheader,
             'task':    self._render_task,
         }
-        if node.type not in node_renderer_map:
-            raise NotImplementedError(
-                'unexpected nodetype: {}'.format(repr(node))
-            )
-        render.extend(
-            node_renderer_map[node.type](node, parent, indent)
-        )
-
-        for child in node.children:
+        for (node, parent, depth, index) in astnode.walk(self.ast):
+            if node.type not in node_renderer_map:
+                raise NotImplementedError(
+                    'unexpected nodetype: {}'.format(repr(node))
+                )
+
             # indentation is reset at 0 for tasks within sections/files
-            if all([
-                node.type in ('section', 'file'),
-                child.type == 'task',
-            ]):
-                render = self._render_node(render, child, node, indent=0)
+            if parent is None:
+                indent = 0
+            elif parent.type in ('section', 'file') and node.type == 'task':
+                indent = 0
             else:
-                render = self._render_node(render, child, node, indent=indent + 1)
+                indent = indents[id(parent)] + 1
 
-        return render
+            if node.children:
+                indents[id(node)] = indent
+
+            for line in node_renderer_map[node.type](node, parent, indent):
+                yield line
 
     def _render_fileheader(self, node, parent, indent=0):
         """
@@ -257,60 +295,211 @@ class TaskDetails(Renderer):
         raise NotImplementedError()
 
 
+class RenderCache(object):
+    """ The lines of a previous :py:obj:`Mtask` render, so that subtrees that
+    have not changed since are copied instead of being rendered again.
+
+    Subtrees are matched by :py:meth:`taskmage2.asttree.astnode.Node.digest` ,
+    and the parent-id and indent of their first node. If the same tree is rendered
+    again, and none of it's nodes have changed (see :py:attr:`taskmage2.asttree.astnode.Node.version` ),
+    the whole render is reused.
+
+    The line of each node is cached as well, so nodes in changed subtrees whose own fields
+    did not change (ex: the parents of an edited task) are not encoded again.
+    Only the `maxnodes` most recently used node lines are kept.
+
+    Example:
+
+        .. code-block:: python
+
+            cache = RenderCache()
+            ast.render(Mtask, cache=cache)  # renders every node
+            ast.render(Mtask, cache=cache)  # only renders nodes changed since
+    """
+    def __init__(self, maxnodes=50000):
+        """ Constructor.
+
+        Args:
+            maxnodes (int, optional):
+                the maximum number of node lines kept in :py:attr:`nodes` .
+        """
+        self.lines = []   # lines of the last render, each followed by a comma
+        self.ranges = {}  # {(digest, parentid, indent): (start, end)}  slice of `lines` with a subtree
+        self.versions = []  # [(id(node), version), ...]  top-level nodes of the last render
+        self.nodes = collections.OrderedDict()  # {node.id: (key, line)}  least recently used first
+        self.maxnodes = maxnodes
+
+
 class Mtask(Renderer):
     """ `AST` to JSON - stores all info.
     """
-    def __init__(self, ast):
+    def __init__(self, ast, cache=None):
+        """ Constructor.
+
+        Args:
+            ast (taskmage2.asttree.asttree.AbstractSyntaxTree):
+                the tree to render
+
+            cache (RenderCache, optional):
+                lines from the previous render. Updated with this render.
+        """
         super(Mtask, self).__init__(ast)
+        self._cache = cache
 
-    def render(self):
+    # the stamp is rendered once every node has been
+    deferred_lines = (1,)
+
+    def iter_render(self):
         """
-        Renders the parser's Abstract-Syntax-Tree (list of `data.Node` s ) into a JSON string.
+        Renders the parser's Abstract-Syntax-Tree (list of `data.Node` s ) into a JSON string,
+        one line at a time. The stamp (line 1) is a placeholder, see :py:meth:`render_deferred` .
 
-        Returns:
+        Yields:
 
             .. code-block:: python
 
-                [
-                    'line1',
-                    'line2',
-                    'line3',
-                    ...
-                ]
+                'line1'
+                'line2'
+                'line3'
+                ...
 
         """
-        render = []
-        for node in self.ast:
-            render = self._render_node(render, node, indent=0)
-
         # one node per line
-        json_nodes = ['  {},'.format(json.dumps(r)) for r in render]
-        # remove comma from last entry
-        json_nodes[-1] = json_nodes[-1][:-1]  
+        json_nodes = self._iter_node_lines()
+        checksum = fmtdata.MtaskChecksum()
+        prev_line = next(json_nodes, None)
+
+        # stamp first, so the lexer can trust the file without validating it
+        stamp_fmt = '  {}' + (',' if prev_line is not None else '')
+        yield '['
+        yield stamp_fmt.format(json.dumps(fmtdata.Mtask.stamp_from_checksum('0' * 8)))
+
+        if prev_line is not None:
+            for line in json_nodes:
+                checksum.add_line(prev_line)
+                yield prev_line
+                prev_line = line
+
+            # remove comma from last entry
+            prev_line = prev_line[:-1]
+            checksum.add_line(prev_line)
+            yield prev_line
+
+        stamp = fmtdata.Mtask.stamp_from_checksum(checksum.hexdigest())
+        self._stamp_line = stamp_fmt.format(json.dumps(stamp))
+        yield ']'
+        yield ''
+
+    def render_deferred(self):
+        return {1: self._stamp_line}
+
+    def _iter_node_lines(self):
+        """ Yields the JSON line of each node (each with a trailing comma).
+        """
+        if self._cache is None:
+            for (node, parent, depth, index) in astnode.walk(self.ast):
+                yield '  {},'.format(json.dumps(self._render_node(node, depth)))
+            return
+
+        # a node created after the last render has a higher version than any node in it,
+        # even if it reuses the id() of a node that was freed
+        versions = [(id(node), node.version) for node in self.ast]
+        if versions != self._cache.versions:
+            json_nodes = []
+            ranges = {}
+            self._render_nodes(json_nodes, ranges)
+            self._cache.lines = json_nodes
+            self._cache.ranges = ranges
+            self._cache.versions = versions
+
+        for line in self._cache.lines:
+            yield line
+
+    def _render_nodes(self, json_nodes, ranges):
+        """
+        Renders each node as a JSON line. Lines of subtrees that are in the cache are reused.
 
-        render_json = ['[']
-        render_json.extend(json_nodes)
-        render_json.append(']')
-        render_json.append('')
-        return render_json
+        Args:
+            json_nodes (list):
+                rendered lines are appended to this list
 
-    def _render_node(self, render, node, indent=0):
+                .. code-block:: python
+
+                    [
+                        '  {"_id": ..., "type": "file", "name": "todo/misc.mtask", "indent": 0, ...},',
+                        '  {"_id": ..., "type": "task", "name": "wash dishes", "indent": 1, ...},',
+                        ...
+                    ]
+
+            ranges (dict):
+                ``{(digest, parentid, indent): (start, end)}`` the subtrees
+                rendered in `json_nodes` are added to this dict.
+        """
+        cached_ranges = self._cache.ranges
+
+        def is_cached(entry):
+            return (entry[0].digest(), entry[0].parentid, entry[2]) in cached_ranges
+
+        # subtrees whose end is not rendered yet
+        open_subtrees = []  # [(key, start, depth), ...]
+        for (node, parent, depth, index) in astnode.walk(self.ast, prune=is_cached):
+            while open_subtrees and open_subtrees[-1][2] >= depth:
+                (key, start, _) = open_subtrees.pop()
+                ranges[key] = (start, len(json_nodes))
+
+            key = (node.digest(), node.parentid, depth)
+            if key in cached_ranges:
+                self._copy_subtree(json_nodes, ranges, node, depth, cached_ranges[key])
+            else:
+                open_subtrees.append((key, len(json_nodes), depth))
+                json_nodes.append(self._render_cached_line(node, depth))
+
+        for (key, start, _) in open_subtrees:
+            ranges[key] = (start, len(json_nodes))
+
+    def _render_cached_line(self, node, indent):
+        """ Returns the line of a single node (followed by a comma), reusing the line
+        from the cache if the node's fields, parent and indent have not changed.
         """
-        Recursively renders a node, until all children have been descended
-        into.
+        if node.id is None:
+            return '  {},'.format(json.dumps(self._render_node(node, indent)))
+
+        nodes = self._cache.nodes
+        key = _line_key(node, indent)
+        entry = nodes.pop(node.id, None)
+        if entry is not None and entry[0] == key:
+            line = entry[1]
+        else:
+            line = '  {},'.format(json.dumps(self._render_node(node, indent)))
+            while len(nodes) >= self._cache.maxnodes:
+                nodes.popitem(last=False)
+        nodes[node.id] = (key, line)
+        return line
+
+    def _copy_subtree(self, json_nodes, ranges, node, indent, cached):
+        """ Copies the lines of an unchanged subtree from the cache, and the ranges
+        of it's descendants so they can be reused separately in the next render.
+        """
+        (start, end) = cached
+        offset = len(json_nodes) - start
+        json_nodes.extend(self._cache.lines[start:end])
+        ranges[(node.digest(), node.parentid, indent)] = (start + offset, end + offset)
+
+        for (child, parent, depth, index) in astnode.walk(node.children, parent=node):
+            key = (child.digest(), child.parentid, indent + depth + 1)
+            cached = self._cache.ranges.get(key)
+            if cached is not None:
+                ranges[key] = (cached[0] + offset, cached[1] + offset)
+
+    def _render_node(self, node, indent=0):
+        """
+        Renders a single node (without it's children).
 
         Returns:
-            The current render.
 
             .. code-block:: python
 
-                [
-                    {'_id':..., 'type':'file',    'name':'todo/misc.mtask', 'indent':0, 'parent':None, 'data':{}},
-                    {'_id':..., 'type':'section', 'name':'kitchen',         'indent':0, 'parent':...,  'data':{}},
-                    {'_id':..., 'type':'task',    'name':'wash dishes',     'indent':0, 'parent':...,  'data':{...}},
-                    {'_id':..., 'type':'task',    'name':'grocery list',    'indent':0, 'parent':...,  'data':{...}},
-                    ...
-                ]
+                {'_id':..., 'type':'task', 'name':'wash dishes', 'indent':0, 'parent':..., 'data':{...}}
 
         """
         node_renderer_map = {
@@ -323,12 +512,7 @@ class Mtask(Renderer):
             raise NotImplementedError(msg)
 
         perform_render = node_renderer_map[node.type]
-        render.append(perform_render(render, node, indent))
-
-        for child in node.children:
-            render = self._render_node(render, child, indent=indent + 1)
-
-        return render
+        return perform_render(None, node, indent)
 
     def _render_fileheader(self, render, node, indent=0):
         """
@@ -387,8 +571,21 @@ class Mtask(Renderer):
         }
 
 
+def _line_key(node, indent):
+    """ Returns a key for everything that determines a node's Mtask line.
+    Nodes with the same key render the same line.
+    """
+    status = None
+    dates = None
+    if node.type == 'task':
+        data = node.data
+        status = data.status
+        dates = (astnode._date_key(data.created), astnode._date_key(data.finished), astnode._date_key(data.modified))
+    return (node.type, node.name, node.parentid, indent, status, dates)
+
+
 if __name__ == '__main__':  # pragma: no cover
-    from taskmage2.parser import lexers, iostream, parser
+    from taskmage2.parser import lexers, iostream, parsers
 
     dirname = os.path.dirname(os.path.abspath(__file__))
     for i in range(3):
@@ -401,9 +598,8 @@ if __name__ == '__main__':  # pragma: no cover
         print()
 
         with open('{}/examples/example.tasklist'.format(dirname), 'rb') as fd:
-            lexer = lexers.TaskList(iostream.FileDescriptor(fd))
-            parser_ = parser.Parser(lexer)
-            renderer = TaskList(parser_)
+            ast = parsers.parse(iostream.FileDescriptor(fd), lexers.LexerTypes.tasklist)
+            renderer = TaskList(ast)
             for line in renderer.render():
                 print(line)
 
@@ -414,9 +610,8 @@ if __name__ == '__main__':  # pragma: no cover
         print()
 
         with open('{}/examples/example.mtask_'.format(dirname), 'rb') as fd:
-            lexer = lexers.Mtask(fd)
-            parser_ = parser.Parser(lexer)
-            renderer = Mtask(parser_)
+            ast = parsers.parse(fd, lexers.LexerTypes.mtask)
+            renderer = Mtask(ast)
             for line in renderer.render():
                 print(line)
 
@@ -1,3 +1,4 @@
+import zlib
 
 
 class TaskList(object):
@@ -45,3 +46,121 @@ class TaskList(object):
 
         """
         return cls.statuses[char]
+
+
+class Mtask(object):
+    """ Stores methods for the stamp that :py:obj:`taskmage2.asttree.renderers.Mtask`
+    writes as the first entry of a file.
+
+    The stamp holds a checksum of the lines that follow it. If it matches,
+    the file is exactly as taskmage wrote it, and does not need to be validated.
+
+    .. code-block:: json
+
+        [
+          {"type": "stamp", "version": 1, "checksum": "5f3a9c01"},
+          {"_id": "...", "type": "task", ...},
+          ...
+        ]
+
+    """
+    stamp_type = 'stamp'
+    stamp_version = 1
+
+    @classmethod
+    def stamp(cls, lines):
+        """ Returns the stamp for the JSON lines of a rendered file.
+
+        Args:
+            lines (list):
+                the lines that follow the stamp (excluding the closing ``]`` ).
+
+        Returns:
+
+            .. code-block:: python
+
+                {'type': 'stamp', 'version': 1, 'checksum': '5f3a9c01'}
+
+        """
+        text = ''.join(['{}\n'.format(line) for line in lines])
+        return cls.stamp_from_checksum(cls.checksum(text))
+
+    @classmethod
+    def stamp_from_checksum(cls, checksum):
+        """ Returns the stamp for a checksum of the lines that follow it
+        (see :py:meth:`checksum` , :py:obj:`MtaskChecksum` ).
+
+        Returns:
+
+            .. code-block:: python
+
+                {'type': 'stamp', 'version': 1, 'checksum': '5f3a9c01'}
+
+        """
+        return {'type': cls.stamp_type, 'version': cls.stamp_version, 'checksum': checksum}
+
+    @classmethod
+    def is_stamp(cls, entry):
+        """ Returns True if a decoded JSON entry is a stamp.
+        """
+        return isinstance(entry, dict) and entry.get('type') == cls.stamp_type
+
+    @classmethod
+    def is_valid_stamp(cls, entry, text):
+        """ Returns True if a stamp was written by this version of taskmage,
+        and matches the text that followed it.
+
+        Args:
+            entry (dict):
+                the decoded stamp
+
+            text (str, bytes):
+                the file contents after the stamp's line, up to the closing ``]`` line.
+        """
+        return entry.get('version') == cls.stamp_version and entry.get('checksum') == cls.checksum(text)
+
+    @staticmethod
+    def checksum(text):
+        """ Returns the checksum of the text (or utf-8 bytes) that follows a stamp.
+
+        Returns:
+
+            .. code-block:: python
+
+                '5f3a9c01'
+
+        """
+        if not isinstance(text, bytes):
+            text = text.encode('utf-8')
+        return '{:08x}'.format(zlib.crc32(text) & 0xffffffff)
+
+
+class MtaskChecksum(object):
+    """ Computes :py:meth:`Mtask.checksum` one line at a time, so the lines
+    that follow a stamp do not need to be kept in memory.
+
+    Example:
+
+        .. code-block:: python
+
+            checksum = MtaskChecksum()
+            for line in lines:
+                checksum.add_line(line)
+            stamp = Mtask.stamp_from_checksum(checksum.hexdigest())  # same as Mtask.stamp(lines)
+    """
+    __slots__ = ('_crc',)
+
+    def __init__(self):
+        self._crc = 0
+
+    def add_line(self, line):
+        """ Adds a line (without it's newline) to the checksum.
+        """
+        self._crc = zlib.crc32((line + '\n').encode('utf-8'), self._crc)
+
+    def hexdigest(self):
+        """
+        Returns:
+            str: ``(ex: '5f3a9c01')``
+        """
+        return '{:08x}'.format(self._crc & 0xffffffff)
@@ -13,6 +13,9 @@ ________________________________________________________________________________
 from __future__ import absolute_import, division, print_function
 from collections import namedtuple
 import abc
+import bisect
+import mmap
+import os
 # external
 # internal
 from taskmage2.vendor import six
@@ -306,15 +309,107 @@ class FileDescriptor(IOStream):
         Args:
             offset (int): the number of characters to offset the position by.
         """
-        self.next(offset - 1)
+        # every read seeks first, so only the position needs to change
+        self.pos += offset
 
     def eof(self):
         return self.peek() is None
 
 
-class VimBuffer(FileDescriptor):
-    """ Improvement on VimBuffer, reads contents into a StringIO object, and wraps it
-    in a :py;obj:`taskmage2.parser.iostream.FileDescriptor` for massive speed gains.
+class TextBuffer(IOStream):
+    """ Decodes text once, and indexes the position of every newline so that
+    characters and lines can be read by slicing, rather than seeking
+    one character at a time.
+
+    Notes:
+        Offsets are measured in characters of the decoded text, so multibyte
+        characters occupy a single position (unlike seeking within a file
+        opened in text-mode).
+
+    Example:
+
+        .. code-block:: python
+
+            with open('/path/todo.mtask', 'rb') as fd:
+                textbuf = TextBuffer(fd.read())
+
+    """
+
+    def __init__(self, text=None, encoding='utf-8'):
+        """ Constructor.
+
+        Args:
+            text (str, bytes, optional):
+                The entire contents of the stream. bytes are decoded using `encoding` .
+
+            encoding (str, optional):
+                The encoding used to decode `text` if it is bytes.
+        """
+        super(TextBuffer, self).__init__()
+        if text is None:
+            text = ''
+        if isinstance(text, six.binary_type):
+            text = text.decode(encoding)
+
+        self._text = text
+        self._newlines = self._index_newlines(text)
+        self.pos = -1
+
+    @staticmethod
+    def _index_newlines(text):
+        """ Returns a sorted list of the position of every newline character in `text` .
+        """
+        newlines = []
+        index = text.find('\n')
+        while index >= 0:
+            newlines.append(index)
+            index = text.find('\n', index + 1)
+        return newlines
+
+    def next(self, offset=0):
+        ch = self.peek(offset)
+        self.pos += offset + 1
+        return ch
+
+    def peek(self, offset=0):
+        index = self.pos + offset + 1
+        if 0 <= index < len(self._text):
+            return self._text[index]
+        return None
+
+    def peek_line(self, offset=0):
+        start = self.pos + offset + 1
+        if not 0 <= start < len(self._text):
+            return None
+
+        # first newline at, or after `start`
+        lineindex = bisect.bisect_left(self._newlines, start)
+        if lineindex < len(self._newlines):
+            return self._text[start:self._newlines[lineindex]]
+        return self._text[start:]
+
+    def offset(self, offset):
+        """
+        Move the current position by an offset.
+
+        Args:
+            offset (int): the number of characters to offset the position by.
+        """
+        self.pos += offset
+
+    def eof(self):
+        return self.peek() is None
+
+    def read(self):
+        contents = self._text[max(self.pos + 1, 0):]
+        if contents and not contents.endswith('\n'):
+            contents += '\n'
+        return contents
+
+
+class VimBuffer(TextBuffer):
+    """ Improvement on PureVimBuffer, joins the buffer's lines into a single string
+    wrapped by a :py:obj:`taskmage2.parser.iostream.TextBuffer` for massive speed gains.
 
     Notes:
         using PureVimBuffer, save operations on files with only 5 tasks were taking about 23s.
@@ -327,11 +422,276 @@ class VimBuffer(FileDescriptor):
             buf (vim.api.buffer.Buffer):
                 A vim buffer. For example: ``vim.current.buffer`` .
         """
-
-        stringio_buf = buf
+        text = None
         if buf is not None:
-            stringio_buf = six.moves.StringIO()
-            stringio_buf.write('\n'.join(buf[:]) + '\n')
-            stringio_buf.seek(0)
+            text = '\n'.join(buf[:]) + '\n'
+
+        super(VimBuffer, self).__init__(text)
+
+
+class _LineIndexedStream(IOStream):
+    """ Base for streams that are read one line at a time from a source, rather than
+    from a single string. A cumulative table of line-start offsets maps an absolute
+    offset to a (line, col) using bisect.
+
+    Notes:
+        The line-start table is extended lazily, only as far as the cursor has read.
+        The most recently fetched line is cached, since most reads land on the same line.
+
+        Subclasses implement :py:meth:`_fetch_line` .
+    """
+
+    def __init__(self):
+        super(_LineIndexedStream, self).__init__()
+        self._linestarts = [0]  # offset of first char of each indexed line, and the line after it
+        self._cached_line = (-1, '', -2)  # (lineno, text, linestart)
+        self.pos = -1
+
+    def _fetch_line(self, lineno):
+        """ Returns the text of line number `lineno` (without newline),
+        or None if `lineno` is beyond the last line.
+        """
+        raise NotImplementedError()  # pragma: no cover
 
-        super(VimBuffer, self).__init__(stringio_buf)
+    def _line(self, lineno):
+        """ Returns the text of line number `lineno` (without newline),
+        or None if `lineno` is beyond the last line.
+        """
+        if self._cached_line[0] != lineno:
+            line = self._fetch_line(lineno)
+            if line is None:
+                return None
+            self._cached_line = (lineno, line, self._linestarts[lineno])
+        return self._cached_line[1]
+
+    def _locate(self, index):
+        """ Finds the line containing absolute offset `index` .
+
+        Returns:
+
+            .. code-block:: python
+
+                (2, 5)  # (lineno, col)
+                None    # if index is at, or beyond the end-of-file
+
+        """
+        if index < 0:
+            return None
+
+        # most reads fall on the line that was last read
+        (lineno, line, linestart) = self._cached_line
+        if linestart <= index <= linestart + len(line):
+            return (lineno, index - linestart)
+
+        linestarts = self._linestarts
+        while linestarts[-1] <= index:
+            line = self._line(len(linestarts) - 1)
+            if line is None:
+                return None
+            linestarts.append(linestarts[-1] + len(line) + 1)
+
+        lineno = bisect.bisect_right(linestarts, index) - 1
+        return (lineno, index - linestarts[lineno])
+
+    def next(self, offset=0):
+        ch = self.peek(offset)
+        self.pos += offset + 1
+        return ch
+
+    def peek(self, offset=0):
+        index = self.pos + offset + 1
+
+        # inlined fast-path of `_locate()` , peek is called for every character
+        (_, line, linestart) = self._cached_line
+        col = index - linestart
+        if 0 <= col < len(line):
+            return line[col]
+
+        location = self._locate(index)
+        if location is None:
+            return None
+
+        (lineno, col) = location
+        line = self._line(lineno)
+        if col < len(line):
+            return line[col]
+        return '\n'
+
+    def peek_line(self, offset=0):
+        location = self._locate(self.pos + offset + 1)
+        if location is None:
+            return None
+
+        (lineno, col) = location
+        return self._line(lineno)[col:]
+
+    def offset(self, offset):
+        """
+        Move the current position by an offset.
+
+        Args:
+            offset (int): the number of characters to offset the position by.
+        """
+        self.pos += offset
+
+    def eof(self):
+        return self.peek() is None
+
+    def read(self):
+        location = self._locate(max(self.pos + 1, 0))
+        if location is None:
+            return ''
+
+        (lineno, col) = location
+        lines = [self._line(lineno)[col:]]
+        while True:
+            lineno += 1
+            line = self._fetch_line(lineno)
+            if line is None:
+                break
+            lines.append(line)
+        return '\n'.join(lines) + '\n'
+
+
+class IndexedVimBuffer(_LineIndexedStream):
+    """ Reads a vim buffer in place, without copying it into a string.
+    Absolute offsets are resolved to a (line, col) using a table of line-start offsets,
+    and whole lines are returned directly from the buffer.
+
+    Notes:
+        Indexing a vim buffer creates a new python string each time,
+        so the most recently fetched line is cached.
+
+    Example:
+
+        .. code-block:: python
+
+            fd = IndexedVimBuffer(vim.current.buffer)
+            ast = parsers.parse(fd, 'tasklist')
+
+    """
+
+    def __init__(self, buf=None, start=0):
+        """ Constructor.
+
+        Args:
+            buf (vim.api.buffer.Buffer, list):
+                A vim buffer (ex: ``vim.current.buffer`` ), or a list of lines
+                without newline characters.
+
+            start (int, optional):
+                index of the line in `buf` the stream begins at.
+                (lines before it are not part of the stream).
+        """
+        super(IndexedVimBuffer, self).__init__()
+        if buf is None:
+            buf = []
+        elif len(buf) == 0:
+            # match VimBuffer, which always terminates the last line
+            buf = ['']
+
+        self._buf = buf
+        self._start = start
+        self._numlines = max(len(buf) - start, 0)
+
+    def _fetch_line(self, lineno):
+        if lineno < self._numlines:
+            return self._buf[self._start + lineno]
+        return None
+
+    def read(self):
+        location = self._locate(max(self.pos + 1, 0))
+        if location is None:
+            return ''
+
+        (lineno, col) = location
+        lines = [self._line(lineno)[col:]]
+        lines.extend(self._buf[self._start + lineno + 1:self._start + self._numlines])
+        return '\n'.join(lines) + '\n'
+
+
+class MmapStream(_LineIndexedStream):
+    """ Memory-maps a file read-only, and decodes it one line at a time as it is read.
+    Large files can be scanned without first loading them into a python string.
+
+    Notes:
+        Offsets are measured in characters of the decoded text (like :py:obj:`TextBuffer` ).
+        Byte offsets of each line are discovered lazily, as the cursor advances.
+
+    Example:
+
+        .. code-block:: python
+
+            with MmapStream('/path/todo.mtask') as fd:
+                ast = parsers.parse(fd, 'mtask')
+
+    """
+
+    def __init__(self, filepath, encoding='utf-8'):
+        """ Constructor.
+
+        Args:
+            filepath (str):
+                path to the file to read.
+
+            encoding (str, optional):
+                The encoding used to decode each line.
+        """
+        super(MmapStream, self).__init__()
+        self._encoding = encoding
+        self._byte_linestarts = [0]  # byte offset of the first char of each discovered line, and the line after it
+
+        self._fd = open(filepath, 'rb')
+        self._size = os.fstat(self._fd.fileno()).st_size
+        self._mmap = None
+        if self._size:  # empty files cannot be mapped
+            self._mmap = mmap.mmap(self._fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """ Unmaps and closes the file.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._fd.close()
+
+    def _fetch_byte_range(self, lineno):
+        """ Returns the (start, end) byte offsets of line number `lineno` (excluding newline),
+        or None if `lineno` is beyond the last line.
+        """
+        starts = self._byte_linestarts
+        while len(starts) <= lineno + 1:
+            start = starts[-1]
+            if start >= self._size:
+                return None
+            end = self._mmap.find(b'\n', start)
+            if end < 0:
+                end = self._size
+            starts.append(end + 1)
+        return (starts[lineno], starts[lineno + 1] - 1)
+
+    def _fetch_line(self, lineno):
+        byte_range = self._fetch_byte_range(lineno)
+        if byte_range is None:
+            return None
+        return self._mmap[byte_range[0]:byte_range[1]].decode(self._encoding)
+
+    def read(self):
+        location = self._locate(max(self.pos + 1, 0))
+        if location is None:
+            return ''
+
+        (lineno, col) = location
+        contents = self._line(lineno)[col:] + '\n'
+        remainder_start = self._byte_linestarts[lineno + 1]
+        if remainder_start < self._size:
+            contents += self._mmap[remainder_start:].decode(self._encoding)
+            if not contents.endswith('\n'):
+                contents += '\n'
+        return contents
@@ -10,7 +10,7 @@ Description :   Lexers for all of the various datatypes tasks can
 
                 The goal of a lexer is to parse info from a particular
                 type (mtask, tasklist, taskdetails, ...) into a list of
-                tokens, which can be used in ``parser.parser.Parser()``
+                tokens, which can be used in ``parser.parsers.parse_tokens()``
 ________________________________________________________________________________
 """
 # builtin
@@ -19,6 +19,8 @@ from collections import namedtuple
 import os
 import json
 import abc
+import bisect
+import itertools
 import uuid
 import re
 import sys
@@ -26,12 +28,16 @@ import sys
 # internal
 from taskmage2.utils import excepts, timezone
 from taskmage2.parser import fmtdata
+from taskmage2.parser import iostream as iostreams  # `iostream` is the name of lexer arguments
 if sys.version_info[0] < 3:  # pragma: no cover
     from taskmage2.vendor import enum
 else:  # pragma: no cover
     import enum
 
 
+_HeaderHierInfo = namedtuple('header_hierinfo', ['indent', 'parent'])
+
+
 class LexerTypes(enum.Enum):
     """ Enum describing the lexer types.
     """
@@ -112,8 +118,9 @@ class _Lexer(object):
         # NOTE: position is determined by the iostream character position,
         #       not by a particular token index.
 
-        self._next = None  # the next token
-        self.data = []     # list of token dictionaries, as they appear.
+        self._next = None     # the next token
+        self.data = []        # list of token dictionaries, as they appear.
+        self.trusted = False  # True if the tokens are known to be valid (they are not validated again)
 
     def read(self):
         """ Lex the entire source until EOF.
@@ -172,6 +179,18 @@ class _Lexer(object):
             'in the subclass'
         )
 
+    def iter_tokens(self):
+        """ Generator that lexes the source one token at a time.
+        Subclasses that can, do not keep the tokens in ``self.data`` .
+
+        Yields:
+            dict: a token. See :py:obj:`_Lexer`
+        """
+        token = self.read_next()
+        while token is not None:
+            yield token
+            token = self.read_next()
+
     def peek(self):
         """ Peeks at the next upcoming token (without changing current position).
 
@@ -244,6 +263,12 @@ class TaskList(_Lexer):
         # header lv3 is underlined with '...'
         # ...etc
 
+        # parent lookups. Each stack only keeps tokens that could still be the parent
+        # of a later token (strictly increasing indents), so lookups are amortized O(1).
+        self._indent_stack = []     # [(indent, _id), ...] of all tokens
+        self._header_stack = []     # [(indent, _id), ...] of sections/files
+        self._last_section = None   # _id of the last section
+
     def read(self):
         """ Lexes the entire file-descriptor into a list of tokens.
 
@@ -302,8 +327,73 @@ class TaskList(_Lexer):
         token = self._read_next()
         if token is not None:
             self.data.append(token)
+            self._push_token(token)
         return token
 
+    def iter_tokens(self):
+        """ Generator that lexes the file one token at a time.
+        Unlike :py:meth:`read` , tokens are not kept in ``self.data`` .
+
+        Yields:
+            dict: a token. See :py:obj:`_Lexer`
+        """
+        token = self._read_next()
+        while token is not None:
+            self._push_token(token)
+            yield token
+            token = self._read_next()
+
+    def _get_state(self):
+        """ Returns a snapshot of the state used to resolve the parents of upcoming tokens.
+        Snapshots can be compared, and restored using :py:meth:`_set_state` .
+
+        Returns:
+
+            .. code-block:: python
+
+                (
+                    ((0, 'B3CB8A5C63A146A0987CC34F0A8A5F7E'), (4, '41C34E1C3D1E4B03A4D0E1A8C2F64B9C')),  # indent stack
+                    ((0, 'DD9EABDE5F054C7C8557B408E9D81887'),),                                       # header stack
+                    'DD9EABDE5F054C7C8557B408E9D81887',                                               # last section
+                    ('=', '-'),                                                                       # headerchar order
+                )
+
+        """
+        return (
+            tuple(self._indent_stack),
+            tuple(self._header_stack),
+            self._last_section,
+            tuple(self._headerchar_order),
+        )
+
+    def _set_state(self, state):
+        """ Restores a snapshot of the state returned by :py:meth:`_get_state` .
+        """
+        (indent_stack, header_stack, last_section, headerchar_order) = state
+        self._indent_stack = list(indent_stack)
+        self._header_stack = list(header_stack)
+        self._last_section = last_section
+        self._headerchar_order = list(headerchar_order)
+
+    def _push_token(self, token):
+        """ Records a token in the stacks used to find the parents of later tokens.
+        """
+        indent = token['indent']
+
+        stack = self._indent_stack
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        stack.append((indent, token['_id']))
+
+        if token['type'] in ('section', 'file'):
+            stack = self._header_stack
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            stack.append((indent, token['_id']))
+
+            if token['type'] == 'section':
+                self._last_section = token['_id']
+
     def _read_next(self):
         """ Obtains next token.
         """
@@ -660,19 +750,16 @@ class TaskList(_Lexer):
 
         if indent == 0:
             # return the nearest section-header if one
-            # occurs before task
-            for token in reversed(self.data):
-                if token['type'] == 'section':
-                    return token['_id']
-            # otherwise return None
-            return None
+            # occurs before task (otherwise None)
+            return self._last_section
 
         # if the task is indented, return the nearest
         # less-indented tokenid. Note that this might
         # be a task, section, or file.
-        for token in reversed(self.data):
-            if token['indent'] < indent:
-                return token['_id']
+        # (tokens skipped here are popped when this task is pushed)
+        for (token_indent, _id) in reversed(self._indent_stack):
+            if token_indent < indent:
+                return _id
 
         return None
 
@@ -689,7 +776,7 @@ class TaskList(_Lexer):
                 (indent=0, parent=None)
         """
 
-        _returnval = namedtuple('header_hierinfo', ['indent', 'parent'])
+        _returnval = _HeaderHierInfo
 
         if not self._headerchar_order:
             self._headerchar_order.append(underline_char)
@@ -705,12 +792,9 @@ class TaskList(_Lexer):
 
         # find the nearest header or file with a lower
         # level of indentation.
-        for token in reversed(self.data):
-            if all([
-                token['indent'] < indent,
-                token['type'] in ('section', 'file')
-            ]):
-                return _returnval(indent=indent, parent=token['_id'])
+        for (token_indent, _id) in reversed(self._header_stack):
+            if token_indent < indent:
+                return _returnval(indent=indent, parent=_id)
 
         self._parser_exception(
             (
@@ -720,6 +804,446 @@ class TaskList(_Lexer):
         )
 
 
+class LineTaskList(TaskList):
+    """ Lexer for the TaskList format, that reads one line at a time.
+
+    Produces the same tokens as :py:obj:`TaskList` , but classifies each line
+    (blank, task, header, continuation) using whole-line string operations
+    rather than peeking one character at a time, so lexing time grows
+    linearly with the size of the buffer.
+
+    Notes:
+        Only the line-boundaries are read from the iostream (`peek_line` , `offset` ),
+        so it benefits most from line-indexed iostreams like
+        :py:obj:`taskmage2.parser.iostream.TextBuffer` .
+    """
+    _id_regex = re.compile(r'^{\*[A-Z0-9]+\*}')
+
+    def __init__(self, iostream):
+        super(LineTaskList, self).__init__(iostream)
+        self._lookahead = None  # (pos, line, next_line) of the line the cursor is on
+        self._lineno = 0        # index of the line the cursor is on
+
+    def _peek_lines(self):
+        """ Returns the line at the current cursor position, and the line after it.
+
+        Returns:
+
+            .. code-block:: python
+
+                ('* task A', '    * subtask')
+                ('* task A', None)              # if last line
+                (None, None)                    # if EOF
+
+        """
+        if self._lookahead is not None and self._lookahead[0] == self._iostream.pos:
+            return self._lookahead[1:]
+
+        line = self._iostream.peek_line()
+        if line is None:
+            return (None, None)
+        return (line, self._iostream.peek_line(len(line) + 1))
+
+    def _read_next(self):
+        """ Obtains next token.
+        """
+        while True:
+            (line, next_line) = self._peek_lines()
+
+            # EOF
+            if line is None:
+                return None
+
+            stripped = line.lstrip(' ')
+
+            # blank line (outside of taskdef, ignore & continue)
+            if not stripped:
+                self._iostream.offset(len(line) + 1)
+                self._lineno += 1
+                continue
+            break
+
+        indent = len(line) - len(stripped)
+        return self._read_token(line, next_line, stripped, indent)
+
+    def _read_token(self, line, next_line, stripped, indent):
+        """ Obtains the token that starts on `line` .
+
+        Args:
+            line (str):       the line at the cursor
+            next_line (str):  the line after `line` (or None if EOF)
+            stripped (str):   `line` without it's indentation
+            indent (int):     number of spaces `line` is indented
+        """
+        ch = stripped[0]
+
+        # header with id
+        if ch == '{':
+            (id_len, _id) = self._read_line_id(stripped)
+            self._iostream.offset(indent + id_len)
+            token = self._read_header(_id, indent)
+            self._lineno += 2
+            return token
+
+        # header without id
+        if self._is_header_line(stripped, next_line):
+            if indent:
+                self._iostream.offset(indent)
+            token = self._read_header(uuid.uuid4().hex.upper(), indent)
+            self._lineno += 2
+            return token
+
+        # task
+        if ch in self.statuses:
+            name_start = 1
+
+            # ex: 'x{*0BE8D6CE9CB94AFB82037D2C367566C1*} task'
+            if stripped[1:3] == '{*':
+                (id_len, _id) = self._read_line_id(stripped[1:])
+                name_start += id_len
+            else:
+                _id = uuid.uuid4().hex.upper()
+
+            return self._read_line_task(
+                status=self.statuses[ch],
+                _id=_id,
+                indent=indent,
+                name=stripped[name_start:],
+                line=line,
+                next_line=next_line,
+            )
+
+        self._parser_exception('Unexpected Character: {}\nline: {}'.format(repr(ch), stripped))
+
+    def _read_line_id(self, text):
+        """ Reads an id definition at the start of `text` ( ``{*7FBAD5A946974A7DBB57DD6495F5DE1C*}`` ).
+
+        Returns:
+
+            .. code-block:: python
+
+                (36, '7FBAD5A946974A7DBB57DD6495F5DE1C')  # (offset, id)
+
+        """
+        if text[1:2] != '*':
+            self._parser_exception('invalid ID start')
+
+        id_end = text.find('}', 2)
+        if id_end < 0:
+            self._parser_exception('invalid ID end')
+
+        id_def = text[:id_end + 1]
+        return (len(id_def), id_def[2:-2])
+
+    def _read_line_task(self, status, _id, indent, name, line, next_line):
+        """ Builds a task token from it's first line, and any continuation lines that follow it.
+        See :py:meth:`TaskList._read_task` .
+        """
+        parent = self._get_task_parent(indent)
+        offset = len(line) + 1
+        self._lineno += 1
+
+        # consume continuation lines
+        line = next_line
+        while line is not None:
+            next_line = self._iostream.peek_line(offset + len(line) + 1)
+            stripped = line.lstrip(' ')
+            line_indent = len(line) - len(stripped)
+
+            # newline is the start of something else
+            # *NOT* a continuation of this task
+            if (
+                line_indent < indent
+                or stripped[:1] in self.statuses
+                or self._is_header_line(line, next_line)
+            ):
+                self._lookahead = (self._iostream.pos + offset, line, next_line)
+                break
+
+            if line_indent:
+                name = name.strip() + '\n ' + stripped
+            else:
+                name = name.strip() + '\n' + stripped
+            offset += len(line) + 1
+            self._lineno += 1
+            line = next_line
+
+        self._iostream.offset(offset)
+        return {
+            '_id': _id,
+            'type': 'task',
+            'name': name.strip(),
+            'indent': indent,
+            'parent': parent,
+            'data': {
+                'status': status,
+                'created': None,
+                'finished': None,  # do not assign date here
+                'modified': None,  # utcnow() if changed only
+            },
+        }
+
+    def _is_header_line(self, title, underline):
+        """ Returns True if `title` and `underline` lines form a header.
+        See :py:meth:`TaskList._is_header` .
+        """
+        if title is None or not underline:
+            return False
+
+        # title may or may not have id (depending on when is_header() is run)
+        if title[:2] == '{*':
+            title = self._id_regex.sub('', title)
+
+        # underlines must be at least as long as title
+        if len(title) > len(underline):
+            return False
+
+        # underlines must be made of the same character
+        return not underline.strip(underline[0])
+
+
+class _BlockTaskList(LineTaskList):
+    """ LineTaskList that reports the start of each block (unindented token)
+    to a callback before reading it. See :py:obj:`IncrementalTaskList` .
+    """
+    def __init__(self, iostream, on_block):
+        """ Constructor.
+
+        Args:
+            iostream (taskmage2.parser.iostream.IOStream):
+                stream to lex.
+
+            on_block (callable):
+                ``on_block(lineno, state, num_tokens)`` called before reading
+                each unindented token (except on the first line). If it returns True,
+                lexing stops as if it had reached EOF.
+        """
+        super(_BlockTaskList, self).__init__(iostream)
+        self._on_block = on_block
+
+    def _read_token(self, line, next_line, stripped, indent):
+        if not indent and self._lineno:
+            if self._on_block(self._lineno, self._get_state(), len(self.data)):
+                return None
+        return super(_BlockTaskList, self)._read_token(line, next_line, stripped, indent)
+
+
+class IncrementalTaskList(object):
+    """ Lexes the TaskList format, keeping the tokens between reads so that
+    only the lines that changed since the last read are re-lexed.
+
+    Notes:
+        Tokens are grouped into blocks of lines, each starting at an unindented token
+        (a top-level task or header). Each block stores the lexer state (used to resolve parents)
+        at the start of the block.
+
+        Re-lexing starts from the block containing the line 2x lines above the first change
+        (a changed line can turn the line above it into a header), and stops at the first block
+        after the change whose stored state matches the lexer's. The tokens of the remaining
+        blocks are reused.
+
+    Example:
+
+        .. code-block:: python
+
+            lexer = IncrementalTaskList()
+            lexer.read(lines)           # lexes every line
+
+            lines[300] = 'x finished task'
+            lexer.read(lines)           # re-lexes the block containing line 300
+
+    """
+    def __init__(self):
+        self.data = []           # list of token dictionaries, as they appear.
+        self._lines = None       # lines as of last read (None if not read yet)
+        self._block_starts = []  # index of the first line of each block
+        self._block_states = []  # lexer state (`TaskList._get_state()` ) at the start of each block
+        self._block_tokens = []  # list of tokens in each block
+
+    def read(self, lines):
+        """ Lexes a list of lines, re-lexing only the lines that differ from the last read.
+
+        Args:
+            lines (list):
+                list of lines (without newline characters).
+
+        Returns:
+            list: a list of dictionaries (each representing a token). See :py:obj:`_Lexer` .
+        """
+        lines = list(lines)
+        if self._lines is None:
+            return self._relex(lines, 0, 0, len(lines))
+
+        (lo, hi_old, hi_new) = self._get_diff_span(self._lines, lines)
+        if lo == hi_old == hi_new:
+            self._lines = lines
+            return self.data
+        return self._relex(lines, lo, hi_old, hi_new)
+
+    def read_changes(self, buf, changes):
+        """ Re-lexes `buf` using a list of the changes that were made to it since the last read
+        (as reported by vim's ``listener_add()`` ). Only the changed lines are copied from `buf` .
+
+        Args:
+            buf (vim.api.buffer.Buffer, list):
+                A vim buffer, or a list of lines.
+
+            changes (list):
+                list of changes in the order they occurred,
+                as 1-indexed ``[(lnum, end, added), ...]`` .
+
+                * ``lnum``:  first changed line
+                * ``end``:   first line below the change (before the change)
+                * ``added``: number of lines added (negative if deleted)
+
+        Returns:
+            list: a list of dictionaries (each representing a token). See :py:obj:`_Lexer` .
+        """
+        if self._lines is None:
+            return self.read(buf[:])
+
+        span = self._get_changes_span(changes)
+        if span is None:
+            return self.data
+
+        (lo, hi_old, hi_new) = span
+        lines = self._lines
+        lines[lo:hi_old] = buf[lo:hi_new]
+
+        # changes were missed, re-read everything
+        if len(lines) != len(buf):
+            self._lines = None
+            return self.read(buf[:])
+
+        return self._relex(lines, lo, hi_old, hi_new)
+
+    @staticmethod
+    def _get_diff_span(old_lines, new_lines):
+        """ Finds the range of lines that differ between two lists of lines.
+
+        Returns:
+
+            .. code-block:: python
+
+                (3, 5, 7)  # (lo, hi_old, hi_new)  old_lines[3:5] was replaced by new_lines[3:7]
+
+        """
+        hi_old = len(old_lines)
+        hi_new = len(new_lines)
+
+        lo = 0
+        while lo < hi_old and lo < hi_new and old_lines[lo] == new_lines[lo]:
+            lo += 1
+
+        while hi_old > lo and hi_new > lo and old_lines[hi_old - 1] == new_lines[hi_new - 1]:
+            hi_old -= 1
+            hi_new -= 1
+
+        return (lo, hi_old, hi_new)
+
+    @staticmethod
+    def _get_changes_span(changes):
+        """ Combines a list of changes into a single range of changed lines.
+        See :py:meth:`read_changes` .
+
+        Returns:
+
+            .. code-block:: python
+
+                (3, 5, 7)  # (lo, hi_old, hi_new)  lines[3:5] were replaced by 4x lines.
+                None       # if there were no changes
+
+        """
+        lo = None
+        hi = None
+        delta = 0
+        for (lnum, end, added) in changes:
+            start = int(lnum) - 1
+            stop = int(end) - 1
+            added = int(added)
+
+            if lo is None:
+                (lo, hi) = (start, stop + added)
+            else:
+                # move the existing range to line numbers after this change
+                if lo > start:
+                    lo = lo + added if lo >= stop else start
+                if hi > start:
+                    hi = hi + added if hi >= stop else stop + added
+                lo = min(lo, start)
+                hi = max(hi, stop + added)
+            delta += added
+
+        if lo is None:
+            return None
+        return (lo, max(hi - delta, lo), hi)
+
+    def _relex(self, lines, lo, hi_old, hi_new):
+        """ Re-lexes the blocks overlapping the changed lines, and updates the cached tokens.
+
+        Args:
+            lines (list):   lines after the change
+            lo (int):       index of first changed line
+            hi_old (int):   index of first unchanged line after the change (before the change)
+            hi_new (int):   index of first unchanged line after the change (after the change)
+        """
+        delta = hi_new - hi_old
+        old_starts = self._block_starts
+
+        # block to start re-lexing from
+        block_index = 0
+        if old_starts:
+            block_index = max(bisect.bisect_right(old_starts, max(lo - 2, 0)) - 1, 0)
+        start = old_starts[block_index] if old_starts else 0
+
+        new_starts = [start]
+        new_states = []
+        token_indexes = [0]
+        reused = [len(old_starts)]  # index of the first old block that is reused
+
+        def on_block(lineno, state, num_tokens):
+            lineno += start
+            if lineno >= hi_new:
+                old_index = bisect.bisect_left(old_starts, lineno - delta)
+                if (
+                    old_index < len(old_starts)
+                    and old_starts[old_index] == lineno - delta
+                    and self._block_states[old_index] == state
+                ):
+                    reused[0] = old_index
+                    return True
+
+            new_starts.append(lineno)
+            new_states.append(state)
+            token_indexes.append(num_tokens)
+            return False
+
+        lexer = _BlockTaskList(iostreams.IndexedVimBuffer(lines, start), on_block)
+        if old_starts:
+            lexer._set_state(self._block_states[block_index])
+        new_states.insert(0, lexer._get_state())
+
+        try:
+            tokens = lexer.read()
+        except Exception:
+            self.__init__()
+            raise
+
+        token_indexes.append(len(tokens))
+        new_tokens = [
+            tokens[token_indexes[i]:token_indexes[i + 1]]
+            for i in range(len(new_starts))
+        ]
+
+        reused = reused[0]
+        self._block_starts = old_starts[:block_index] + new_starts + [s + delta for s in old_starts[reused:]]
+        self._block_states = self._block_states[:block_index] + new_states + self._block_states[reused:]
+        self._block_tokens = self._block_tokens[:block_index] + new_tokens + self._block_tokens[reused:]
+        self._lines = lines
+        self.data = list(itertools.chain.from_iterable(self._block_tokens))
+        return self.data
+
+
 class TaskDetails(_Lexer):
     """ Displays editable Mtask details for a single task.
 
@@ -795,13 +1319,13 @@ class Mtask(_Lexer):
 
             Args:
                 fd:
-                    A python file-descriptor (as returned by ``open`` )
+                    A python file-descriptor (as returned by ``open`` ),
+                    or a :py:obj:`taskmage2.parser.iostream.IOStream` .
         """
         super(Mtask, self).__init__()
         self._fd = fd
-        self._rawdata = []  # the JSON file data, serialized into a python list
-        self._index = -1    # current place in of self._rawdata[]
-        self._read()
+        self._rawdata = self._iter_rawdata(verify_stamp=True)  # the JSON file data, serialized one entry at a time
+        self._index = -1  # index of the last entry read from self._rawdata
 
     def read(self):
         token = ''
@@ -809,48 +1333,191 @@ class Mtask(_Lexer):
             token = self.read_next()
         return self.data
 
-    def _read(self):
-        data = self._fd.read()
-        if not data:
-            self._rawdata = []
-        else:
-            self._rawdata = json.loads(data)
-
     def read_next(self):
         token = self._read_next()
         if token:
             self.data.append(token)
         return token
 
+    def iter_tokens(self):
+        """ Generator that lexes the file one token at a time.
+        Unlike :py:meth:`read` , tokens are not kept in ``self.data`` .
+
+        Yields:
+            dict: a token. See :py:obj:`_Lexer`
+        """
+        token = self._read_next()
+        while token is not None:
+            yield token
+            token = self._read_next()
+
+    def iter_rawdata(self):
+        """ Generator that decodes the JSON file one entry at a time, without
+        validating it or converting its dates.
+
+        :py:obj:`taskmage2.asttree.renderers.Mtask` writes one entry per line, so each line is
+        decoded on its own. Files in any other layout (hand-edited, ...) are decoded all at once.
+        The stamp (see :py:obj:`taskmage2.parser.fmtdata.Mtask` ) is not yielded.
+
+        Yields:
+            dict: the JSON object of a task/section/file.
+        """
+        return self._iter_rawdata(verify_stamp=False)
+
+    def _iter_rawdata(self, verify_stamp):
+        """ Implementation of :py:meth:`iter_rawdata` .
+
+        Args:
+            verify_stamp (bool):
+                If True, when the file starts with a stamp the rest of the file is checksummed
+                before the first entry is yielded, and ``self.trusted`` is set if it matches.
+        """
+        decoder = json.JSONDecoder()
+        is_iostream = isinstance(self._fd, iostreams.IOStream)
+        start = None if is_iostream else self._fd.tell()
+        num_chars = 0    # number of characters read from an iostream
+        consumed = 0     # number of entries yielded
+        expect = '['     # next expected line ('[', '{', ',{', ']' or '')
+
+        for line in self._iter_lines():
+            num_chars += len(line) + 1
+            stripped = line.strip()
+            if not stripped:
+                continue
+
+            if expect == '[' and stripped == '[':
+                expect = '{'
+                continue
+
+            if stripped == ']' and expect in ('{', ']'):
+                expect = ''
+                continue
+
+            if stripped[0] == '{' and expect in ('{', ',{'):
+                try:
+                    (entry, end) = decoder.raw_decode(stripped)
+                except ValueError:
+                    break
+                remainder = stripped[end:]
+                if remainder not in ('', ','):
+                    break
+                is_first = expect == '{'
+                expect = ',{' if remainder else ']'
+
+                if is_first and fmtdata.Mtask.is_stamp(entry):
+                    if verify_stamp:
+                        self.trusted = self._verify_stamp(entry)
+                    continue
+
+                consumed += 1
+                yield entry
+                continue
+
+            # not one-entry-per-line, or trailing text after ']'
+            expect = None
+            break
+
+        if expect in ('', '['):
+            return
+
+        # not in the rendered layout, validate the remaining entries
+        self.trusted = False
+
+        # decode the entire file, skipping the entries already yielded
+        if is_iostream:
+            self._fd.offset(-num_chars)
+        else:
+            self._fd.seek(start)
+        data = self._fd.read()
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        entries = json.loads(data)
+        if entries and fmtdata.Mtask.is_stamp(entries[0]):
+            entries = entries[1:]
+        for entry in entries[consumed:]:
+            yield entry
+
+    def _verify_stamp(self, stamp):
+        """ Checksums the text following the stamp (up to the closing ``]`` ),
+        without changing the current position.
+
+        Returns:
+            bool: True if the checksum matches the stamp
+        """
+        if isinstance(self._fd, iostreams.IOStream):
+            rest = self._fd.read()
+        else:
+            start = self._fd.tell()
+            rest = self._fd.read()
+            self._fd.seek(start)
+
+        closing = b'\n]' if isinstance(rest, bytes) else '\n]'
+        if rest.startswith(closing[1:]):
+            end = 0
+        else:
+            end = rest.rfind(closing) + 1
+            if not end:
+                return False
+        if rest[end + 1:].strip():
+            return False
+        return fmtdata.Mtask.is_valid_stamp(stamp, rest[:end])
+
+    def _iter_lines(self):
+        """ Yields each line from the file-descriptor (without newline characters).
+        """
+        if isinstance(self._fd, iostreams.IOStream):
+            line = self._fd.peek_line()
+            while line is not None:
+                self._fd.offset(len(line) + 1)
+                yield line
+                line = self._fd.peek_line()
+            return
+
+        for line in iter(self._fd.readline, self._fd.read(0)):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            yield line.rstrip('\r\n')
+
     def _read_next(self):
-        """ Reads the JSON object (serialized into python), validates,
+        """ Reads the next JSON object (serialized into python), validates,
         and makes any more required type changes.
         """
+        dtype = next(self._rawdata, None)
+        if dtype is None:
+            return None
         self._index += 1
         index = self._index
 
+        if self.trusted:
+            return self._read_trusted(dtype)
+
         type_map = dict(
             task=self._read_task,
             section=self._read_section,
             file=self._read_filedef,
         )
 
-        if self._index >= len(self._rawdata):
-            return None
-
-        type_ = self._rawdata[index].get('type', None)
+        type_ = dtype.get('type', None)
         if type_ in type_map:
-            return type_map[type_](index)
+            return type_map[type_](index, dtype)
 
         self._parser_exception(
             ('Invalid entry in mtaskfile: \n'
              'key "type" has unexpected value: "{}"\n'
-             '{}\n').format(self._rawdata[index]['type'], repr(self._rawdata[index]))
+             '{}\n').format(dtype['type'], repr(dtype))
         )
 
-    def _read_task(self, index):
-        dtype = self._rawdata[index]
+    def _read_trusted(self, dtype):
+        """ Converts an entry from a file with a valid stamp, without validating it.
+        """
+        if dtype['type'] == 'task':
+            data = dtype['data']
+            for key in ('created', 'finished', 'modified'):
+                if data[key]:
+                    data[key] = timezone.LazyDatetime(data[key])
+        return dtype
 
+    def _read_task(self, index, dtype):
         self._validate_keys(
             index=index,
             data=dtype,
@@ -868,17 +1535,15 @@ class Mtask(_Lexer):
         if dtype['data']['status'] not in self.statuses:
             self._parser_exception('Invalid status: {}'.format(dtype['data']['status']))
 
-        # parse date into
+        # dates are parsed on first use
         for key in ('created', 'finished', 'modified'):
             if dtype['data'][key]:
                 isodate = dtype['data'][key]
-                dtype['data'][key] = timezone.parse_utc_iso8601(isodate)
+                dtype['data'][key] = timezone.LazyDatetime(isodate)
 
         return dtype
 
-    def _read_section(self, index):
-        dtype = self._rawdata[index]
-
+    def _read_section(self, index, dtype):
         self._validate_keys(
             index=index,
             data=dtype,
@@ -895,9 +1560,7 @@ class Mtask(_Lexer):
 
         return dtype
 
-    def _read_filedef(self, index):
-        dtype = self._rawdata[index]
-
+    def _read_filedef(self, index, dtype):
         self._validate_keys(
             index=index,
             data=dtype,
@@ -969,7 +1632,7 @@ def get_lexer(iostream, lexertype):
     """
     lexertype = LexerTypes(lexertype)
     lexertype_map = {
-        LexerTypes.tasklist:    TaskList,
+        LexerTypes.tasklist:    LineTaskList,
         LexerTypes.taskdetails: TaskDetails,
         LexerTypes.mtask:       Mtask,
     }
@@ -977,8 +1640,6 @@ def get_lexer(iostream, lexertype):
 
 
 if __name__ == '__main__':  # pragma: no cover
-    from taskmage2.parser import iostream
-
     def ex_tasklist():
         print(
             '\n'
@@ -992,7 +1653,7 @@ if __name__ == '__main__':  # pragma: no cover
             '{}/../../../examples/sample_tasks.tasklist'.format(_scriptdir)
         )
         with open(path, 'rb') as fd:
-            lexer = TaskList(iostream.FileDescriptor(fd))
+            lexer = TaskList(iostreams.FileDescriptor(fd))
 
             token = ''
             while token is not None:
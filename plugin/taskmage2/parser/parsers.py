@@ -11,9 +11,11 @@ ________________________________________________________________________________
 """
 # builtin
 from __future__ import absolute_import, division, print_function
+import itertools
 import os
 from taskmage2.asttree import astnode, asttree
 from taskmage2.parser import lexers
+from taskmage2.utils import excepts
 
 
 # package
@@ -21,86 +23,6 @@ from taskmage2.parser import lexers
 # internal
 
 
-# TODO: delete Parser() class
-
-class Parser(object):
-    """ The parser transforms the tokens collected in the Lexer
-    into a AST tree of Nodes. It can then render that AST
-    tree into various output formats.
-
-    Example:
-
-        Example that converts a tasklist file to a mtask file.
-
-        .. code-block:: python
-
-            from taskmage2.parser import lexers, iostream, renderers
-
-            with open('/path/file.tasklist', 'rb') as fd:
-                lexer = lexers.TaskList(iostream.FileDescriptor(fd))
-                parser = Parser(lexer)
-                parser.render(render.Mtask)
-                >>> [{'_id':.., ...}, {'_id':.., ...}, ...]
-
-    """
-    def __init__(self, lexer):
-        """ Constructor.
-
-        Args:
-            lexer (taskmage2.lexers.Lexer):
-                A lexer subclass instance, (TaskList, Mtask, ...),
-                that has been loaded with data.
-        """
-        self.__lexer = lexer
-        self.__lexer.read()
-
-    def parse(self, touch=False):
-        """ Parses lexer into a nexted list of Nodes.
-
-        Args:
-            touch (bool):
-                If True, updates last-modified timestamp, adds
-                id if none present, etc.
-
-        Returns:
-
-            .. code-block:: python
-
-                [
-                    Node('name':'home', 'type':'section', ... children=[
-                        Node('name':'laundry', ... children=[]),
-                        Node('name':'dishes', ... children=[]),
-                        ...
-                    ]),
-                    Node('name':'taskA', ...children=[])
-                ]
-
-        """
-        # create dictionary of id:node
-        allnodes = {}  # {id:node}
-        for token in self.__lexer.data:
-            allnodes[token['_id']] = astnode.Node(
-                _id=token['_id'],
-                ntype=token['type'],
-                name=token['name'],
-                data=token['data'],
-            )
-
-        # create AST
-        AST = asttree.AbstractSyntaxTree()
-        for token in self.__lexer.data:
-            if token['parent']:
-                parent = allnodes[token['parent']]
-                child = allnodes[token['_id']]
-                child.parent = parent
-                parent.children.append(child)
-            else:
-                node = allnodes[token['_id']]
-                AST.append(node)
-
-        return AST
-
-
 def parse(iostream, lexer):
     """ Parse text from `iostream` using `lexer` .
 
@@ -116,29 +38,71 @@ def parse(iostream, lexer):
             AbstractSyntaxTree built from `iostream`
     """
     lexer = lexers.get_lexer(iostream, lexer)
-    lexer.read()
+    tokens = lexer.iter_tokens()
+
+    # the lexer only knows if it's tokens are trusted once it has started reading
+    first_token = next(tokens, None)
+    if first_token is None:
+        return asttree.AbstractSyntaxTree()
+    tokens = itertools.chain([first_token], tokens)
+    return parse_tokens(tokens, trusted=lexer.trusted)
+
+
+def parse_tokens(tokens, trusted=False):
+    """ Builds an AST from tokens produced by a lexer, in a single pass.
 
-    # create dictionary of id:node
-    allnodes = {}  # {id:node}
-    for token in lexer.data:
-        allnodes[token['_id']] = astnode.Node(
+    Each node is attached to it's parent as soon as it is read, so `tokens`
+    can be a generator (ex: :py:meth:`taskmage2.parser.lexers._Lexer.iter_tokens` ),
+    and no token needs to be kept once it has been read.
+
+    Args:
+        tokens (list, generator):
+            token dictionaries, in the order they appear.
+            See :py:obj:`taskmage2.parser.lexers._Lexer` .
+
+        trusted (bool, optional):
+            If True, the tokens' data is known to be valid, and is not validated again.
+
+    Returns:
+        taskmage2.asttree.AbstractSyntaxTree:
+            AbstractSyntaxTree built from `tokens`
+    """
+    data_classes = dict([(ntype.value, cls) for (ntype, cls) in astnode.Node._data_map])
+
+    AST = asttree.AbstractSyntaxTree()
+    allnodes = {}  # {id: node}
+    orphans = {}   # {parent_id: [node, ...]}  nodes read before their parent (hand-edited mtask files)
+    for token in tokens:
+        data = token['data']
+        if trusted:
+            data = data_classes[token['type']].from_trusted_dict(data)
+        node = astnode.Node(
             _id=token['_id'],
             ntype=token['type'],
             name=token['name'],
-            data=token['data'],
+            data=data,
         )
-
-    # create AST
-    AST = asttree.AbstractSyntaxTree()
-    for token in lexer.data:
-        if token['parent']:
-            parent = allnodes[token['parent']]
-            child = allnodes[token['_id']]
-            child.parent = parent
-            parent.children.append(child)
+        allnodes[token['_id']] = node
+
+        if orphans:
+            for child in orphans.pop(token['_id'], []):
+                child.parent = node
+                node.children.append_loaded(child)
+
+        parent_id = token['parent']
+        if not parent_id:
+            AST.data.append_loaded(node)
+        elif parent_id in allnodes:
+            parent = allnodes[parent_id]
+            node.parent = parent
+            parent.children.append_loaded(node)
         else:
-            node = allnodes[token['_id']]
-            AST.append(node)
+            orphans.setdefault(parent_id, []).append(node)
+
+    if orphans:
+        raise excepts.ParserError(
+            'parent nodes do not exist: {}'.format(', '.join(sorted(orphans.keys())))
+        )
 
     return AST
 
@@ -157,9 +121,7 @@ if __name__ == '__main__':  # pragma: no cover
         print('========')
         print()
         with open('{}/examples/sample_tasks.tasklist'.format(dirname), 'rb') as fd:
-            lexer = lexers.TaskList(iostream.FileDescriptor(fd))
-            parser = Parser(lexer)
-            ast = parser.parse()
+            ast = parse(iostream.FileDescriptor(fd), lexers.LexerTypes.tasklist)
             print(ast.data)
             print()
             print(ast.render(renderers.TaskList))
@@ -171,9 +133,7 @@ if __name__ == '__main__':  # pragma: no cover
         print()
 
         with open('{}/examples/sample_tasks.mtask'.format(dirname), 'rb') as fd:
-            lexer = lexers.Mtask(fd)
-            parser = Parser(lexer)
-            ast = parser.parse()
+            ast = parse(fd, lexers.LexerTypes.mtask)
             print(ast.data)
             print()
             print(ast.render(renderers.Mtask))
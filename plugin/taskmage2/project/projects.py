@@ -146,7 +146,7 @@ class Project(object):
         projectroot = self.find(path)
         self._root = projectroot
 
-    def archive_completed(self, filepath=None):
+    def archive_completed(self, filepath=None, nested=False):
         """ Archives all completed task-branches.
 
         Example:
@@ -169,9 +169,14 @@ class Project(object):
         Args:
             filepath (str, optional): ``(ex: '/src/project/file.mtask' )``
                 Optionally, archive completed tasks in a single target file.
+
+            nested (bool, optional):
+                If True, also archives completed task-branches within
+                sections that are not entirely completed.
+                See :py:meth:`taskmage2.asttree.asttree.AbstractSyntaxTree.archive_completed` .
         """
         if filepath is not None:
-            self._archive_completed(filepath)
+            self._archive_completed(filepath, nested)
         else:
             # for every mtask file in the entire project...
             raise NotImplementedError('todo - archive completed tasks from all mtask files')
@@ -294,14 +299,17 @@ class Project(object):
                 filepath = '{}/{}'.format(root, filename)
                 yield taskfiles.TaskFile(filepath)
 
-    def _archive_completed(self, filepath):
+    def _archive_completed(self, filepath, nested=False):
         """
 
         Args:
             filepath (str):
                 absolute path to a .mtask file.
+
+            nested (bool, optional):
+                see :py:meth:`archive_completed`
         """
-        (active_ast, archive_ast) = self._archive_completed_as_ast(filepath)
+        (active_ast, archive_ast) = self._archive_completed_as_ast(filepath, nested)
         archive_path = self.get_archived_path(filepath)
 
         tempdir = tempfile.mkdtemp()
@@ -322,7 +330,7 @@ class Project(object):
             if os.path.isdir(tempdir):
                 shutil.rmtree(tempdir)
 
-    def _archive_completed_as_ast(self, filepath):
+    def _archive_completed_as_ast(self, filepath, nested=False):
         """
         Returns:
 
@@ -341,15 +349,14 @@ class Project(object):
         archive_ast = self._get_mtaskfile_ast(archive_path)
 
         # perform archive
-        archive_ast = active_ast.archive_completed(archive_ast)
+        archive_ast = active_ast.archive_completed(archive_ast, nested=nested)
         return (active_ast, archive_ast)
 
     def _get_mtaskfile_ast(self, filepath):
         if not os.path.isfile(filepath):
             return asttree.AbstractSyntaxTree()
 
-        with open(filepath, 'r') as fd_src:
-            fd = iostream.FileDescriptor(fd_src)
+        with iostream.MmapStream(filepath) as fd:
             AST = parsers.parse(fd, 'mtask')
         return AST
 
@@ -1,9 +1,9 @@
 import os
-import json
 import fnmatch
 import shutil
 from taskmage2.utils import functional
 from taskmage2.asttree import renderers
+from taskmage2.parser import lexers
 
 
 class TaskFile(object):
@@ -45,15 +45,13 @@ class TaskFile(object):
             ast (taskmage2.asttree.asttree.AbstractSyntaxTree):
                 writes an AST to a taskfile
         """
-        filecontents_list = ast.render(renderers.Mtask)
-        filecontents = '\n'.join(filecontents_list)
         filedir = os.path.dirname(self.filepath)
-
         if not os.path.isdir(filedir):
             os.makedirs(filedir)
 
+        # streamed, so large files are never held in memory
         with open(self.filepath, 'w') as fd:
-            fd.write(filecontents)
+            renderers.Mtask(ast).write(fd)
 
     def copyfile(self, filepath):
         """ Copy this taskfile to another location (creating missing directories).
@@ -91,14 +89,15 @@ class TaskFile(object):
 
     def iter_tasks(self):
         """ Iterator that yields task dictionaries contained within taskfile.
+        The file is decoded one task at a time, so iteration can stop early.
 
         Yields:
             dict:
                 see :py:mod:`taskmage2.asttree.nodedata`
         """
-        tasks = json.loads(self.read())
-        for task in tasks:
-            yield task
+        with open(self.filepath, 'rb') as fd:
+            for task in lexers.Mtask(fd).iter_rawdata():
+                yield task
 
 
 class TaskFilter(object):
@@ -0,0 +1,116 @@
+import bisect
+
+
+def diff_lines(old_lines, new_lines):
+    """ Returns the hunks that turn `old_lines` into `new_lines` .
+
+    Lines that appear exactly once in both lists are matched first
+    (keeping the longest run of matches that are in the same order in both),
+    then the lines between matches are compared from each end. Runs in ``O(n log n)`` ,
+    and finds the minimal diff for tasklists, where nearly every line holds a unique id.
+
+    Returns:
+
+        .. code-block:: python
+
+            [
+                (i1, i2, j1, j2),  # old_lines[i1:i2] is replaced by new_lines[j1:j2]
+                ...
+            ]
+
+    """
+    hunks = []
+    (i, old_end, j, new_end) = _trim(old_lines, new_lines, 0, len(old_lines), 0, len(new_lines))
+    if i == old_end and j == new_end:
+        return hunks
+
+    anchors = _unique_anchors(old_lines, new_lines, i, old_end, j, new_end)
+    anchors.append((old_end, new_end))
+
+    for (anchor_i, anchor_j) in anchors:
+        hunk = _trim(old_lines, new_lines, i, anchor_i, j, anchor_j)
+        if hunk[0] != hunk[1] or hunk[2] != hunk[3]:
+            hunks.append(hunk)
+        (i, j) = (anchor_i + 1, anchor_j + 1)
+    return hunks
+
+
+def patch_buffer(buf, lines):
+    """ Replaces the contents of a vim buffer with `lines` , only assigning
+    the lines that changed (see :py:func:`diff_lines` ).
+
+    Args:
+        buf (vim.api.buffer.Buffer):
+            the buffer to modify
+
+        lines (list):
+            the new contents of the buffer
+
+    Returns:
+        int: the number of lines that were replaced, inserted, or removed.
+    """
+    touched = 0
+    hunks = diff_lines(buf[:], lines)
+
+    # last hunk first, so indexes of earlier hunks are not shifted
+    for (i1, i2, j1, j2) in reversed(hunks):
+        buf[i1:i2] = lines[j1:j2]
+        touched += max(i2 - i1, j2 - j1)
+    return touched
+
+
+def _trim(old_lines, new_lines, old_start, old_end, new_start, new_end):
+    """ Skips the lines that are the same at the start and end of two ranges.
+
+    Returns:
+        tuple: ``(old_start, old_end, new_start, new_end)`` of the lines that differ.
+    """
+    while old_start < old_end and new_start < new_end and old_lines[old_start] == new_lines[new_start]:
+        old_start += 1
+        new_start += 1
+    while old_start < old_end and new_start < new_end and old_lines[old_end - 1] == new_lines[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    return (old_start, old_end, new_start, new_end)
+
+
+def _unique_anchors(old_lines, new_lines, old_start, old_end, new_start, new_end):
+    """ Returns the longest list of ``(i, j)`` pairs of equal lines that are unique in both ranges,
+    and in the same order in both.
+    """
+    counts = {}  # {line: [old_count, new_count, old_index]}
+    for i in range(old_start, old_end):
+        entry = counts.setdefault(old_lines[i], [0, 0, i])
+        entry[0] += 1
+    for j in range(new_start, new_end):
+        entry = counts.get(new_lines[j])
+        if entry is not None:
+            entry[1] += 1
+
+    matches = []  # [(i, j), ...]  ordered by j
+    for j in range(new_start, new_end):
+        entry = counts.get(new_lines[j])
+        if entry is not None and entry[0] == 1 and entry[1] == 1:
+            matches.append((entry[2], j))
+
+    # longest increasing subsequence of `i` (patience sorting)
+    tails = []       # [i, ...]  smallest last `i` of an increasing run of each length
+    tail_index = []  # [index, ...]  index in `matches` of each entry in `tails`
+    previous = []    # [index, ...]  the match before each match in it's run
+    for (index, (i, j)) in enumerate(matches):
+        length = bisect.bisect_left(tails, i)
+        previous.append(tail_index[length - 1] if length else None)
+        if length == len(tails):
+            tails.append(i)
+            tail_index.append(index)
+        else:
+            tails[length] = i
+            tail_index[length] = index
+
+    anchors = []
+    index = tail_index[-1] if tail_index else None
+    while index is not None:
+        anchors.append(matches[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
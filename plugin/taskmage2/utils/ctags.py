@@ -3,6 +3,7 @@ import re
 
 import six
 
+from taskmage2.parser import iostream
 from taskmage2.vendor.six.moves import UserList
 
 
@@ -20,9 +21,19 @@ class CtagsFile(UserList):
             filepath (str):
                 path to a file
         """
-        with open(filepath, 'r') as fd:
-            contents = fd.read()
-        self.load_text(contents, filepath)
+        with iostream.MmapStream(filepath) as fd:
+            self.load_stream(fd, filepath)
+
+    def load_stream(self, stream, filepath=None):
+        """ Finds CtagEntries within an iostream, reading it line-by-line.
+
+        Args:
+            stream (taskmage2.parser.iostream.IOStream):
+                stream of Taskmage Tasks in tasklist format. (ReStructuredText-inspired)
+        """
+        self.data = []
+        self.data.extend(CtagsHeaderEntry.find_entries_in_stream(stream, filepath))
+        # ... other entry types...
 
     def load_text(self, text, filepath=None):
         """ Finds CtagEntries within text.
@@ -72,6 +83,10 @@ class CtagsEntry(object):
     def find_entries(cls, text, filepath=None):
         raise NotImplementedError()
 
+    @classmethod
+    def find_entries_in_stream(cls, stream, filepath=None):
+        raise NotImplementedError()
+
     def render(self):
         raise NotImplementedError()
 
@@ -184,6 +199,80 @@ class CtagsHeaderEntry(CtagsEntry):
 
         return entries
 
+    @classmethod
+    def find_entries_in_stream(cls, stream, filepath=None):
+        """ Extracts a list of :py:obj:`CtagsHeaderEntry` objects from an iostream in the tasklist format.
+        Only two lines are held in memory at a time.
+
+        Returns:
+            CtagsFile:
+                list of CtagsHeaderEntries.
+
+                .. code-block:: python
+
+                    [CtagsHeaderEntry(...), CtagsHeaderEntry(...), ...]
+
+        """
+        entries = cls._find_stream_entries(stream)
+        cls._set_entries_parents(entries)
+        cls._set_entries_filepath(entries, filepath)
+
+        return entries
+
+    @classmethod
+    def _find_stream_entries(cls, stream):
+        """ Finds headers in a taskmage tasklist (rst-inspired) iostream.
+        Equivalent to :py:meth:`_find_entries` , but matches each pair of consecutive lines
+        instead of the entire text, which also provides the line-number of each match.
+
+        Args:
+            stream (taskmage2.parser.iostream.IOStream):
+                A TaskMage mtask file rendered as a tasklist file (restructuredtext-ish)
+
+        Returns:
+            list:
+                A list of entries, with lineno set.
+
+                .. code-block:: python
+
+                    [CtagsHeaderEntry(...), CtagsHeaderEntry(...), ...]
+
+        """
+        ctags_entries = []
+        regex = re.compile(cls.match_regex(), re.MULTILINE)
+
+        lineno = 1  # ctags line nums  1-indexed
+        line = stream.peek_line()
+        while line is not None:
+            start_pos = stream.pos + 1
+            stream.offset(len(line) + 1)
+            next_line = stream.peek_line()
+            if next_line is None:
+                break
+
+            match = regex.match('{}\n{}'.format(line, next_line))
+            if not match:
+                line = next_line
+                lineno += 1
+                continue
+
+            if len(match.group('name')) <= len(match.group('underline')):
+                entry = CtagsHeaderEntry(
+                    uuid_=match.group('uuid'),
+                    name=match.group('name'),
+                    ntype=match.group('type'),
+                    start_pos=start_pos,
+                    uline_char=match.group('underline')[0],
+                    lineno=lineno,
+                )
+                ctags_entries.append(entry)
+
+            # like re.finditer(), matches do not overlap
+            stream.offset(len(next_line) + 1)
+            line = stream.peek_line()
+            lineno += 2
+        return ctags_entries
+
     @classmethod
     def _find_entries(cls, text):
         r""" Finds headers in a taskmage tasklist (rst-inspired).
@@ -27,3 +27,19 @@ def make_directories(path):
     elif os.path.exists(path):
         raise OSError('Path Exists, but is not a directory: "{}"'.format(path))
     os.makedirs(path)
+
+
+def stat_key(path):
+    """ Returns a key that changes whenever the file at `path` is modified, or replaced.
+
+    Returns:
+        tuple: ``(path, inode, mtime_ns, size)`` , or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    mtime_ns = getattr(stat, 'st_mtime_ns', None)
+    if mtime_ns is None:  # python2
+        mtime_ns = int(stat.st_mtime * 1e9)
+    return (os.path.abspath(path), stat.st_ino, mtime_ns, stat.st_size)
@@ -3,28 +3,249 @@ import time
 import re
 
 
+_PARSED_CACHE_SIZE = 4096
+_parsed_cache = {}  # {'2019-07-19T07:56:13.111111+00:00': datetime.datetime(...), ...}
+_utc_iso8601_regex = re.compile('[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}(?:\\.[0-9]{1,6})?\\+00:00\\Z')
+
+
 def parse_utc_iso8601(datestr):
+    """ Parses an ISO-8601 UTC datestring (as written by ``datetime.isoformat()`` ).
+
+    Datestrings with second or microsecond precision are parsed from fixed positions.
+    Results are remembered, since the same dates are parsed each time a file is searched.
+
+    Args:
+        datestr (str): ``(ex: '2019-07-19T07:56:13.111111+00:00' )``
+
+    Returns:
+        datetime.datetime: timezone-aware datetime, in UTC
+    """
+    dt = _parsed_cache.get(datestr)
+    if dt is not None:
+        return dt
+
+    dt = _parse_naive_utc_iso8601(datestr).replace(tzinfo=_utc)
+
+    # bounded, so long-running vim sessions do not accumulate every date ever read
+    if len(_parsed_cache) >= _PARSED_CACHE_SIZE:
+        _parsed_cache.clear()
+    _parsed_cache[datestr] = dt
+    return dt
+
+
+def _parse_naive_utc_iso8601(datestr):
+    """ Parses an ISO-8601 UTC datestring to a naive datetime (without tzinfo).
+    """
     if not datestr.endswith('+00:00'):
         raise RuntimeError('datestr is not localized to UTC')
 
+    if len(datestr) in (25, 32) and datestr[10] == 'T':
+        try:
+            return _parse_fixed_iso8601(datestr[:-6])
+        except ValueError:
+            pass
+
     microseconds = re.search('(?<=\\.)[0-9]+(?=\\+00:00$)', datestr)
     if microseconds:
-        dt = datetime.datetime.strptime(datestr, '%Y-%m-%dT%H:%M:%S.%f+00:00')
-    else:
-        dt = datetime.datetime.strptime(datestr, '%Y-%m-%dT%H:%M:%S+00:00')
-
-    # localize as UTC
-    dt = datetime.datetime(
-        dt.year,
-        dt.month,
-        dt.day,
-        dt.hour,
-        dt.minute,
-        dt.second,
-        dt.microsecond,
-        tzinfo=UTC(),
+        return datetime.datetime.strptime(datestr, '%Y-%m-%dT%H:%M:%S.%f+00:00')
+    return datetime.datetime.strptime(datestr, '%Y-%m-%dT%H:%M:%S+00:00')
+
+
+def _parse_fixed_iso8601(datestr):
+    """ Parses ``YYYY-MM-DDTHH:MM:SS[.ffffff]`` . Raises ValueError if it is anything else.
+    """
+    if _fromisoformat:
+        return _fromisoformat(datestr)
+
+    if (datestr[4], datestr[7], datestr[13], datestr[16]) != ('-', '-', ':', ':'):
+        raise ValueError('invalid datestr: {}'.format(datestr))
+    microsecond = 0
+    if len(datestr) == 26:
+        if datestr[19] != '.':
+            raise ValueError('invalid datestr: {}'.format(datestr))
+        microsecond = int(datestr[20:26])
+    return datetime.datetime(
+        int(datestr[0:4]),
+        int(datestr[5:7]),
+        int(datestr[8:10]),
+        int(datestr[11:13]),
+        int(datestr[14:16]),
+        int(datestr[17:19]),
+        microsecond,
     )
-    return dt
+
+
+# python-3.7+
+_fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+
+
+def format_local_isodates(datestrs, fmt='%Y-%m-%d %H:%M'):
+    """ Converts many ISO-8601 UTC datestrings to local time, and formats them.
+
+    The offset from UTC is looked up once per day, instead of once per date.
+    The few days that DST begins/ends on are looked up per date.
+
+    Args:
+        datestrs (list):
+            ISO-8601 UTC datestrings ``(ex: ['2019-07-19T07:56:13.111111+00:00', ...] )``
+
+        fmt (str):
+            a ``strftime()`` format
+
+    Returns:
+        list: formatted local dates, in the same order ``(ex: ['2019-07-19 03:56', ...] )``
+    """
+    localtz = LocalTimezone()
+    keep_tzinfo = ('%z' in fmt or '%Z' in fmt)
+    day_offsets = {}  # {'2019-07-19': datetime.timedelta(hours=-4), '2019-11-03': None, ...}
+    formatted = {}    # {'2019-07-19T07:56:13.111111+00:00': '2019-07-19 03:56', ...}
+    results = []
+    for datestr in datestrs:
+        result = formatted.get(datestr)
+        if result is None:
+            dt = _parse_naive_utc_iso8601(datestr)
+            day = datestr[:10]
+            if day in day_offsets:
+                offset = day_offsets[day]
+            else:
+                offset = _get_day_offset(dt, localtz)
+                day_offsets[day] = offset
+
+            if offset is None:
+                local_dt = dt.replace(tzinfo=_utc).astimezone(localtz)
+            elif keep_tzinfo:
+                local_dt = (dt + offset).replace(tzinfo=localtz)
+            else:
+                local_dt = dt + offset
+            result = local_dt.strftime(fmt)
+            formatted[datestr] = result
+        results.append(result)
+    return results
+
+
+def _get_day_offset(dt, tzinfo):
+    """ Returns the difference between UTC and `tzinfo` for the whole (UTC) day
+    of naive UTC datetime `dt`, or None if it changes during that day.
+    """
+    day_start = datetime.datetime(dt.year, dt.month, dt.day)
+    day_end = day_start + datetime.timedelta(days=1)
+    start_offset = _get_wallclock_offset(day_start, tzinfo)
+    if _get_wallclock_offset(day_end, tzinfo) != start_offset:
+        return None
+    return start_offset
+
+
+def _get_wallclock_offset(dt, tzinfo):
+    local_dt = dt.replace(tzinfo=_utc).astimezone(tzinfo)
+    return local_dt.replace(tzinfo=None) - dt
+
+
+class LazyDatetime(object):
+    """ A UTC datetime that is parsed from its ISO-8601 string the first time it is used.
+    Behaves like the ``datetime.datetime`` returned by :py:func:`parse_utc_iso8601` .
+
+    Most tasks are loaded only to be rendered, or saved again without changes.
+    ``isoformat()`` returns the original string, so those never need to be parsed.
+
+    Example:
+
+        .. code-block:: python
+
+            >>> dt = LazyDatetime('2018-01-01T00:00:00+00:00')
+            >>> dt.isoformat()     # not parsed
+            '2018-01-01T00:00:00+00:00'
+            >>> dt.year            # parsed
+            2018
+
+    """
+    __slots__ = ('_isostr', '_datetime')
+
+    def __init__(self, datestr):
+        if not datestr.endswith('+00:00'):
+            raise RuntimeError('datestr is not localized to UTC')
+
+        # the format is checked now, so malformed dates are reported when their file is read
+        if not _utc_iso8601_regex.match(datestr):
+            raise ValueError('invalid ISO-8601 datestr: {}'.format(datestr))
+        self._isostr = datestr
+        self._datetime = None
+
+    @property
+    def datetime(self):
+        """ The parsed ``datetime.datetime`` object.
+        """
+        if self._datetime is None:
+            self._datetime = parse_utc_iso8601(self._isostr)
+        return self._datetime
+
+    @property
+    def tzinfo(self):
+        return _utc
+
+    def isoformat(self, *args, **kwargs):
+        if args or kwargs:
+            return self.datetime.isoformat(*args, **kwargs)
+        return self._isostr
+
+    def timetuple(self):
+        # python2's datetime defers comparisons to objects with a timetuple()
+        return self.datetime.timetuple()
+
+    def __getattr__(self, attr):
+        # private attrs are missing when copied/unpickled (before slots are set)
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.datetime, attr)
+
+    def __repr__(self):
+        return 'LazyDatetime({})'.format(repr(self._isostr))
+
+    def __str__(self):
+        return str(self.datetime)
+
+    def __hash__(self):
+        return hash(self.datetime)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyDatetime):
+            if other._isostr == self._isostr:
+                return True
+            other = other.datetime
+        elif not isinstance(other, datetime.datetime):
+            return False
+        return self.datetime == other
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        return self.datetime < _unwrap_datetime(other)
+
+    def __le__(self, other):
+        return self.datetime <= _unwrap_datetime(other)
+
+    def __gt__(self, other):
+        return self.datetime > _unwrap_datetime(other)
+
+    def __ge__(self, other):
+        return self.datetime >= _unwrap_datetime(other)
+
+    def __add__(self, other):
+        return self.datetime + other
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.datetime - _unwrap_datetime(other)
+
+    def __rsub__(self, other):
+        return other - self.datetime
+
+
+def _unwrap_datetime(obj):
+    if isinstance(obj, LazyDatetime):
+        return obj.datetime
+    return obj
 
 
 def parse_local_isodate(datestr):
@@ -49,6 +270,9 @@ class LocalTimezone(datetime.tzinfo):
     dst_diff = dst_offset - std_offset
     zero = datetime.timedelta(0)
 
+    _isdst_cache_size = 4096
+    _isdst_cache = {}  # {(2019, 7, 19, 7, 0): True, ...}
+
     def utcoffset(self, dt):
         if self._isdst(dt):
             return self.dst_offset
@@ -65,6 +289,17 @@ class LocalTimezone(datetime.tzinfo):
         return time.tzname[self._isdst(dt)]
 
     def _isdst(self, dt):
+        # DST changes on the hour (or half-hour), so all times within the same half-hour share it
+        key = (dt.year, dt.month, dt.day, dt.hour, dt.minute // 30)
+        isdst = self._isdst_cache.get(key)
+        if isdst is None:
+            isdst = self._calc_isdst(dt)
+            if len(self._isdst_cache) >= self._isdst_cache_size:
+                self._isdst_cache.clear()
+            self._isdst_cache[key] = isdst
+        return isdst
+
+    def _calc_isdst(self, dt):
         tt = (dt.year, dt.month, dt.day,
               dt.hour, dt.minute, dt.second,
               dt.weekday(), 0, 0)
@@ -87,3 +322,7 @@ class UTC(datetime.tzinfo):
         if tzinfo.__class__ == self.__class__:
             return True
         return False
+
+
+_utc = UTC()
+utc = _utc  # the shared UTC tzinfo, instead of creating a new one each time
@@ -1,32 +1,51 @@
 #!/usr/bin/env python
 import os
+import time
 import functools
 
 import vim
 
-from taskmage2.parser import iostream, parsers
-from taskmage2.asttree import renderers
+from taskmage2.parser import iostream, lexers, parsers
+from taskmage2.asttree import asttree, nodedata, renderers
 from taskmage2.parser import fmtdata
 from taskmage2.project import projects, taskfiles
-from taskmage2.utils import timezone
+from taskmage2.utils import buffers, filesystem, timezone
 
 
 _search_buffer = 'taskmage-search'
+_buffer_states = {}  # {bufnr: _BufferState}
+
+
+class _BufferState(object):
+    """ Per-buffer state kept between saves, so that only the lines changed since
+    the last save are re-lexed, and only the tasks changed since are re-rendered.
+    """
+    def __init__(self):
+        self.tasklist_lexer = lexers.IncrementalTaskList()
+        self.changedtick = None  # b:changedtick when `tasklist_lexer` was last updated
+        self.mtask_cache = renderers.RenderCache()  # lines of the last Mtask render
+        self.presave_ast = None  # (ast, changedtick) merged on presave, rendered on postsave
+        self.saved_ast = None  # (filesystem.stat_key(), ast) of the file, when it was last opened or saved
+
+
+def _get_buffer_state(bufnr):
+    if bufnr not in _buffer_states:
+        _buffer_states[bufnr] = _BufferState()
+    return _buffer_states[bufnr]
 
 
 def handle_open_mtask():
     """ converts buffer from Mtask(JSON) to TaskList(rst)
     """
-    # reading directly off disk is MUCH faster
-    with open(vim.current.buffer.name, 'r') as fd_py:
-        fd = iostream.FileDescriptor(fd_py)
-        ast = parsers.parse(fd, 'mtask')
-        render = ast.render(renderers.TaskList)
-
-    vim.current.buffer[:] = render
+    ast = _read_saved_ast(vim.current.buffer)
+    _set_buffer_lines(vim.current.buffer, ast.render(renderers.TaskList), 'open')
     vim.command('call taskmage#searchbuffer#pop_and_run_postcmds()')
     vim.command('set filetype=taskmage')
-    return render
+
+    # file was (re)loaded, start recording changes from here
+    _buffer_states.pop(vim.current.buffer.number, None)
+    _cache_saved_ast(vim.current.buffer, ast)
+    vim.command('call taskmage#changes#listen()')
 
 
 def handle_presave_mtask():
@@ -35,37 +54,173 @@ def handle_presave_mtask():
     """
 
     # convert vim-buffer to Mtask
-    fd = iostream.VimBuffer(vim.current.buffer)
-    buffer_ast = parsers.parse(fd, 'tasklist')
+    state = _get_buffer_state(vim.current.buffer.number)
+    state.presave_ast = None
+    tokens = _lex_tasklist_buffer(vim.current.buffer)
+    buffer_ast = parsers.parse_tokens(tokens)
+    cache = state.mtask_cache
+    context = nodedata.OperationContext()  # tasks changed by this save share a timestamp
 
     # merge overtop of savedfile if exists
     if not os.path.isfile(vim.current.buffer.name):
-        buffer_ast.finalize()
-        render = buffer_ast.render(renderers.Mtask)
+        buffer_ast.finalize(context)
+        ast = buffer_ast
     else:
-        with open(vim.current.buffer.name, 'r') as fd_py:
-            fd = iostream.FileDescriptor(fd_py)
-            saved_ast = parsers.parse(fd, 'mtask')
-        saved_ast.update(buffer_ast)
-        saved_ast.finalize()
-        render = saved_ast.render(renderers.Mtask)
+        saved_ast = _read_saved_ast(vim.current.buffer)
+        saved_ast.update(buffer_ast, context)
+        saved_ast.finalize(context)
+        ast = saved_ast
 
     # replace vim-buffer with updated Mtask render
-    vim.current.buffer[:] = render
-    return render
+    _set_buffer_lines(vim.current.buffer, ast.render(renderers.Mtask, cache=cache), 'presave')
+
+    # the written file is this render, postsave renders the tasklist from the same AST
+    state.presave_ast = (ast, vim.eval('b:changedtick'))
 
 
 def handle_postsave_mtask():
     """ converts buffer back from Mtask(JSON) to TaskList(rst) after save.
     """
-    render = handle_open_mtask()
-    return render
+    buf = vim.current.buffer
+    state = _get_buffer_state(buf.number)
+    (ast, changedtick) = state.presave_ast or (None, None)
+    state.presave_ast = None
+
+    # re-read the file if the buffer was changed after presave (ex: another BufWritePre autocmd).
+    # writing the buffer resets 'modified', which increments b:changedtick once.
+    if ast is None or int(vim.eval('b:changedtick')) - int(changedtick) > 1:
+        with open(buf.name, 'rb') as fd_py:
+            fd = iostream.TextBuffer(fd_py.read())
+        ast = parsers.parse(fd, 'mtask')
+    render = ast.render(renderers.TaskList)
+
+    # unless a copy was written elsewhere (ex: ``:w other.mtask`` ), the buffer's file is `ast`
+    if os.path.abspath(vim.eval('expand("<afile>:p")')) == os.path.abspath(buf.name):
+        _cache_saved_ast(buf, ast)
+
+    _set_buffer_lines(buf, render, 'postsave')
+    vim.command('call taskmage#searchbuffer#pop_and_run_postcmds()')
+    vim.command('set filetype=taskmage')
+
+    # the render only differs from the lines lexed on presave
+    # where ids were added, so those are the only lines re-lexed.
+    vim.eval('taskmage#changes#pop()')
+    state.tasklist_lexer.read(render)
+    state.changedtick = vim.eval('b:changedtick')
+
+
+def handle_wipeout_mtask(bufnr):
+    """ discards the state kept for a buffer when it is wiped out.
+    """
+    _buffer_states.pop(int(bufnr), None)
+
+
+def _lex_tasklist_buffer(buf):
+    """ Lexes a vim buffer in the TaskList format, re-lexing only the lines
+    that changed since it was last lexed.
+
+    Args:
+        buf (vim.api.buffer.Buffer):
+            the buffer to lex
+
+    Returns:
+        list: a list of token dictionaries. See :py:obj:`taskmage2.parser.lexers._Lexer` .
+    """
+    state = _get_buffer_state(buf.number)
+    lexer = state.tasklist_lexer
+    changedtick = vim.eval('b:changedtick')
+
+    if changedtick == state.changedtick:
+        tokens = lexer.data
+    elif int(vim.eval('taskmage#changes#is_listening()')):
+        changes = vim.eval('taskmage#changes#pop()')
+        tokens = lexer.read_changes(buf, changes)
+    else:
+        tokens = lexer.read(buf[:])
+
+    state.changedtick = changedtick
+    return tokens
+
+
+def _read_saved_ast(buf):
+    """ Returns the AST of a buffer's file. The file is only parsed if it was
+    modified since the buffer last opened or saved it (see :py:func:`_cache_saved_ast` ).
+
+    The cached AST is removed from the cache, so the caller is free to modify it.
+
+    Args:
+        buf (vim.api.buffer.Buffer):
+            the buffer whose file to read
+
+    Returns:
+        taskmage2.asttree.asttree.AbstractSyntaxTree: the AST of the saved file
+    """
+    state = _get_buffer_state(buf.number)
+    (key, ast) = state.saved_ast or (None, None)
+    state.saved_ast = None
+    if key is not None and key == filesystem.stat_key(buf.name):
+        return ast
+
+    # reading directly off disk is MUCH faster
+    with open(buf.name, 'rb') as fd_py:
+        fd = iostream.TextBuffer(fd_py.read())
+    return parsers.parse(fd, 'mtask')
+
+
+def _cache_saved_ast(buf, ast):
+    """ Caches the AST of a buffer's file, keyed by the file's stat, so it is not parsed again
+    unless another process modifies the file (see :py:func:`_read_saved_ast` ).
+
+    Args:
+        buf (vim.api.buffer.Buffer):
+            the buffer whose file `ast` was read from, or written to
+
+        ast (taskmage2.asttree.asttree.AbstractSyntaxTree):
+            an AST that renders the file's current contents
+    """
+    _get_buffer_state(buf.number).saved_ast = (filesystem.stat_key(buf.name), ast)
+
+
+def _set_buffer_lines(buf, lines, label):
+    """ Replaces the contents of a vim buffer, only modifying the lines that changed.
+    The number of lines changed, and the time it took are profiled (see :py:func:`_echom_profile` ).
+
+    Args:
+        buf (vim.api.buffer.Buffer):
+            the buffer to modify
+
+        lines (list):
+            the new contents of the buffer
+
+        label (str):
+            identifies the change in the profiling output ``(ex: 'presave')``
+    """
+    start = time.time()
+    touched = buffers.patch_buffer(buf, lines)
+    _echom_profile('{}: {} lines changed in {:.3f}s'.format(label, touched, time.time() - start))
 
 
-def archive_completed_tasks():
+def _echom_profile(msg):
+    """ Adds a message to vim's message-history (see ``:messages`` ), if ``g:taskmage_profile`` is set.
+
+    Args:
+        msg (str): ``(ex: 'presave: 3 lines changed in 0.002s' )``
+    """
+    if int(vim.eval('g:taskmage_profile')):
+        vim.command("echom '[taskmage] {}'".format(msg.replace("'", "''")))
+
+
+def archive_completed_tasks(paramstr=''):
     """ saves current buffer, then archives all entirely-complete task-branches
     within the tree.
+
+    Args:
+        paramstr (str): ``(ex: 'nested:1' )``
+            if ``nested:1`` , completed task-branches within incomplete
+            sections are archived as well.
     """
+    nested = 'nested:1' in paramstr.split()
+
     # save file, so saved copy is up to date
     vimfile = os.path.abspath(vim.current.buffer.name)
     if not os.path.isfile(vimfile):
@@ -74,16 +229,12 @@ def archive_completed_tasks():
 
     # archive completed tasks on disk
     project = projects.Project.from_path(vimfile)
-    project.archive_completed(vimfile)
+    project.archive_completed(vimfile, nested=nested)
 
     # reload from disk
-    with open(vimfile, 'r') as fd_py:
-        fd = iostream.FileDescriptor(fd_py)
-        ast = parsers.parse(fd, 'mtask')
-        render = ast.render(renderers.TaskList)
-
-    vim.current.buffer[:] = render
-    return render
+    ast = _read_saved_ast(vim.current.buffer)
+    _set_buffer_lines(vim.current.buffer, ast.render(renderers.TaskList), 'archive')
+    _cache_saved_ast(vim.current.buffer, ast)
 
 
 def create_project():
@@ -139,11 +290,11 @@ def search_keyword(searchterm):
 
     # get tasks (and format as lines)
     taskfilters = [functools.partial(taskfiles.TaskFilter.search, searchterm)]
-    lines = []
+    results = []
     for taskfile in taskfiles_:
         for task in taskfile.filter_tasks(taskfilters):
-            line = _format_searchresult(str(taskfile), task)
-            lines.append(line)
+            results.append((str(taskfile), task))
+    lines = _format_searchresults(results)
 
     # show/populate searchbuffer
     _set_searchbuffer_contents(lines)
@@ -219,13 +370,130 @@ def search_latest(filter_paramstr=None):
 
     # sort tasks by date-modified
     tasks_w_filepath.sort(key=lambda x: x['data']['modified'], reverse=True)
-    lines = [_format_searchresult(t['filepath'], t) for t in tasks_w_filepath]
+    lines = _format_searchresults([(t['filepath'], t) for t in tasks_w_filepath])
 
     # show/populate searchbuffer
     _set_searchbuffer_contents(lines)
 
 
-def _format_searchresult(filepath, node_dict):
+def show_diff(paramstr=''):
+    """ Lists the changes between two versions of a taskfile in the search-buffer.
+
+    Args:
+        paramstr (str): ``(ex: '', 'old.mtask new.mtask' )``
+            if empty, compares the current buffer with it's saved file.
+            Otherwise, compares two .mtask files.
+    """
+    filepaths = [os.path.abspath(os.path.expanduser(path)) for path in paramstr.split()]
+    if not filepaths:
+        filepath = os.path.abspath(vim.current.buffer.name)
+        old_ast = _read_mtask_ast(filepath)
+        # a separate lexer, the buffer's changes are left for the next save (see _lex_tasklist_buffer)
+        new_ast = parsers.parse_tokens(lexers.IncrementalTaskList().read(vim.current.buffer[:]))
+        filepaths = [filepath, filepath]
+    elif len(filepaths) == 2:
+        old_ast = _read_mtask_ast(filepaths[0])
+        new_ast = _read_mtask_ast(filepaths[1])
+    else:
+        print('[taskmage] expected 0 or 2 filepaths. received: {}'.format(paramstr))
+        return
+
+    changeset = asttree.diff(old_ast, new_ast)
+    if not changeset:
+        print('[taskmage] no changes')
+        return
+
+    lines = _format_changeset(changeset, (filepaths[0], old_ast), (filepaths[1], new_ast))
+    _set_searchbuffer_contents(lines)
+
+
+def _read_mtask_ast(filepath):
+    """ Returns the AST of a .mtask file (empty if the file does not exist).
+    """
+    if not os.path.isfile(filepath):
+        return asttree.AbstractSyntaxTree()
+    with open(filepath, 'rb') as fd_py:
+        fd = iostream.TextBuffer(fd_py.read())
+    return parsers.parse(fd, 'mtask')
+
+
+def _format_changeset(changeset, old, new):
+    """ Formats a changeset for the search-buffer, one line per changed node.
+
+    Args:
+        changeset (taskmage2.asttree.asttree.Changeset):
+            the changes from the old tree to the new tree
+
+        old (tuple):
+            ``(filepath, ast)`` of the old tree
+
+        new (tuple):
+            ``(filepath, ast)`` of the new tree
+
+    Returns:
+        list: search-buffer lines (see :py:func:`_format_searchresult` ), followed by the kind of change
+
+            .. code-block:: python
+
+                [
+                    '||/path/to/file.mtask|988D1C7D...|(2019-01-01 1:00)| * do something  [modified: name]',
+                    ...
+                ]
+
+    """
+    changes = {}  # {id: ['added', 'modified: name,status', ...]}
+    for (change, ids) in (('added', changeset.added), ('moved', changeset.moved), ('reordered', changeset.reordered)):
+        for _id in ids:
+            changes.setdefault(_id, []).append(change)
+    for (_id, fields) in changeset.modified.items():
+        changes.setdefault(_id, []).append('modified: {}'.format(','.join(fields)))
+
+    results = []
+    (filepath, ast) = new
+    for (node, parent, depth, index) in ast.walk():
+        if node.id in changes:
+            results.append((filepath, node, ', '.join(changes[node.id])))
+
+    (filepath, ast) = old
+    for _id in changeset.removed:
+        results.append((filepath, ast.get(_id), 'removed'))
+
+    # local dates are converted all at once, see _format_searchresults()
+    modified_dates = [getattr(node.data, 'modified', None) for (_, node, _) in results]
+    modified_strs = iter(timezone.format_local_isodates([dt.isoformat() for dt in modified_dates if dt]))
+
+    lines = []
+    for ((filepath, node, change), modified) in zip(results, modified_dates):
+        node_dict = {'_id': node.id, 'name': node.name, 'data': node.data.as_dict()}
+        modified_str = next(modified_strs) if modified else ''
+        lines.append('{}  [{}]'.format(_format_searchresult(filepath, node_dict, modified_str), change))
+    return lines
+
+
+def _format_searchresults(results):
+    """ Formats nodes for the search-buffer.
+
+    Args:
+        results (list):
+            ``[(filepath, node_dict), ...]`` . See :py:func:`_format_searchresult`
+
+    Returns:
+        list: ``['||/path/to/file.mtask|988D1C7D019D469E8767821FCB50F301|2019-01-01 1:00| do something', ...]``
+    """
+    # local dates are converted all at once, it is much faster than one at a time
+    modified_dates = [node_dict['data']['modified'] for (_, node_dict) in results if 'modified' in node_dict['data']]
+    modified_strs = iter(timezone.format_local_isodates(modified_dates, '%Y-%m-%d %H:%M'))
+
+    lines = []
+    for (filepath, node_dict) in results:
+        modified_str = ''
+        if 'modified' in node_dict['data']:
+            modified_str = next(modified_strs)
+        lines.append(_format_searchresult(filepath, node_dict, modified_str))
+    return lines
+
+
+def _format_searchresult(filepath, node_dict, modified_str=''):
     """ Formats a node for the search-buffer.
 
     Args:
@@ -235,6 +503,9 @@ def _format_searchresult(filepath, node_dict):
         node_dict (dict):
             a node dictionary. See :py:mod:`taskmage2.asttree.nodedata`
 
+        modified_str (str):
+            the node's modified-date, in local time ``(ex: '2019-01-01 1:00' )``
+
     Returns:
         str:
 
@@ -247,12 +518,6 @@ def _format_searchresult(filepath, node_dict):
         status_ch = fmtdata.TaskList.statuschar(status)
         desc = '{} {}'.format(status_ch, desc)
 
-    modified_str = ''
-    if 'modified' in node_dict['data']:
-        modified = timezone.parse_utc_iso8601(node_dict['data']['modified'])
-        modified_local = modified.astimezone(timezone.LocalTimezone())
-        modified_str = modified_local.strftime('%Y-%m-%d %H:%M')
-
     result = r'||{filepath}|{uuid}|({modified})| {desc}'.format(
         filepath=str(filepath),
         uuid=node_dict['_id'],
@@ -69,6 +69,31 @@ class Test_Node(object):
             assert task.type == 'file'
             assert task.name == 'path/to/file.mtask'
 
+        def test_nodetype_enum(self):
+            task = astnode.Node(
+                _id=None,
+                ntype=astnode.NodeType.section,
+                name='My Section',
+            )
+            assert task.type == 'section'
+
+        def test_invalid_nodetype(self):
+            with pytest.raises(ValueError):
+                astnode.Node(
+                    _id=None,
+                    ntype='chapter',
+                    name='My Chapter',
+                )
+
+        def test_has_no_instance_dict(self):
+            # nodes are __slots__ only, to keep large trees small
+            task = astnode.Node(
+                _id=None,
+                ntype='section',
+                name='My Section',
+            )
+            assert not hasattr(task, '__dict__')
+
     class Test__repr__:
         def test_no_parent(self):
             dt = datetime.datetime(1970, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
@@ -345,6 +370,18 @@ class Test_Node(object):
             with pytest.raises(TypeError):
                 task.data = new_data
 
+    class Test_children:
+        def test_list_is_wrapped(self):
+            node = astnode.Node(_id=None, ntype='section', name='A')
+            node.children = []
+            assert isinstance(node.children, astnode._ChildList)
+
+        def test_changes_are_counted(self):
+            node = astnode.Node(_id=None, ntype='section', name='A')
+            modcount = astnode._ChildList.modcount
+            node.children.append(astnode.Node(_id=None, ntype='section', name='B'))
+            assert astnode._ChildList.modcount > modcount
+
     class Test_touch:
         def test_assigns_id_if_missing(self):
             task = astnode.Node(
@@ -377,11 +414,14 @@ class Test_Node(object):
                     'finished': None,
                     'modified': None,
                 },
-                children=[mock.Mock(), mock.Mock()],
+                children=[
+                    astnode.Node(_id=None, ntype='task', name='task B', data={'status': 'todo'}),
+                    astnode.Node(_id='C', ntype='task', name='task C', data={'status': 'todo'}),
+                ],
             )
 
             task.touch()
-            assert all([child.touch.called for child in task.children])
+            assert all([child.id and child.data.modified for child in task.children])
 
     class Test_finalize:
         def test_assigns_id_if_missing(self):
@@ -415,11 +455,202 @@ class Test_Node(object):
                     'finished': None,
                     'modified': None,
                 },
-                children=[mock.Mock(), mock.Mock()],
+                children=[
+                    astnode.Node(_id=None, ntype='task', name='task B', data={'status': 'todo'}),
+                    astnode.Node(_id='C', ntype='task', name='task C', data={'status': 'done'}),
+                ],
             )
 
             task.finalize()
-            assert all([child.finalize.called for child in task.children])
+            assert all([child.id and child.data.created for child in task.children])
+            assert task[1].data.finished
+
+        def test_skips_unchanged_subtree(self):
+            child = astnode.Node(_id='B', ntype='task', name='task B', data={'status': 'todo'})
+            task = astnode.Node(_id='A', ntype='section', name='A', children=[child])
+            task.finalize()
+
+            with mock.patch.object(nodedata.TaskData, 'finalize') as mock_finalize:
+                task.finalize()
+            assert not mock_finalize.called
+
+        def test_repeated_after_child_changed(self):
+            child = astnode.Node(_id='B', ntype='task', name='task B', data={'status': 'todo'})
+            task = astnode.Node(_id='A', ntype='section', name='A', children=[child])
+            task.finalize()
+
+            child.data = nodedata.TaskData(status='done', created=child.data.created, modified=child.data.modified)
+            task.finalize()
+            assert child.data.finished
+
+    class Test_digest:
+        def get_tree(self, name='task C', status='todo'):
+            return astnode.Node(_id='A', ntype='section', name='A', children=[
+                astnode.Node(_id='B', ntype='task', name='task B', data={'status': 'todo'}, children=[
+                    astnode.Node(_id='C', ntype='task', name=name, data={'status': status}),
+                ]),
+            ])
+
+        def test_same_for_equal_trees(self):
+            assert self.get_tree().digest() == self.get_tree().digest()
+
+        def test_differs_when_name_differs(self):
+            assert self.get_tree().digest() != self.get_tree(name='task D').digest()
+
+        def test_differs_when_status_differs(self):
+            assert self.get_tree().digest() != self.get_tree(status='done').digest()
+
+        def test_is_sha1(self):
+            assert len(self.get_tree().digest()) == 20
+
+        def test_differs_when_text_moves_between_fields(self):
+            node_a = astnode.Node(_id='A', ntype='task', name="', 'B", data={'status': 'todo'})
+            node_b = astnode.Node(_id="A', '", ntype='task', name='B', data={'status': 'todo'})
+            assert node_a.digest() != node_b.digest()
+
+        def test_differs_when_dates_differ(self):
+            tree = self.get_tree()
+            digest = tree.digest()
+            tree.finalize()
+            assert tree.digest() != digest
+
+        def test_differs_when_children_reordered(self):
+            tree = self.get_tree()
+            tree.children.append(astnode.Node(_id='D', ntype='task', name='task D', data={'status': 'todo'}))
+            digest = tree.digest()
+            tree.children = list(reversed(tree.children))
+            assert tree.digest() != digest
+
+        def test_invalidated_when_descendant_renamed(self):
+            tree = self.get_tree()
+            tree.digest()
+            tree[0][0].name = 'task D'
+            assert tree.digest() == self.get_tree(name='task D').digest()
+
+        def test_invalidated_when_child_added(self):
+            tree = self.get_tree()
+            digest = tree.digest()
+            tree[0].children.append(astnode.Node(_id='D', ntype='task', name='task D', data={'status': 'todo'}))
+            assert tree.digest() != digest
+
+        def test_sets_parent_of_children(self):
+            tree = self.get_tree()
+            assert tree[0][0].parent is tree[0]
+
+    class Test_version:
+        def get_tree(self):
+            return astnode.Node(_id='A', ntype='section', name='A', children=[
+                astnode.Node(_id='B', ntype='task', name='task B', data={'status': 'todo'}, children=[
+                    astnode.Node(_id='C', ntype='task', name='task C', data={'status': 'todo'}),
+                ]),
+            ])
+
+        def get_chain(self, depth):
+            node = None
+            for i in range(depth):
+                children = [node] if node else None
+                node = astnode.Node(_id=str(i), ntype='task', name='task', data={'status': 'todo'}, children=children)
+            return node
+
+        def test_new_node_is_clean(self):
+            tree = self.get_tree()
+            assert isinstance(tree.version, int)
+            assert not tree.dirty
+
+        def test_new_node_is_newer_than_existing_nodes(self):
+            tree = self.get_tree()
+            assert self.get_tree().version > tree.version
+
+        @pytest.mark.parametrize('attr, value', (
+            ('name', 'task D'),
+            ('type', 'section'),
+            ('data', nodedata.TaskData(status='done')),
+            ('children', []),
+        ))
+        def test_change_propagates_to_ancestors(self, attr, value):
+            tree = self.get_tree()
+            versions = [node.version for node in (tree, tree[0], tree[0][0])]
+            setattr(tree[0][0], attr, value)
+            new_versions = [node.version for node in (tree, tree[0], tree[0][0])]
+            assert all([new_version > version for (version, new_version) in zip(versions, new_versions)])
+            assert tree.dirty and tree[0].dirty and tree[0][0].dirty
+
+        def test_unchanged_value_is_not_a_change(self):
+            tree = self.get_tree()
+            version = tree.version
+            tree[0].name = 'task B'
+            tree[0].type = 'task'
+            tree[0].data = tree[0].data
+            assert tree.version == version
+            assert not tree.dirty
+
+        def test_child_added(self):
+            tree = self.get_tree()
+            (version, child_version) = (tree.version, tree[0][0].version)
+            tree[0].children.append(astnode.Node(_id='D', ntype='task', name='task D', data={'status': 'todo'}))
+            assert tree.version > version
+            assert tree[0][0].version == child_version
+            assert not tree[0][0].dirty
+
+        def test_child_removed(self):
+            tree = self.get_tree()
+            version = tree.version
+            tree[0].children.pop()
+            assert tree.version > version
+
+        def test_repeated_changes_increase_version(self):
+            tree = self.get_tree()
+            tree[0][0].name = 'task D'
+            version = tree.version
+            tree[0][0].name = 'task E'
+            assert tree.version > version
+
+        def test_mark_clean_clears_descendants(self):
+            tree = self.get_tree()
+            tree[0][0].name = 'task D'
+            version = tree.version
+            tree.mark_clean()
+            assert not any([tree.dirty, tree[0].dirty, tree[0][0].dirty])
+            assert tree.version == version
+
+        def test_change_after_mark_clean_is_dirty(self):
+            tree = self.get_tree()
+            tree[0][0].name = 'task D'
+            tree.mark_clean()
+            tree[0][0].name = 'task E'
+            assert tree.dirty and tree[0].dirty
+
+        def test_parent_of_dirty_child_is_dirty(self):
+            child = astnode.Node(_id='C', ntype='task', name='task C', data={'status': 'todo'})
+            child.name = 'task D'
+            parent = astnode.Node(_id='B', ntype='task', name='task B', data={'status': 'todo'}, children=[child])
+            assert parent.dirty
+
+        def test_invalidate_stops_at_invalidated_parent(self):
+            tree = self.get_chain(5000)
+            leaf = [node for (node, _, _, _) in astnode.walk([tree])][-1]
+            leaf.name = 'task D'
+            with mock.patch.object(astnode, '_is_invalidated', wraps=astnode._is_invalidated) as is_invalidated:
+                leaf.name = 'task E'
+            assert is_invalidated.call_count == 1
+            assert tree.dirty
+
+        def test_finalize_deep_chain_is_linear(self):
+            tree = self.get_chain(5000)
+            with mock.patch.object(astnode, '_is_invalidated', wraps=astnode._is_invalidated) as is_invalidated:
+                tree.finalize()
+            # about one parent visited per changed node, instead of every ancestor of each changed node
+            assert is_invalidated.call_count <= 2 * 5000
+
+        def test_touch_deep_chain_is_linear(self):
+            tree = self.get_chain(5000)
+            tree.finalize()
+            tree.mark_clean()
+            tree.version
+            with mock.patch.object(astnode, '_is_invalidated', wraps=astnode._is_invalidated) as is_invalidated:
+                tree.touch()
+            assert is_invalidated.call_count <= 2 * 5000
+            assert tree.dirty
 
     class Test_update:
         def test_update_type_works(self):
@@ -540,13 +771,18 @@ class Test_Node(object):
                 },
                 children=None,
             )
+            node_A = astnode.Node(**params)
+            node_B = astnode.Node(**params)
             with mock.patch('{}.isinstance'.format(ns), return_value=True):
                 mock_data = mock.Mock(spec='{}.TaskData'.format(nodedata.__name__))
                 mock_data.update = mock.Mock()
+                # read by Node.digest(), differs from node_B
+                mock_data.status = 'done'
+                mock_data.created = None
+                mock_data.finished = False
+                mock_data.modified = None
 
-                node_A = astnode.Node(**params)
                 node_A._data = mock_data
-                node_B = astnode.Node(**params)
 
                 node_A.update(node_B)
                 assert mock_data.update.called_with(node_B)
@@ -670,6 +906,20 @@ class Test_Node(object):
             old_node.update(new_node)
             assert len(old_node.children) == 2
             assert old_node.children[1].id == 'A58ACFFF058849B291D65DFBBC146BB8'
+            assert old_node.children[0].parent is old_node
+
+        def test_update_moved_grandchild(self):
+            def get_section(_id, children=None):
+                return astnode.Node(_id=_id, ntype='section', name=_id, children=children)
+
+            old_node = get_section('P', [get_section('A', [get_section('B')])])
+            new_node = get_section('P', [get_section('A'), get_section('B')])
+            saved_B = old_node[0][0]
+
+            moved = old_node.update(new_node)
+            assert moved == ['B']
+            assert old_node[1] is saved_B
+            assert saved_B.parent is old_node
 
         def test_update_name_also_updates_modified(self):
             params = dict(
@@ -689,6 +939,23 @@ class Test_Node(object):
             node_A.update(node_B)
             assert node_A.data.modified != node_B.data.modified
 
+        def test_update_unchanged_subtree_is_skipped(self):
+            def get_tree():
+                return astnode.Node(_id='A', ntype='section', name='A', children=[
+                    astnode.Node(_id='B', ntype='task', name='task B', data={'status': 'done'}),
+                ])
+
+            old_node = get_tree()
+            old_node.finalize()
+            (old_data, old_children) = (old_node[0].data, old_node.children)
+
+            # as read from a tasklist, without dates
+            with mock.patch.object(nodedata.TaskData, 'update') as mock_update:
+                old_node.update(get_tree())
+            assert not mock_update.called
+            assert old_node.children is old_children
+            assert old_node[0].data is old_data
+
     class Test_is_complete:
         def test_taskchain_completion_file(self):
             """ files must resolve as false, at least until
@@ -853,3 +1120,48 @@ class Test_Node(object):
                 },
             )
             assert node.parentid is None
+
+
+class Test_get_completion(object):
+    def test_matches_is_complete(self):
+        def get_task(_id, status, children=None):
+            return astnode.Node(_id=_id, ntype='task', name=_id, data={'status': status}, children=children)
+
+        nodes = [
+            astnode.Node(_id='S', ntype='section', name='S', children=[
+                get_task('A', 'done', [get_task('B', 'skip')]),
+                get_task('C', 'done', [get_task('D', 'todo')]),
+                astnode.Node(_id='T', ntype='section', name='T'),
+            ]),
+            astnode.Node(_id='F', ntype='file', name='F', children=[get_task('E', 'done')]),
+        ]
+        complete = astnode.get_completion(nodes)
+
+        allnodes = [node for (node, parent, depth) in astnode.build_index(nodes).values()]
+        assert len(complete) == len(allnodes)
+        for node in allnodes:
+            assert complete[id(node)] == node.is_complete()
+
+
+class Test_walk(object):
+    def test_prune_skips_children(self):
+        nodes = [
+            astnode.Node(_id='A', ntype='section', name='A', children=[
+                astnode.Node(_id='B', ntype='section', name='B'),
+            ]),
+            astnode.Node(_id='C', ntype='section', name='C', children=[
+                astnode.Node(_id='D', ntype='section', name='D'),
+            ]),
+        ]
+        for order in ('pre', 'post'):
+            walked = astnode.walk(nodes, order, prune=lambda entry: entry[0].id == 'A')
+            assert sorted([node.id for (node, _, _, _) in walked]) == ['A', 'C', 'D']
+
+    def test_children_read_after_yield_in_pre_order(self):
+        nodes = [astnode.Node(_id='A', ntype='section', name='A')]
+        walked = []
+        for (node, parent, depth, index) in astnode.walk(nodes):
+            walked.append(node.id)
+            if node.id == 'A':
+                node.children.append(astnode.Node(_id='B', ntype='section', name='B'))
+        assert walked == ['A', 'B']
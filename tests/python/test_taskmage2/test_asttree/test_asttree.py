@@ -1,7 +1,10 @@
+import datetime
+
 import pytest
 import mock
 
-from taskmage2.asttree import asttree, astnode, renderers
+from taskmage2.asttree import asttree, astnode, nodedata, renderers
+from taskmage2.utils import timezone
 
 
 # =====
@@ -18,11 +21,36 @@ class FakeNode(object):
 
     def __init__(self, id_):
         self.id = id_
+        self.children = []
 
     def __eq__(self, id_):
         return id_ == self.id
 
 
+def get_section(_id, children=None):
+    return astnode.Node(_id=_id, ntype='section', name=_id, children=children)
+
+
+def get_task(_id, created=None, status='todo', children=None):
+    data = {'status': status, 'created': created, 'finished': False, 'modified': None}
+    return astnode.Node(_id=_id, ntype='task', name=_id, data=data, children=children)
+
+
+def get_tree():
+    """ ::
+
+        A
+            B
+                C
+        D
+    """
+    section_C = get_section('C')
+    section_B = get_section('B', [section_C])
+    section_A = get_section('A', [section_B])
+    section_D = get_section('D')
+    return asttree.AbstractSyntaxTree([section_A, section_D])
+
+
 @pytest.fixture
 def renderer():
     class Renderer(renderers.Renderer):
@@ -102,6 +130,11 @@ class Test_AbstractSyntaxTree(object):
             assert all([node.touch.called for node in AST])
 
     class Test_finalize:
+        def test_nodes_share_timestamp(self):
+            AST = asttree.AbstractSyntaxTree([get_task('A', children=[get_task('B')]), get_task('C')])
+            AST.finalize()
+            assert AST[0].data.created == AST[0][0].data.created == AST[1].data.created
+
         def test_children_run_finalize(self):
             AST = asttree.AbstractSyntaxTree()
             AST.data = [mock.Mock(), mock.Mock()]
@@ -110,6 +143,17 @@ class Test_AbstractSyntaxTree(object):
             assert all([node.finalize.called for node in AST])
 
     class Test_update:
+        def test_shares_timestamp_with_finalize(self):
+            created = datetime.datetime(2018, 1, 1, tzinfo=timezone.UTC())
+            AST = asttree.AbstractSyntaxTree([get_task('A', created=created), get_task('B', created=created)])
+            AST.finalize()
+            other_ast = asttree.AbstractSyntaxTree([get_task('A', status='done'), get_task('B'), get_task('C')])
+            context = nodedata.OperationContext()
+            AST.update(other_ast, context)
+            AST.finalize(context)
+            assert AST[0].data.modified == AST[0].data.finished == AST[2].data.created == context.utcnow
+            assert AST[1].data.modified != context.utcnow
+
         def test_update_removes_nodes(self):
             AST_A = asttree.AbstractSyntaxTree()
             AST_A.data = [FakeNode('1'), FakeNode('2'), FakeNode('3')]
@@ -161,6 +205,48 @@ class Test_AbstractSyntaxTree(object):
             AST_A.update(AST_B)
             assert AST_A.data == [FakeNode('2'), FakeNode('1')]
 
+        def test_update_merges_moved_task(self):
+            created = datetime.datetime(2018, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
+            AST_A = asttree.AbstractSyntaxTree([
+                get_section('A', [get_task('T', created=created)]),
+                get_section('B'),
+            ])
+            AST_B = asttree.AbstractSyntaxTree([
+                get_section('A'),
+                get_section('B', [get_task('T')]),
+            ])
+            saved_task = AST_A.get('T')
+
+            moved = AST_A.update(AST_B)
+            assert moved == ['T']
+            assert AST_A[1][0] is saved_task
+            assert saved_task.parent is AST_A[1]
+            assert saved_task.data.created == created
+            assert AST_A[0].children == []
+
+        def test_update_merges_task_moved_beneath_new_node(self):
+            created = datetime.datetime(2018, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
+            AST_A = asttree.AbstractSyntaxTree([get_task('T', created=created)])
+            AST_B = asttree.AbstractSyntaxTree([get_section('N', [get_task('T')])])
+
+            moved = AST_A.update(AST_B)
+            assert moved == ['T']
+            assert AST_A[0].id == 'N'
+            assert AST_A[0][0].data.created == created
+
+        def test_update_unmoved_tasks_are_not_reported(self):
+            AST_A = get_tree()
+            assert AST_A.update(get_tree()) == []
+
+        def test_update_duplicate_id_is_merged_once(self):
+            created = datetime.datetime(2018, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
+            AST_A = asttree.AbstractSyntaxTree([get_task('T', created=created)])
+            AST_B = asttree.AbstractSyntaxTree([get_task('T'), get_task('T')])
+
+            AST_A.update(AST_B)
+            assert AST_A[0] is not AST_A[1]
+            assert AST_A[0].data.created == created
+
     class Test_get_completed_taskchains:
         def test_filters_incompleted_child_taskchains(self):
             """ Retrieve all top-level task-nodes whose self/children are all completed.
@@ -179,18 +265,353 @@ class Test_AbstractSyntaxTree(object):
 
     class Test_archive_completed:
         def test_only_completed_taskchains_archived(self):
-            data = [mock.Mock(), mock.Mock(), mock.Mock()]
-            completed = [data[1]]
+            data = [get_task('A'), get_task('B', status='done'), get_task('C')]
 
             AST = asttree.AbstractSyntaxTree()
             AST.data = data[:]
-            with mock.patch(
-                '{}.AbstractSyntaxTree.get_completed_taskchains'.format(asttree.__name__),
-                return_value=completed
-            ):
-                archive_ast = AST.archive_completed()
+            archive_ast = AST.archive_completed()
 
             assert archive_ast.data == [data[1]]
             assert AST.data == [data[0], data[2]]
 
+        def test_adjacent_completed_taskchains_archived(self):
+            data = [get_task('A', status='done'), get_task('B', status='skip'), get_task('C')]
+
+            AST = asttree.AbstractSyntaxTree(data[:])
+            archive_ast = AST.archive_completed()
+
+            assert archive_ast.data == [data[0], data[1]]
+            assert AST.data == [data[2]]
+
+        def test_taskchain_with_incomplete_child_not_archived(self):
+            AST = asttree.AbstractSyntaxTree([get_task('A', status='done', children=[get_task('B')])])
+            archive_ast = AST.archive_completed()
+            assert archive_ast.data == []
+            assert [node.id for node in AST] == ['A']
+
+        def test_appends_to_archive_ast(self):
+            archive_ast = asttree.AbstractSyntaxTree([get_task('A', status='done')])
+            AST = asttree.AbstractSyntaxTree([get_task('B', status='done')])
+            AST.archive_completed(archive_ast)
+            assert [node.id for node in archive_ast] == ['A', 'B']
+
+        def test_nested_taskchains_not_archived_by_default(self):
+            AST = asttree.AbstractSyntaxTree([get_section('S', [get_task('A', status='done'), get_task('B')])])
+            archive_ast = AST.archive_completed()
+            assert archive_ast.data == []
+            assert [node.id for node in AST[0].children] == ['A', 'B']
+
+        def test_nested_archives_taskchains_in_incomplete_sections(self):
+            AST = asttree.AbstractSyntaxTree([
+                get_section('S', [
+                    get_task('A', status='done'),
+                    get_section('T', [get_task('B'), get_task('C', status='done')]),
+                ]),
+            ])
+            archive_ast = AST.archive_completed(nested=True)
+
+            assert [node.id for node in AST[0].children] == ['T']
+            assert [node.id for node in AST[0][0].children] == ['B']
+            assert [node.id for node in archive_ast] == ['S']
+            assert [node.id for node in archive_ast[0].children] == ['A', 'T']
+            assert [node.id for node in archive_ast[0][1].children] == ['C']
+            assert archive_ast.parent_of('C') is archive_ast[0][1]
+            assert AST[0] is not archive_ast[0]
+
+        def test_nested_ignores_taskchains_within_incomplete_tasks(self):
+            AST = asttree.AbstractSyntaxTree([get_task('A', children=[get_task('B', status='done')])])
+            archive_ast = AST.archive_completed(nested=True)
+            assert archive_ast.data == []
+
+        def test_nested_reuses_archived_sections(self):
+            archive_ast = asttree.AbstractSyntaxTree([get_section('S', [get_task('A', status='done')])])
+            AST = asttree.AbstractSyntaxTree([get_section('S', [get_task('B', status='done'), get_task('C')])])
+
+            AST.archive_completed(archive_ast, nested=True)
+            assert [node.id for node in archive_ast] == ['S']
+            assert [node.id for node in archive_ast[0].children] == ['A', 'B']
+
+        def test_completed_section_merged_with_archived_section(self):
+            archive_ast = asttree.AbstractSyntaxTree([get_section('S', [get_task('A', status='done')])])
+            AST = asttree.AbstractSyntaxTree([get_section('S', [get_task('B', status='done')])])
+
+            AST.archive_completed(archive_ast)
+            assert AST.data == []
+            assert [node.id for node in archive_ast] == ['S']
+            assert [node.id for node in archive_ast[0].children] == ['A', 'B']
+
+        def test_completed_task_already_archived_is_merged_not_duplicated(self):
+            archived = get_task('A', status='done', children=[get_task('B', status='done')])
+            archive_ast = asttree.AbstractSyntaxTree([archived])
+            AST = asttree.AbstractSyntaxTree([
+                astnode.Node(
+                    _id='A', ntype='task', name='renamed',
+                    data={'status': 'done', 'created': None, 'finished': False, 'modified': None},
+                    children=[get_task('C', status='done')],
+                ),
+            ])
 
+            AST.archive_completed(archive_ast)
+            assert AST.data == []
+            assert [node.id for node in archive_ast] == ['A']
+            assert archive_ast[0] is archived
+            assert archive_ast[0].name == 'A'
+            assert [node.id for node in archive_ast[0].children] == ['B', 'C']
+            assert archive_ast.parent_of('C') is archived
+
+        def test_section_archived_twice_is_merged_at_every_level(self):
+            AST = asttree.AbstractSyntaxTree([
+                get_section('S', [get_section('SS', [get_task('A', status='done'), get_task('B')])]),
+            ])
+            archive_ast = AST.archive_completed(nested=True)
+            AST.get('B').data = nodedata.TaskData(status='done')
+            AST.archive_completed(archive_ast)
+
+            assert AST.data == []
+            assert [node.id for (node, _, _, _) in archive_ast.walk()] == ['S', 'SS', 'A', 'B']
+            assert archive_ast.parent_of('B') is archive_ast.get('SS')
+
+    class Test_walk:
+        def test_pre_order(self):
+            AST = get_tree()
+            walked = [
+                (node.id, getattr(parent, 'id', None), depth, index)
+                for (node, parent, depth, index) in AST.walk()
+            ]
+            assert walked == [('A', None, 0, 0), ('B', 'A', 1, 0), ('C', 'B', 2, 0), ('D', None, 0, 1)]
+
+        def test_post_order(self):
+            AST = get_tree()
+            walked = [
+                (node.id, getattr(parent, 'id', None), depth, index)
+                for (node, parent, depth, index) in AST.walk('post')
+            ]
+            assert walked == [('C', 'B', 2, 0), ('B', 'A', 1, 0), ('A', None, 0, 0), ('D', None, 0, 1)]
+
+        def test_siblings_in_order(self):
+            AST = asttree.AbstractSyntaxTree([get_section('A', [get_task('B'), get_task('C')])])
+            assert [node.id for (node, _, _, _) in AST.walk('post')] == ['B', 'C', 'A']
+
+        def test_invalid_order(self):
+            with pytest.raises(ValueError):
+                get_tree().walk('in')
+
+        def test_deeper_than_recursion_limit(self):
+            def get_chain():
+                node = get_section('0')
+                AST = asttree.AbstractSyntaxTree([node])
+                for i in range(1, 5000):
+                    child = get_section(str(i))
+                    node.children.append(child)
+                    child.parent = node
+                    node = child
+                return AST
+
+            AST = get_chain()
+            assert [depth for (_, _, depth, _) in AST.walk()] == list(range(5000))
+            assert AST[0].is_complete() is False
+            assert AST[0] == get_chain()[0]
+            assert len(AST.render(renderers.Mtask, cache=renderers.RenderCache())) == 5004  # [, stamp, nodes, ], ""
+
+    class Test_is_dirty:
+        def test_new_tree_is_clean(self):
+            AST = get_tree()
+            assert not AST.is_dirty()
+
+        def test_changed_node(self):
+            AST = get_tree()
+            AST[0][0].name = 'task C'
+            assert AST.is_dirty()
+
+        def test_appended_node(self):
+            AST = get_tree()
+            AST.append(get_task('C'))
+            assert AST.is_dirty()
+
+        def test_replaced_nodes(self):
+            AST = get_tree()
+            AST.data = [get_task('C')]
+            assert AST.is_dirty()
+
+        def test_removed_node(self):
+            AST = get_tree()
+            AST.pop()
+            assert AST.is_dirty()
+
+        def test_deep_change_after_mark_clean(self):
+            AST = get_tree()
+            AST[0][0][0].name = 'task C'
+            AST.mark_clean()
+            AST[0][0][0].name = 'task D'
+            assert AST.is_dirty()
+
+        def test_mark_clean(self):
+            AST = get_tree()
+            AST.append(get_task('C'))
+            AST[0][0].name = 'task C'
+            AST.mark_clean()
+            assert not AST.is_dirty()
+
+    class Test_get:
+        def test_toplevel_node(self):
+            AST = get_tree()
+            assert AST.get('D') is AST[1]
+
+        def test_nested_node(self):
+            AST = get_tree()
+            assert AST.get('C') is AST[0][0][0]
+
+        def test_missing_node(self):
+            AST = get_tree()
+            assert AST.get('Z') is None
+
+        def test_finds_appended_node(self):
+            AST = get_tree()
+            AST.get('A')
+            AST.append(get_section('E'))
+            assert AST.get('E') is AST[2]
+
+        def test_finds_added_child(self):
+            AST = get_tree()
+            AST.get('A')
+            AST[1].children.append(get_section('E'))
+            assert AST.get('E') is AST[1][0]
+
+        def test_forgets_removed_child(self):
+            AST = get_tree()
+            AST.get('C')
+            AST[0].children.pop(0)
+            assert AST.get('B') is None
+            assert AST.get('C') is None
+
+        def test_finds_replaced_children(self):
+            AST = get_tree()
+            AST.get('A')
+            AST[1].children = [get_section('E')]
+            assert AST.get('E') is AST[1][0]
+
+        def test_finds_nodes_after_update(self):
+            AST = get_tree()
+            other_AST = get_tree()
+            other_AST[1].children.append(get_section('E'))
+            AST.get('A')
+            AST.update(other_AST)
+            assert AST.get('E') is AST[1][0]
+
+    class Test_parent_of:
+        def test_toplevel_node(self):
+            AST = get_tree()
+            assert AST.parent_of('A') is None
+
+        def test_nested_node(self):
+            AST = get_tree()
+            assert AST.parent_of('C') is AST[0][0]
+
+        def test_missing_node(self):
+            AST = get_tree()
+            with pytest.raises(KeyError):
+                AST.parent_of('Z')
+
+    class Test_path_to:
+        def test_toplevel_node(self):
+            AST = get_tree()
+            assert AST.path_to('D') == [AST[1]]
+
+        def test_nested_node(self):
+            AST = get_tree()
+            path = AST.path_to('C')
+            assert [node.id for node in path] == ['A', 'B', 'C']
+
+        def test_missing_node(self):
+            AST = get_tree()
+            with pytest.raises(KeyError):
+                AST.path_to('Z')
+
+    class Test_get_index:
+        def test_depths(self):
+            AST = get_tree()
+            index = AST.get_index()
+            depths = dict([(_id, index[_id][2]) for _id in index])
+            assert depths == {'A': 0, 'B': 1, 'C': 2, 'D': 0}
+
+        def test_reused_while_unchanged(self):
+            AST = get_tree()
+            assert AST.get_index() is AST.get_index()
+
+        def test_rebuilt_after_archive(self):
+            AST = asttree.AbstractSyntaxTree([
+                get_section('A', [get_task('B', status='done')]),
+                get_section('D', [get_task('E')]),
+            ])
+            AST.get('A')
+            archive_ast = AST.archive_completed()
+            assert AST.get('B') is None
+            assert archive_ast.get('B') is archive_ast[0][0]
+
+
+class Test_diff(object):
+    def get_ast(self):
+        """ ::
+
+            A
+                B
+                C
+            D
+        """
+        return asttree.AbstractSyntaxTree([
+            get_section('A', [get_task('B'), get_task('C')]),
+            get_task('D'),
+        ])
+
+    def test_unchanged(self):
+        changeset = asttree.diff(self.get_ast(), self.get_ast())
+        assert not changeset
+        assert changeset.as_dict() == {'added': [], 'removed': [], 'modified': {}, 'moved': [], 'reordered': []}
+
+    def test_added(self):
+        new_ast = self.get_ast()
+        new_ast[0].children.append(get_task('E'))
+        assert asttree.diff(self.get_ast(), new_ast).added == ['E']
+
+    def test_removed(self):
+        new_ast = self.get_ast()
+        new_ast[0].children.pop(0)
+        assert asttree.diff(self.get_ast(), new_ast).removed == ['B']
+
+    def test_modified(self):
+        new_ast = self.get_ast()
+        new_ast[0][1].name = 'task C'
+        new_ast[0][1].data = nodedata.TaskData(status='done')
+        assert asttree.diff(self.get_ast(), new_ast).modified == {'C': ['name', 'status']}
+
+    def test_unset_dates_not_compared(self):
+        created = datetime.datetime(2018, 1, 1, tzinfo=timezone.UTC())
+        old_ast = asttree.AbstractSyntaxTree([get_task('A', created=created)])
+        new_ast = asttree.AbstractSyntaxTree([get_task('A')])
+        assert not asttree.diff(old_ast, new_ast)
+
+    def test_changed_dates(self):
+        created = datetime.datetime(2018, 1, 1, tzinfo=timezone.UTC())
+        old_ast = asttree.AbstractSyntaxTree([get_task('A', created=created)])
+        new_ast = asttree.AbstractSyntaxTree([get_task('A', created=created + datetime.timedelta(days=1))])
+        assert asttree.diff(old_ast, new_ast).modified == {'A': ['created']}
+
+    def test_moved(self):
+        new_ast = self.get_ast()
+        task_B = new_ast[0].children.pop(0)
+        new_ast[1].children.append(task_B)
+        changeset = asttree.diff(self.get_ast(), new_ast)
+        assert changeset.moved == ['B']
+        assert changeset.reordered == []
+
+    def test_reordered(self):
+        new_ast = self.get_ast()
+        new_ast[0].children = list(reversed(new_ast[0].children))
+        changeset = asttree.diff(self.get_ast(), new_ast)
+        assert changeset.reordered == ['C', 'B']
+        assert changeset.moved == []
+
+    def test_insert_is_not_reorder(self):
+        new_ast = self.get_ast()
+        new_ast[0].children.insert(0, get_task('E'))
+        assert asttree.diff(self.get_ast(), new_ast).reordered == []
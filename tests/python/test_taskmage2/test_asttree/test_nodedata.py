@@ -203,6 +203,12 @@ class Test_TaskData:
             with pytest.raises(TypeError):
                 nodedata.TaskData(status='incomplete')
 
+        def test_attributes_match_attrs_order(self):
+            dt = datetime.datetime(2018, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
+            taskdata = nodedata.TaskData(status='done', created=dt, finished=dt, modified=None)
+            for (index, attr) in enumerate(nodedata.TaskData._attrs):
+                assert getattr(taskdata, attr) is taskdata[index]
+
         @pytest.mark.parametrize(
             'created', (None, datetime.datetime(2018, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())),
         )
@@ -367,6 +373,11 @@ class Test_TaskData:
             new_taskdata = self.finalize(taskdata, now)
             assert new_taskdata.finished is False
 
+        def test_returns_self_when_already_finalized(self):
+            now = datetime.datetime(2018, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
+            taskdata = nodedata.TaskData(status='done', created=now, finished=now, modified=now)
+            assert taskdata.finalize() is taskdata
+
         def finalize(self, taskdata, current_dt):
             with mock.patch('{}.datetime'.format(ns)) as mock_datetime:
                 # NOTE: make isinstance(x, datetime.datetime) return true
@@ -420,6 +431,16 @@ class Test_TaskData:
             merged_data = self.update(old_data, new_data, current_dt)
             assert merged_data.modified == task_dt
 
+        def test_does_not_set_modified_if_finished_not_set_on_new_data(self):
+            # tasklists do not store finished-dates
+            task_dt = datetime.datetime(2018, 1, 1, 0, 0, 0, 0, tzinfo=timezone.UTC())
+            current_dt = datetime.datetime(2018, 3, 3, 0, 0, 0, 0, tzinfo=timezone.UTC())
+            old_data = nodedata.TaskData(status='done', modified=task_dt, created=task_dt, finished=task_dt)
+            new_data = nodedata.TaskData(status='done', finished=False)
+
+            merged_data = self.update(old_data, new_data, current_dt)
+            assert merged_data is old_data
+
         def test_status(self):
             old_modified_date = datetime.datetime(2018, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
             new_modified_date = datetime.datetime(2018, 2, 2, 0, 0, 0, tzinfo=timezone.UTC())
@@ -523,3 +544,30 @@ class Test_TaskData:
             assert task_A != task_B
 
 
+class Test_OperationContext:
+    def test_reads_clock_once(self):
+        current_dt = datetime.datetime(2018, 3, 3, 0, 0, 0, 0, tzinfo=timezone.UTC())
+        with mock.patch('{}.datetime'.format(ns)) as mock_datetime:
+            mock_datetime.datetime.now = mock.Mock(return_value=current_dt)
+            context = nodedata.OperationContext()
+            assert context.utcnow == current_dt
+            assert context.utcnow == current_dt
+            assert mock_datetime.datetime.now.call_count == 1
+
+    def test_uses_utc_timezone(self):
+        assert nodedata.OperationContext().utcnow.tzinfo is timezone.utc
+
+    def test_touch_uses_timestamp(self):
+        context = nodedata.OperationContext(datetime.datetime(2018, 3, 3, 0, 0, 0, 0, tzinfo=timezone.UTC()))
+        taskdata = nodedata.TaskData(status='done').touch(context)
+        assert taskdata.created == taskdata.finished == taskdata.modified == context.utcnow
+
+    def test_finalize_uses_timestamp(self):
+        context = nodedata.OperationContext(datetime.datetime(2018, 3, 3, 0, 0, 0, 0, tzinfo=timezone.UTC()))
+        taskdata = nodedata.TaskData(status='done').finalize(context)
+        assert taskdata.created == taskdata.finished == taskdata.modified == context.utcnow
+
+    def test_update_uses_timestamp(self):
+        context = nodedata.OperationContext(datetime.datetime(2018, 3, 3, 0, 0, 0, 0, tzinfo=timezone.UTC()))
+        taskdata = nodedata.TaskData(status='todo').update(nodedata.TaskData(status='done'), context)
+        assert taskdata.finished == taskdata.modified == context.utcnow
@@ -20,8 +20,10 @@ import mock
 import enum
 
 # internal
-from taskmage2.asttree import astnode, renderers
+from taskmage2.asttree import asttree, astnode, renderers
+from taskmage2.parser import fmtdata
 from taskmage2.utils import timezone
+from taskmage2.vendor import six
 
 
 class Test_TaskList(object):
@@ -352,7 +354,7 @@ class Test_TaskList(object):
 
         Args:
             parser_data (list):
-                A list of nodes, as returned from :py:meth:`taskmage2.parser.parsers.Parser.parse` .
+                A list of nodes, as returned from :py:func:`taskmage2.parser.parsers.parse` .
 
                 .. code-block:: python
 
@@ -504,6 +506,40 @@ class Test_Mtask(object):
         ])
         assert render[0]['data']['finished'] == '2018-01-01T00:00:00+00:00'
 
+    def test_task_lazy_dates_written_unchanged(self):
+        datestr = '2018-01-01T00:00:00.000000+00:00'
+        render = self.render([
+            astnode.Node(
+                _id=None,
+                ntype='task',
+                name='task A',
+                data={
+                    'status': 'done',
+                    'created': timezone.LazyDatetime(datestr),
+                    'finished': timezone.LazyDatetime(datestr),
+                    'modified': timezone.LazyDatetime(datestr),
+                },
+                children=None,
+            )
+        ])
+        assert render[0]['data']['created'] == datestr
+        assert render[0]['data']['finished'] == datestr
+        assert render[0]['data']['modified'] == datestr
+
+    def test_stamp_is_first_entry(self):
+        ast = [astnode.Node(_id='C5ED1030425A436DABE94E0FCCCE76D6', ntype='section', name='home')]
+        render = renderers.Mtask(ast).render()
+
+        stamp = json.loads(render[1].rstrip(','))
+        assert fmtdata.Mtask.is_stamp(stamp)
+        assert stamp == fmtdata.Mtask.stamp(render[2:-2])
+
+    def test_stamp_without_nodes(self):
+        render = renderers.Mtask([]).render()
+        data = json.loads('\n'.join(render))
+        assert len(data) == 1
+        assert fmtdata.Mtask.is_stamp(data[0])
+
     def test_invalid_nodetype(self):
         # enum astnode.NodeType raises ValueError when nodetype is invalid.
         with pytest.raises(ValueError):
@@ -604,12 +640,125 @@ class Test_Mtask(object):
         ]
         assert render == expects
 
+    def test_cache_reuses_unchanged_subtrees(self):
+        ast = self.get_sections()
+        cache = renderers.RenderCache()
+        renderers.Mtask(ast, cache=cache).render()
+
+        ast[1][0].name = 'task C'
+        with mock.patch.object(renderers.Mtask, '_render_task', wraps=renderers.Mtask(ast)._render_task) as mock_render:
+            render = renderers.Mtask(ast, cache=cache).render()
+
+        assert [call[0][1].name for call in mock_render.call_args_list] == ['task C']
+        assert render == renderers.Mtask(ast).render()
+
+    def test_cache_reuses_unchanged_tree(self):
+        ast = asttree.AbstractSyntaxTree(self.get_sections())
+        cache = renderers.RenderCache()
+        expects = renderers.Mtask(ast, cache=cache).render()
+        with mock.patch.object(renderers.Mtask, '_render_nodes') as mock_render:
+            render = renderers.Mtask(ast, cache=cache).render()
+        assert not mock_render.called
+        assert render == expects
+
+    def test_cache_not_reused_when_toplevel_node_removed(self):
+        ast = asttree.AbstractSyntaxTree(self.get_sections())
+        cache = renderers.RenderCache()
+        renderers.Mtask(ast, cache=cache).render()
+        ast.pop()
+        render = renderers.Mtask(ast, cache=cache).render()
+        assert render == renderers.Mtask(ast).render()
+
+    def test_cache_not_reused_after_repeated_changes(self):
+        ast = asttree.AbstractSyntaxTree(self.get_sections())
+        cache = renderers.RenderCache()
+        renderers.Mtask(ast, cache=cache).render()
+        ast[1][0].name = 'task C'
+        ast[1][0].name = 'task D'
+        render = renderers.Mtask(ast, cache=cache).render()
+        assert render == renderers.Mtask(ast).render()
+
+    def test_cache_does_not_keep_nodes(self):
+        ast = asttree.AbstractSyntaxTree(self.get_sections())
+        cache = renderers.RenderCache()
+        renderers.Mtask(ast, cache=cache).render()
+        assert not any([isinstance(item, astnode.Node) for entry in cache.versions for item in entry])
+
+    def test_cache_updated_with_each_render(self):
+        ast = self.get_sections()
+        cache = renderers.RenderCache()
+        renderers.Mtask(ast, cache=cache).render()
+        ast[1][0].name = 'task C'
+        renderers.Mtask(ast, cache=cache).render()
+
+        ast[0][0].name = 'task D'
+        render = renderers.Mtask(ast, cache=cache).render()
+        assert render == renderers.Mtask(ast).render()
+
+    def test_cache_reuses_unchanged_node_lines(self):
+        ast = self.get_sections()
+        cache = renderers.RenderCache()
+        renderers.Mtask(ast, cache=cache).render()
+
+        # the section's subtree changed, but the section did not
+        ast[1][0].name = 'task C'
+        with mock.patch.object(renderers.Mtask, '_render_sectionheader') as mock_render:
+            render = renderers.Mtask(ast, cache=cache).render()
+
+        assert not mock_render.called
+        assert render == renderers.Mtask(ast).render()
+
+    def test_cache_node_lines_not_reused_when_parent_changes(self):
+        ast = self.get_sections()
+        cache = renderers.RenderCache()
+        renderers.Mtask(ast, cache=cache).render()
+
+        task = ast[1].children.pop(0)
+        ast[0].children.append(task)
+        render = renderers.Mtask(ast, cache=cache).render()
+        assert render == renderers.Mtask(ast).render()
+
+    def test_cache_node_lines_are_bounded(self):
+        ast = self.get_sections()
+        cache = renderers.RenderCache(maxnodes=2)
+        render = renderers.Mtask(ast, cache=cache).render()
+        assert list(cache.nodes.keys()) == ['S2', 'B']
+        assert render == renderers.Mtask(ast).render()
+
+    def test_iter_render_yields_stamp_placeholder(self):
+        ast = self.get_sections()
+        mtask = renderers.Mtask(ast)
+        lines = list(mtask.iter_render())
+        stamp_line = mtask.render_deferred()[1]
+        assert len(lines[1]) == len(stamp_line)
+        assert lines[:1] + [stamp_line] + lines[2:] == renderers.Mtask(ast).render()
+
+    def test_write_matches_render(self):
+        ast = self.get_sections()
+        fd = six.StringIO()
+        renderers.Mtask(ast).write(fd, chunksize=10)
+        assert fd.getvalue() == '\n'.join(renderers.Mtask(ast).render())
+
+    def test_write_without_nodes(self):
+        fd = six.StringIO()
+        renderers.Mtask([]).write(fd)
+        assert fd.getvalue() == '\n'.join(renderers.Mtask([]).render())
+
+    def get_sections(self):
+        def get_task(_id):
+            return astnode.Node(_id=_id, ntype='task', name='task {}'.format(_id), data={'status': 'todo'})
+
+        return [
+            astnode.Node(_id='S1', ntype='section', name='section 1', children=[get_task('A')]),
+            astnode.Node(_id='S2', ntype='section', name='section 2', children=[get_task('B')]),
+        ]
+
     def render(self, ast):
         """ Render parser_data using a TaskList renderer.
 
         Args:
             parser_data (list):
-                A list of nodes, as returned from :py:meth:`taskmage2.parser.parsers.Parser.parse` .
+                A list of nodes, as returned from :py:func:`taskmage2.parser.parsers.parse` .
 
                 .. code-block:: python
 
@@ -628,4 +777,4 @@ class Test_Mtask(object):
         """
         mtask = renderers.Mtask(ast)
         mtask_str = '\n'.join(mtask.render())
-        return json.loads(mtask_str)
+        return json.loads(mtask_str)[1:]  # without stamp
@@ -21,3 +21,15 @@ class Test_TaskList:
         def test_raises_keyerror_if_invalid_status(self):
             with pytest.raises(KeyError):
                 fmtdata.TaskList.status('.')
+
+
+class Test_MtaskChecksum:
+    def test_matches_checksum_of_lines(self):
+        lines = ['  {"_id": "A"},', u'  {"name": "\u00e9t\u00e9"}']
+        checksum = fmtdata.MtaskChecksum()
+        for line in lines:
+            checksum.add_line(line)
+        assert fmtdata.Mtask.stamp_from_checksum(checksum.hexdigest()) == fmtdata.Mtask.stamp(lines)
+
+    def test_without_lines(self):
+        assert fmtdata.MtaskChecksum().hexdigest() == fmtdata.Mtask.checksum('')
@@ -13,6 +13,7 @@ from __future__ import absolute_import, division, print_function
 # package
 # external
 import six
+import pytest
 # internal
 from taskmage2.parser import iostream
 
@@ -59,6 +60,20 @@ def get_filedescriptor(contents):
     return iostream.FileDescriptor(fd)
 
 
+def get_textbuffer(contents):
+    """
+
+    Args:
+        contents (str, bytes):
+            A string representing a file in it's entirety.
+
+            .. code-block:: python
+
+                'line_1\nline_2\n'
+    """
+    return iostream.TextBuffer(contents)
+
+
 # =====
 # Tests
 # =====
@@ -224,6 +239,105 @@ class Test_FileDescriptor:
             assert buf.read() == 'abc\ndefg\n'
 
 
+class Test_TextBuffer:
+    class Test_peek:
+        def test_peek_overflow(self):
+            buf = get_textbuffer('a\nb\nc\n')
+            result = []
+            for i in range(7):
+                result.append(buf.peek(i))
+            assert result == ['a', '\n', 'b', '\n', 'c', '\n', None]
+
+        def test_next_overflow(self):
+            buf = get_textbuffer('a\nb\nc\n')
+            result = []
+            for i in range(7):
+                result.append(buf.next())
+            assert result == ['a', '\n', 'b', '\n', 'c', '\n', None]
+
+        def test_peek_variable_line_lengths(self):
+            buf = get_textbuffer('abc\nd\nefghij\n')
+            result = []
+            for i in range(14):
+                result.append(buf.peek(i))
+            assert result == ['a', 'b', 'c', '\n', 'd', '\n', 'e', 'f', 'g', 'h', 'i', 'j', '\n', None]
+
+        def test_peek_does_not_change_pos(self):
+            buf = get_textbuffer('abc\n')
+            buf.peek(2)
+            assert buf.peek() == 'a'
+
+        def test_peek_multibyte_characters_from_bytes(self):
+            buf = get_textbuffer(u'\u00e9t\u00e9\n'.encode('utf-8'))
+            result = []
+            for i in range(5):
+                result.append(buf.peek(i))
+            assert result == [u'\u00e9', u't', u'\u00e9', u'\n', None]
+
+    class Test_peek_line:
+        def test_peek_line_from_linestart(self):
+            buf = get_textbuffer('abc\ndefg')
+            assert buf.peek_line() == 'abc'
+
+        def test_peek_line_from_midline(self):
+            buf = get_textbuffer('abc\ndefg')
+            buf.offset(1)
+            assert buf.peek_line() == 'bc'
+
+        def test_peek_line_at_eof(self):
+            buf = get_textbuffer('abc\ndefg')
+            buf.offset(8)  # 'abc\ndefg\n'
+            assert buf.peek_line() is None
+
+        def test_peek_offset(self):
+            buf = get_textbuffer('abc\ndefg')
+            assert buf.peek_line(1) == 'bc'
+
+        def test_peek_empty_line(self):
+            buf = get_textbuffer('abc\n\ndefg')
+            assert buf.peek_line(4) == ''
+
+        def test_peek_lastline_without_newline(self):
+            buf = get_textbuffer('abc\ndefg')
+            assert buf.peek_line(4) == 'defg'
+
+        def test_peek_line_after_multibyte_characters(self):
+            buf = get_textbuffer(u'\u00e9t\u00e9\nabc\n'.encode('utf-8'))
+            assert buf.peek_line(4) == 'abc'
+
+    class Test_eof:
+        def test_eof_returns_false_before_end_of_file(self):
+            buf = get_textbuffer('a\n')
+            assert buf.eof() is False
+
+        def test_eof_returns_true_at_end_of_file(self):
+            buf = get_textbuffer('a')
+            buf.offset(1)
+            assert buf.eof() is True
+
+        def test_eof_returns_true_in_empty_file(self):
+            buf = get_textbuffer('')
+            assert buf.eof() is True
+
+    class Test_read:
+        def test_read(self):
+            buf = get_textbuffer('abc\ndefg\n')
+            assert buf.read() == 'abc\ndefg\n'
+
+        def test_read_adds_trailing_newline(self):
+            buf = get_textbuffer('abc\ndefg')
+            assert buf.read() == 'abc\ndefg\n'
+
+        def test_read_from_current_position(self):
+            buf = get_textbuffer('abc\ndefg\n')
+            buf.offset(4)
+            assert buf.read() == 'defg\n'
+
+        def test_read_empty(self):
+            buf = get_textbuffer('')
+            assert buf.read() == ''
+
+
 class Test_VimBuffer:
     class Test__init__:
         def test_loads_vimbuffer(self):
@@ -233,3 +347,152 @@ class Test_VimBuffer:
 
         def test_loads_without_vimbuffer(self):
             iostream.VimBuffer()
+
+
+class Test_IndexedVimBuffer:
+    class Test__init__:
+        def test_loads_vimbuffer(self):
+            vimbuf = ['abc', 'defg']
+            buf = iostream.IndexedVimBuffer(vimbuf)
+            assert buf.read() == 'abc\ndefg\n'
+
+        def test_loads_without_vimbuffer(self):
+            buf = iostream.IndexedVimBuffer()
+            assert buf.eof() is True
+
+        def test_starts_at_line(self):
+            vimbuf = ['abc', 'defg', 'hi']
+            buf = iostream.IndexedVimBuffer(vimbuf, start=1)
+            assert buf.peek_line() == 'defg'
+            assert buf.read() == 'defg\nhi\n'
+
+        def test_does_not_copy_buffer(self):
+            vimbuf = ['abc', 'defg']
+            buf = iostream.IndexedVimBuffer(vimbuf)
+            assert buf._buf is vimbuf
+
+    class Test_peek:
+        def test_peek_overflow(self):
+            buf = iostream.IndexedVimBuffer(['a', 'b', 'c'])
+            result = []
+            for i in range(7):
+                result.append(buf.peek(i))
+            assert result == ['a', '\n', 'b', '\n', 'c', '\n', None]
+
+        def test_next_overflow(self):
+            buf = iostream.IndexedVimBuffer(['a', 'b', 'c'])
+            result = []
+            for i in range(7):
+                result.append(buf.next())
+            assert result == ['a', '\n', 'b', '\n', 'c', '\n', None]
+
+        def test_peek_empty_lines(self):
+            buf = iostream.IndexedVimBuffer(['', 'a', ''])
+            result = []
+            for i in range(5):
+                result.append(buf.peek(i))
+            assert result == ['\n', 'a', '\n', '\n', None]
+
+    class Test_peek_line:
+        def test_peek_line_from_midline(self):
+            buf = iostream.IndexedVimBuffer(['abc', 'defg'])
+            buf.offset(1)
+            assert buf.peek_line() == 'bc'
+
+        def test_peek_line_at_newline(self):
+            buf = iostream.IndexedVimBuffer(['abc', 'defg'])
+            assert buf.peek_line(3) == ''
+
+        def test_peek_line_at_eof(self):
+            buf = iostream.IndexedVimBuffer(['abc', 'defg'])
+            buf.offset(9)
+            assert buf.peek_line() is None
+
+    class Test_read:
+        def test_read_from_current_position(self):
+            buf = iostream.IndexedVimBuffer(['abc', 'defg'])
+            buf.offset(2)
+            assert buf.read() == 'c\ndefg\n'
+
+        def test_read_at_eof(self):
+            buf = iostream.IndexedVimBuffer(['abc'])
+            buf.offset(4)
+            assert buf.read() == ''
+
+    class Test_matches_VimBuffer:
+        @pytest.mark.parametrize('lines', [
+            [],
+            [''],
+            ['abc', 'defg'],
+            ['', '', 'a'],
+            ['* task', '    multiline', '', 'header', '======', '  - subtask'],
+        ])
+        def test_matches_vimbuffer(self, lines):
+            expected = iostream.VimBuffer(lines)
+            buf = iostream.IndexedVimBuffer(lines)
+            length = len(expected.read()) + 2
+            for i in range(length):
+                assert buf.peek(i) == expected.peek(i)
+                assert buf.peek_line(i) == expected.peek_line(i)
+            for i in range(length):
+                assert buf.next() == expected.next()
+                assert buf.eof() == expected.eof()
+                assert buf.read() == expected.read()
+
+
+class Test_MmapStream:
+    def get_mmapstream(self, tmpdir, contents):
+        """
+        Args:
+            contents (bytes):
+                The entire contents of the file.
+        """
+        filepath = tmpdir.join('todo.tasklist')
+        filepath.write_binary(contents)
+        return iostream.MmapStream(str(filepath))
+
+    def test_peek_overflow(self, tmpdir):
+        with self.get_mmapstream(tmpdir, b'a\nb\nc\n') as buf:
+            result = []
+            for i in range(7):
+                result.append(buf.peek(i))
+        assert result == ['a', '\n', 'b', '\n', 'c', '\n', None]
+
+    def test_next_overflow(self, tmpdir):
+        with self.get_mmapstream(tmpdir, b'a\nb\nc\n') as buf:
+            result = []
+            for i in range(7):
+                result.append(buf.next())
+        assert result == ['a', '\n', 'b', '\n', 'c', '\n', None]
+
+    def test_peek_multibyte_characters(self, tmpdir):
+        with self.get_mmapstream(tmpdir, u'\u00e9t\u00e9\nabc\n'.encode('utf-8')) as buf:
+            assert buf.peek(2) == u'\u00e9'
+            assert buf.peek_line(4) == 'abc'
+
+    def test_peek_line_lastline_without_newline(self, tmpdir):
+        with self.get_mmapstream(tmpdir, b'abc\ndefg') as buf:
+            assert buf.peek_line(4) == 'defg'
+            assert buf.peek_line(9) is None
+
+    def test_empty_file(self, tmpdir):
+        with self.get_mmapstream(tmpdir, b'') as buf:
+            assert buf.eof() is True
+            assert buf.read() == ''
+
+    def test_read(self, tmpdir):
+        with self.get_mmapstream(tmpdir, b'abc\ndefg') as buf:
+            assert buf.read() == 'abc\ndefg\n'
+
+    def test_read_from_current_position(self, tmpdir):
+        with self.get_mmapstream(tmpdir, b'abc\ndefg\nhi\n') as buf:
+            buf.offset(2)
+            assert buf.read() == 'c\ndefg\nhi\n'
+
+    def test_matches_textbuffer(self, tmpdir):
+        contents = b'* task\n    multiline\n\nheader\n======\n  - subtask\n'
+        expected = iostream.TextBuffer(contents)
+        with self.get_mmapstream(tmpdir, contents) as buf:
+            for i in range(len(contents) + 2):
+                assert buf.peek(i) == expected.peek(i)
+                assert buf.peek_line(i) == expected.peek_line(i)
@@ -13,14 +13,16 @@ ________________________________________________________________________________
 from __future__ import absolute_import, division, print_function
 import uuid
 import json
+import itertools
 import pprint
+import random
 import datetime
 import six
 # external
 import pytest
 import mock
 # internal
-from taskmage2.parser import iostream, lexers
+from taskmage2.parser import fmtdata, iostream, lexers
 from taskmage2.utils import excepts
 from taskmage2.utils import timezone
 
@@ -64,6 +66,8 @@ def uid():
 
 class Test_TaskList:
     class Test_read:
+        lexer_cls = lexers.TaskList
+
         def test_status_todo(self):
             tokens = self.tasklist('* taskA')
             assert tokens == [
@@ -367,6 +371,44 @@ class Test_TaskList:
                 'data': {'status': 'todo', 'created': None, 'finished': None, 'modified': None},
             }
 
+        def test_subtask_parent_is_nearest_less_indented_task(self):
+            tokens = self.tasklist(
+                '*{*AAAA*} taskA\n'
+                '    *{*BBBB*} subtaskA\n'
+                '        *{*CCCC*} subsubtaskA\n'
+                '  *{*DDDD*} subtaskB\n'
+                '    *{*EEEE*} subsubtaskB\n'
+            )
+            parents = [(t['_id'], t['parent']) for t in tokens]
+            assert parents == [
+                ('AAAA', None),
+                ('BBBB', 'AAAA'),
+                ('CCCC', 'BBBB'),
+                ('DDDD', 'AAAA'),
+                ('EEEE', 'DDDD'),
+            ]
+
+        def test_toplevel_task_parent_is_last_section(self):
+            tokens = self.tasklist(
+                '{*AAAA*}file::todo.mtask\n'
+                '========================\n'
+                '*{*BBBB*} taskA\n'
+                '{*CCCC*}section\n'
+                '---------------\n'
+                '*{*DDDD*} taskB\n'
+                '    *{*EEEE*} subtaskB\n'
+                '*{*FFFF*} taskC\n'
+            )
+            parents = [(t['_id'], t['parent']) for t in tokens]
+            assert parents == [
+                ('AAAA', None),
+                ('BBBB', None),
+                ('CCCC', 'AAAA'),
+                ('DDDD', 'CCCC'),
+                ('EEEE', 'DDDD'),
+                ('FFFF', 'CCCC'),
+            ]
+
         def test_section_subtask_indented(self):
             tokens = self.tasklist(
                 'home\n'
@@ -545,7 +587,7 @@ class Test_TaskList:
                 fd = six.StringIO()
                 fd.write(filecontents)
                 iofd = iostream.FileDescriptor(fd)
-                lexer = lexers.TaskList(iofd)
+                lexer = self.lexer_cls(iofd)
 
                 # read until end of TaskList
                 _lexertokens = []
@@ -563,7 +605,7 @@ class Test_TaskList:
                 fd = six.StringIO()
                 fd.write(filecontents)
                 iofd = iostream.FileDescriptor(fd)
-                lexer = lexers.TaskList(iofd)
+                lexer = self.lexer_cls(iofd)
 
                 # read until end of TaskList
                 lexer.read()
@@ -628,6 +670,254 @@ class Test_TaskList:
             assert lexer.eof() is True
 
 
+class Test_LineTaskList:
+    class Test_read(Test_TaskList.Test_read):
+        lexer_cls = lexers.LineTaskList
+
+        @pytest.mark.parametrize('seed', range(20))
+        def test_tokens_match_tasklist_lexer(self, seed):
+            blocks = [
+                '', '    ', '* task', 'x done', 'o wip', '- skip', '  * indented',
+                '    * subtask', '        - subsubtask', 'x',
+                '* task\n  indented continuation', '* task\ncontinuation\n\n',
+                '    * subtask\n      continuation\n     continuation',
+                'header\n======', 'subheader\n---------', 'file::todo/misc.mtask\n=====================',
+                '{*7FBAD5A946974A7DBB57DD6495F5DE1C*}header with id\n==============',
+                '*{*F05D37A337DF42448E7E229B35F3F021*} task with id',
+                '    o{*1EE4C290F1CC4FA1B33FD1DBABF512B3*} subtask with id',
+            ]
+            rand = random.Random(seed)
+            text = '\n'.join([rand.choice(blocks) for _ in range(60)]) + '\n'
+
+            expects = self.lex_or_exception(lexers.TaskList, text)
+            tokens = self.lex_or_exception(lexers.LineTaskList, text)
+            if isinstance(expects, Exception):
+                assert isinstance(tokens, Exception)
+            else:
+                assert tokens == expects
+
+        def lex_or_exception(self, lexer_cls, text):
+            """ Lexes `text` , replacing generated ids with their order of appearance.
+            """
+            new_ids = ('NEW{}'.format(i) for i in itertools.count())
+            new_uuid = lambda: mock.Mock(hex=next(new_ids))  # noqa: E731
+
+            with mock.patch('{}.uuid.uuid4'.format(ns), side_effect=new_uuid):
+                lexer = lexer_cls(iostream.TextBuffer(text))
+                try:
+                    tokens = lexer.read()
+                except Exception as exc:
+                    return exc
+
+            ids = {}
+            for token in tokens:
+                if token['_id'].startswith('NEW'):
+                    ids[token['_id']] = 'NEW{}'.format(len(ids))
+                    token['_id'] = ids[token['_id']]
+                token['parent'] = ids.get(token['parent'], token['parent'])
+            return tokens
+
+
+incremental_lines = [
+    '{*7FBAD5A946974A7DBB57DD6495F5DE1C*}header',
+    '======',
+    '*{*F05D37A337DF42448E7E229B35F3F021*} task A',
+    '    o{*1EE4C290F1CC4FA1B33FD1DBABF512B3*} subtask A',
+    '',
+    '*{*B7D3DD1D6CC94B2C9E1F1F63A0A3AE0B*} task B',
+    '    x{*64C5A9D1A7F34BB6A4C7FA51B4E1C2D3*} subtask B',
+    '      continuation',
+    '*{*0E3AC34F4D2B4E1B9C6C2F3B0C1D2E3F*} task C',
+]
+
+
+class Test_IncrementalTaskList:
+    class Test_read:
+        def test_first_read_matches_linetasklist(self):
+            lexer = lexers.IncrementalTaskList()
+            assert lexer.read(incremental_lines) == self.full_lex(incremental_lines)
+
+        @pytest.mark.parametrize('seed', range(10))
+        def test_edits_match_linetasklist(self, seed):
+            rand = random.Random(seed)
+            choices = incremental_lines[2:] + ['', '* new task', '    - new subtask', 'continuation']
+            lines = list(incremental_lines)
+            lexer = lexers.IncrementalTaskList()
+            lexer.read(lines)
+            for _ in range(20):
+                # edit lines below the header
+                index = rand.randint(2, len(lines))
+                if len(lines) > 2 and rand.random() < 0.3:
+                    del lines[min(index, len(lines) - 1)]
+                else:
+                    lines.insert(index, rand.choice(choices))
+
+                expects = self.lex_or_exception(lexers.LineTaskList(iostream.IndexedVimBuffer(lines)))
+                tokens = self.lex_or_exception(lexer, lines)
+                if isinstance(expects, Exception):
+                    assert isinstance(tokens, Exception)
+                else:
+                    assert self.renumber_new_ids(tokens) == self.renumber_new_ids(expects)
+
+        def test_reuses_tokens_of_unchanged_blocks(self):
+            lexer = lexers.IncrementalTaskList()
+            before = list(lexer.read(incremental_lines))
+
+            lines = list(incremental_lines)
+            lines[7] = '      changed continuation'
+            after = lexer.read(lines)
+
+            assert after[4]['name'] == 'subtask B\n changed continuation'
+            assert all([a is b for (a, b) in zip(after[:3], before[:3])])
+            assert after[4] is not before[4]
+            assert after[5] is before[5]
+
+        def test_unchanged_lines_return_same_tokens(self):
+            lexer = lexers.IncrementalTaskList()
+            before = lexer.read(incremental_lines)
+            assert lexer.read(list(incremental_lines)) is before
+
+        def test_parent_updated_in_following_blocks(self):
+            lexer = lexers.IncrementalTaskList()
+            lexer.read(incremental_lines)
+
+            lines = ['{*AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA*}new header', '=========='] + incremental_lines[2:]
+            tokens = lexer.read(lines)
+            assert tokens == self.full_lex(lines)
+            assert tokens[-1]['parent'] == 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'
+
+        def test_error_resets_cache(self):
+            lexer = lexers.IncrementalTaskList()
+            lexer.read(incremental_lines)
+            with pytest.raises(excepts.ParserError):
+                lexer.read(['*{*INVALID task'] + incremental_lines)
+            assert lexer.read(incremental_lines) == self.full_lex(incremental_lines)
+
+        def full_lex(self, lines):
+            return lexers.LineTaskList(iostream.IndexedVimBuffer(lines)).read()
+
+        def lex_or_exception(self, lexer, lines=None):
+            try:
+                if lines is None:
+                    return lexer.read()
+                return list(lexer.read(lines))
+            except excepts.ParserError as exc:
+                return exc
+
+        def renumber_new_ids(self, tokens):
+            """ Replaces generated ids with their order of appearance.
+            """
+            known_ids = set([token['_id'] for token in self.full_lex(incremental_lines)])
+            ids = {}
+            renumbered = []
+            for token in tokens:
+                token = dict(token)
+                if token['_id'] not in known_ids:
+                    ids[token['_id']] = 'NEW{}'.format(len(ids))
+                    token['_id'] = ids[token['_id']]
+                token['parent'] = ids.get(token['parent'], token['parent'])
+                renumbered.append(token)
+            return renumbered
+
+    class Test_read_changes:
+        def test_applies_changed_lines(self):
+            lexer = lexers.IncrementalTaskList()
+            lexer.read(incremental_lines)
+
+            buf = list(incremental_lines)
+            buf.insert(5, '*{*CCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCC*} task inserted')
+            buf[2] = buf[2].replace('*{', 'x{')
+            tokens = lexer.read_changes(buf, [(6, 6, 1), (3, 4, 0)])
+
+            assert tokens == lexers.LineTaskList(iostream.IndexedVimBuffer(buf)).read()
+
+        def test_no_changes_returns_same_tokens(self):
+            lexer = lexers.IncrementalTaskList()
+            before = lexer.read(incremental_lines)
+            assert lexer.read_changes(incremental_lines, []) is before
+
+        def test_rereads_buffer_if_changes_were_missed(self):
+            lexer = lexers.IncrementalTaskList()
+            lexer.read(incremental_lines)
+
+            buf = list(incremental_lines[:-1])
+            tokens = lexer.read_changes(buf, [(3, 4, 0)])
+            assert tokens == lexers.LineTaskList(iostream.IndexedVimBuffer(buf)).read()
+
+    class Test__get_diff_span:
+        def test_no_changes(self):
+            assert lexers.IncrementalTaskList._get_diff_span(['a', 'b'], ['a', 'b']) == (2, 2, 2)
+
+        def test_changed_line(self):
+            span = lexers.IncrementalTaskList._get_diff_span(['a', 'b', 'c'], ['a', 'B', 'c'])
+            assert span == (1, 2, 2)
+
+        def test_inserted_lines(self):
+            span = lexers.IncrementalTaskList._get_diff_span(['a', 'c'], ['a', 'b', 'b', 'c'])
+            assert span == (1, 1, 3)
+
+        def test_deleted_lines(self):
+            span = lexers.IncrementalTaskList._get_diff_span(['a', 'b', 'c'], ['a'])
+            assert span == (1, 3, 1)
+
+    class Test__get_changes_span:
+        def test_no_changes(self):
+            assert lexers.IncrementalTaskList._get_changes_span([]) is None
+
+        def test_changed_line(self):
+            assert lexers.IncrementalTaskList._get_changes_span([(3, 4, 0)]) == (2, 3, 3)
+
+        def test_inserted_line(self):
+            assert lexers.IncrementalTaskList._get_changes_span([(6, 6, 1)]) == (5, 5, 6)
+
+        def test_deleted_line(self):
+            assert lexers.IncrementalTaskList._get_changes_span([(3, 4, -1)]) == (2, 3, 2)
+
+        def test_combines_changes(self):
+            # insert line below line 1, then change (new) line 5
+            span = lexers.IncrementalTaskList._get_changes_span([(2, 2, 1), (5, 6, 0)])
+            assert span == (1, 4, 5)
+
+
+mtask_sections = [
+    {
+        '_id': 'C5ED1030425A436DABE94E0FCCCE76D6',
+        'type': 'section',
+        'name': 'home',
+        'indent': 0,
+        'parent': None,
+        'data': {},
+    },
+    {
+        '_id': '2B9A1A9CB5FB4E0C9A5F8B2F4C2F0B6E',
+        'type': 'section',
+        'name': 'work',
+        'indent': 0,
+        'parent': None,
+        'data': {},
+    },
+]
+mtask_sections_rendered = '\n'.join(
+    ['['] + ['  {},'.format(json.dumps(entry)) for entry in mtask_sections] + [']', '']
+).replace(',\n]', '\n]')
+mtask_tasks_json = json.dumps([
+    {
+        '_id': 'F689D346A57E4D59B49CC56CB18AFB41',
+        'type': 'task',
+        'name': 'task A',
+        'indent': 0,
+        'parent': None,
+        'data': {
+            'status': 'todo',
+            'created': '2019-04-26T16:38:35.030309+00:00',
+            'finished': False,
+            'modified': '2019-04-26T16:38:35.030309+00:00',
+        },
+    },
+])
+mtask_tasks_lines = ['  {}'.format(json.dumps(entry)) for entry in json.loads(mtask_tasks_json)]
+
+
 class Test_Mtask:
     """ Mtask shouldn't alter raw json
     """
@@ -670,6 +960,18 @@ class Test_Mtask:
             }
             assert self.mtask(json.dumps([file_])) == [file_]
 
+        def test_malformed_date_raises_when_read(self):
+            task = {
+                '_id': uid().hex.upper(),
+                'type': 'task',
+                'name': 'taskA',
+                'indent': 0,
+                'parent': None,
+                'data': {'status': 'todo', 'created': '2018-01-01 00:00+00:00', 'finished': False, 'modified': None},
+            }
+            with pytest.raises(ValueError):
+                self.mtask(json.dumps([task]))
+
         def test_taskdata_converts_mtask_isoformat_to_datetime_objects(self):
             task = {
                 '_id': uid().hex.upper(),
@@ -791,6 +1093,88 @@ class Test_Mtask:
             with pytest.raises(excepts.ParserError):
                 lexer.read()
 
+    class Test_iter_tokens:
+        def test_yields_tokens_without_storing_them(self):
+            lexer = get_lexer_mtask(json.dumps(mtask_sections))
+            tokens = lexer.iter_tokens()
+            assert next(tokens)['name'] == 'home'
+            assert [t['name'] for t in tokens] == ['work']
+            assert lexer.data == []
+
+        def test_validates_tokens(self):
+            contents = [dict(mtask_sections[0], data={'status': 'todo'})]
+            lexer = get_lexer_mtask(json.dumps(contents))
+            with pytest.raises(excepts.ParserError):
+                list(lexer.iter_tokens())
+
+    class Test_iter_rawdata:
+        def test_decodes_one_entry_per_line(self):
+            lexer = get_lexer_mtask(mtask_sections_rendered)
+            assert list(lexer.iter_rawdata()) == mtask_sections
+
+        def test_decodes_empty_list(self):
+            lexer = get_lexer_mtask('[\n]\n')
+            assert list(lexer.iter_rawdata()) == []
+
+        def test_decodes_empty_file(self):
+            lexer = get_lexer_mtask('')
+            assert list(lexer.iter_rawdata()) == []
+
+        def test_decodes_single_line_file(self):
+            lexer = get_lexer_mtask(json.dumps(mtask_sections))
+            assert list(lexer.iter_rawdata()) == mtask_sections
+
+        def test_decodes_indented_file(self):
+            lexer = get_lexer_mtask(json.dumps(mtask_sections, indent=2))
+            assert list(lexer.iter_rawdata()) == mtask_sections
+
+        def test_decodes_iostreams(self):
+            lexer = lexers.Mtask(iostream.TextBuffer(json.dumps(mtask_sections, indent=2)))
+            assert list(lexer.iter_rawdata()) == mtask_sections
+
+        def test_hand_edited_entry_after_rendered_entries(self):
+            text = mtask_sections_rendered.replace('"work", ', '"work",\n    ')
+            lexer = get_lexer_mtask(text)
+            assert list(lexer.iter_rawdata()) == mtask_sections
+
+        def test_invalid_json_raises_valueerror(self):
+            text = mtask_sections_rendered.replace('\n]', ',\n]')
+            lexer = get_lexer_mtask(text)
+            with pytest.raises(ValueError):
+                list(lexer.iter_rawdata())
+
+    class Test_trusted:
+        def test_valid_stamp_is_trusted(self):
+            lexer = get_lexer_mtask(self.stamped(mtask_tasks_lines))
+            tokens = lexer.read()
+            assert lexer.trusted is True
+            assert tokens == get_lexer_mtask(mtask_tasks_json).read()
+
+        def test_unstamped_file_is_not_trusted(self):
+            lexer = get_lexer_mtask(mtask_tasks_json)
+            lexer.read()
+            assert lexer.trusted is False
+
+        def test_edited_file_is_not_trusted(self):
+            text = self.stamped(mtask_tasks_lines).replace('task A', 'task B')
+            lexer = get_lexer_mtask(text)
+            assert lexer.read()[0]['name'] == 'task B'
+            assert lexer.trusted is False
+
+        def test_edited_file_is_validated(self):
+            text = self.stamped(mtask_tasks_lines).replace('"todo"', '"invalid"')
+            lexer = get_lexer_mtask(text)
+            with pytest.raises(excepts.ParserError):
+                lexer.read()
+
+        def test_stamp_is_not_a_token(self):
+            lexer = lexers.Mtask(iostream.TextBuffer(self.stamped(mtask_tasks_lines)))
+            assert [t['name'] for t in lexer.read()] == ['task A']
+
+        def stamped(self, lines):
+            stamp = json.dumps(fmtdata.Mtask.stamp(lines))
+            return '\n'.join(['[', '  {},'.format(stamp)] + lines + [']', ''])
+
 
 class Test_get_lexer:
     def test_get_lexer_from_enum_option_val(self):
@@ -802,3 +1186,8 @@ class Test_get_lexer:
         fd = six.StringIO()
         lexer = lexers.get_lexer(fd, lexers.LexerTypes.mtask)
         assert isinstance(lexer, lexers.Mtask)
+
+    def test_get_lexer_tasklist_reads_by_line(self):
+        fd = iostream.TextBuffer('')
+        lexer = lexers.get_lexer(fd, 'tasklist')
+        assert isinstance(lexer, lexers.LineTaskList)
@@ -10,8 +10,9 @@ ________________________________________________________________________________
 """
 from __future__ import absolute_import, division, print_function
 from taskmage2.asttree import astnode, asttree
-from taskmage2.parser import parsers, lexers
-import mock
+from taskmage2.parser import parsers, lexers, iostream
+from taskmage2.utils import excepts
+import pytest
 import six
 import json
 
@@ -39,8 +40,8 @@ def get_lexer_mtask(text):
 # =====
 
 
-class Test_Parser:
-    """ The parser converts a lexed format into nodes.
+class Test_parse_tokens:
+    """ Converts lexed tokens into nodes.
     """
     def test_task(self):
         parsed = self.parser([{
@@ -163,10 +164,133 @@ class Test_Parser:
         assert parsed[0][0].id == '032012b832f546d7bdc13a08ade41ba0'
         assert parsed[0][0].parent.id == '6ed88ae2e7d94d2c88249a954782fc46'
 
+    def test_sets_parent_attribute_on_ast_nodes(self):
+        tokens = [
+            {
+                '_id': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'type': 'section',
+                'name': 'home',
+                'indent': 0,
+                'parent': None,
+                'data': {},
+            },
+            {
+                '_id': 'D23BC64989644012A546EAC8C6A85F55',
+                'type': 'task',
+                'name': 'task A',
+                'indent': 4,
+                'parent': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'data': {
+                    'status': 'todo',
+                    'created': None,
+                    'modified': None,
+                    'finished': False,
+                },
+            },
+        ]
+        AST = parsers.parse_tokens(tokens)
+
+        assert AST[0].name == 'home'
+        assert AST[0][0].parent == AST[0]
+
+    def test_trusted_tokens_produce_same_ast(self):
+        tokens = [
+            {
+                '_id': 'D23BC64989644012A546EAC8C6A85F55',
+                'type': 'task',
+                'name': 'task A',
+                'indent': 0,
+                'parent': None,
+                'data': {
+                    'status': 'todo',
+                    'created': None,
+                    'modified': None,
+                    'finished': False,
+                },
+            },
+        ]
+        assert parsers.parse_tokens(tokens, trusted=True) == parsers.parse_tokens(tokens)
+
+    def test_child_before_parent_is_attached(self):
+        tokens = [
+            {
+                '_id': 'D23BC64989644012A546EAC8C6A85F55',
+                'type': 'task',
+                'name': 'task A',
+                'indent': 4,
+                'parent': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'data': {'status': 'todo', 'created': None, 'modified': None, 'finished': False},
+            },
+            {
+                '_id': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'type': 'section',
+                'name': 'home',
+                'indent': 0,
+                'parent': None,
+                'data': {},
+            },
+        ]
+        AST = parsers.parse_tokens(tokens)
+        assert len(AST) == 1
+        assert AST[0][0].name == 'task A'
+        assert AST[0][0].parent == AST[0]
+
+    def test_missing_parent_raises_parsererror(self):
+        tokens = [
+            {
+                '_id': 'D23BC64989644012A546EAC8C6A85F55',
+                'type': 'task',
+                'name': 'task A',
+                'indent': 4,
+                'parent': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'data': {'status': 'todo', 'created': None, 'modified': None, 'finished': False},
+            },
+        ]
+        with pytest.raises(excepts.ParserError):
+            parsers.parse_tokens(tokens)
+
+    def test_accepts_generator(self):
+        tokens = [
+            {
+                '_id': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'type': 'section',
+                'name': 'home',
+                'indent': 0,
+                'parent': None,
+                'data': {},
+            },
+        ]
+        AST = parsers.parse_tokens(iter(tokens))
+        assert AST == parsers.parse_tokens(tokens)
+
+    def test_ast_is_not_dirty(self):
+        tokens = [
+            {
+                '_id': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'type': 'section',
+                'name': 'home',
+                'indent': 0,
+                'parent': None,
+                'data': {},
+            },
+            {
+                '_id': 'D23BC64989644012A546EAC8C6A85F55',
+                'type': 'task',
+                'name': 'task A',
+                'indent': 4,
+                'parent': 'C5ED1030425A436DABE94E0FCCCE76D6',
+                'data': {'status': 'todo', 'created': None, 'modified': None, 'finished': False},
+            },
+        ]
+        last_version = astnode.Node.last_version
+        AST = parsers.parse_tokens(tokens)
+        assert not AST.is_dirty()
+        # a version for each new node, none from changes
+        assert AST[0].version == astnode.Node.last_version == last_version + 2
+
     def parser(self, lexed_list):
         """
-        Produce a parser object, whose data is set
-        to `lexer_contents`
+        Parses `lexed_list` into a list of nodes.
 
         Args:
             lexed_list (list):
@@ -190,14 +314,7 @@ class Test_Parser:
                     ]
 
         """
-        # each lexer is a IterableUserDict,
-        # `data` is it's value.
-        lexer = mock.Mock()
-        lexer.data = lexed_list
-
-        parser = parsers.Parser(lexer)
-        parser.lexer = lexer
-        return parser.parse()
+        return parsers.parse_tokens(lexed_list)
 
 
 class Test_parse:
@@ -258,3 +375,15 @@ class Test_parse:
         AST = parsers.parse(fd, lexers.LexerTypes.mtask)
 
         assert AST[0][0].parent == AST[0]
+
+    def test_empty_file(self):
+        fd = get_iostream('[]')
+        AST = parsers.parse(fd, lexers.LexerTypes.mtask)
+        assert AST == asttree.AbstractSyntaxTree()
+
+    def test_tasklist(self):
+        fd = iostream.TextBuffer('home\n====\n\n*{*D23BC64989644012A546EAC8C6A85F55*} task A\n')
+        AST = parsers.parse(fd, lexers.LexerTypes.tasklist)
+        assert AST[0].name == 'home'
+        assert AST[0][0].name == 'task A'
+        assert AST[0][0].parent == AST[0]
@@ -7,27 +7,32 @@ import tempfile
 import json
 import datetime
 
-import mock
-
 ns = taskfiles.__name__
 
 
 current_dt = datetime.datetime(1970, 1, 1, 0, 0, 0, tzinfo=timezone.UTC())
 
 
-def get_taskfile(data):
-    """ Get a TaskFile object, with fake-read-data.
+def get_taskfile(tmpdir, data):
+    """ Get a TaskFile object, written to a temporary directory.
 
     Args:
-        data (object):
+        tmpdir (py.path.local):
+            directory to write the taskfile to
+
+        data (object, list):
             a native-python collection. it will be
-            encoded as json.
+            encoded as json. If a list of strings, they are written as lines.
     """
-    json_data = json.dumps(data)
-    taskfile = taskfiles.TaskFile('/var/tmp/fakefile.mtask')
+    filepath = str(tmpdir.join('file.mtask'))
+    if data and all([isinstance(line, str) for line in data]):
+        json_data = '\n'.join(data)
+    else:
+        json_data = json.dumps(data)
 
-    taskfile.read = mock.Mock(return_value=json_data)
-    return taskfile
+    with open(filepath, 'w') as fd:
+        fd.write(json_data)
+    return taskfiles.TaskFile(filepath)
 
 
 class Test_TaskFile:
@@ -48,7 +53,7 @@ class Test_TaskFile:
             assert taskfile_a != taskfile_b
 
     class Test_iter_tasks:
-        def test(self):
+        def test(self, tmpdir):
             filedata = [
                 {
                     "indent": 0,
@@ -73,11 +78,36 @@ class Test_TaskFile:
                     "type": "task"
                 }
             ]
-            taskfile = get_taskfile(filedata)
+            taskfile = get_taskfile(tmpdir, filedata)
             assert list(taskfile.iter_tasks()) == filedata
 
+        def test_rendered_file(self, tmpdir):
+            lines = [
+                '[',
+                '  {"_id": "F689D346A57E4D59B49CC56CB18AFB41", "type": "section", "name": "home", '
+                '"indent": 0, "parent": null, "data": {}},',
+                '  {"_id": "254AC3AB533E4C6DA63060A9CE0CA006", "type": "section", "name": "work", '
+                '"indent": 0, "parent": null, "data": {}}',
+                ']',
+                '',
+            ]
+            taskfile = get_taskfile(tmpdir, lines)
+            tasks = list(taskfile.iter_tasks())
+            assert [t['name'] for t in tasks] == ['home', 'work']
+
+        def test_stops_decoding_when_iteration_stops(self, tmpdir):
+            lines = [
+                '[',
+                '  {"_id": "F689D346A57E4D59B49CC56CB18AFB41", "type": "section", "name": "home", '
+                '"indent": 0, "parent": null, "data": {}},',
+                '  not json',
+                ']',
+            ]
+            taskfile = get_taskfile(tmpdir, lines)
+            assert next(taskfile.iter_tasks())['name'] == 'home'
+
     class Test_filter_tasks:
-        def test(self):
+        def test(self, tmpdir):
             filedata = [
                 {
                     "indent": 0,
@@ -102,7 +132,7 @@ class Test_TaskFile:
                     "type": "task"
                 }
             ]
-            taskfile = get_taskfile(filedata)
+            taskfile = get_taskfile(tmpdir, filedata)
 
             # filter
             def name_is_task_A(task):
@@ -149,12 +179,11 @@ class Test_TaskFile:
             filepath = '{}/file.mtask'.format(tempdir)
             taskfile = taskfiles.TaskFile(filepath)
             try:
-                mock_open = mock.mock_open()
-                with mock.patch(ns + '.open', mock_open, create=True):
-                    taskfile.write(self.ast_tree)
-                    written_data = mock_open().write.call_args[0][0]
-                    data = json.loads(written_data)
-                    assert data == self.mtask_tree
+                taskfile.write(self.ast_tree)
+                with open(filepath, 'r') as fd:
+                    written_data = fd.read()
+                data = json.loads(written_data)[1:]  # without stamp
+                assert data == self.mtask_tree
             finally:
                 if os.path.isdir(tempdir):
                     shutil.rmtree(tempdir)
@@ -0,0 +1,46 @@
+from taskmage2.utils import buffers
+
+
+class Test_diff_lines:
+    def test_same_lines(self):
+        assert buffers.diff_lines(['a', 'b'], ['a', 'b']) == []
+
+    def test_changed_line(self):
+        hunks = buffers.diff_lines(['a', 'b', 'c'], ['a', 'B', 'c'])
+        assert hunks == [(1, 2, 1, 2)]
+
+    def test_inserted_lines(self):
+        hunks = buffers.diff_lines(['a', 'b'], ['a', 'x', 'y', 'b'])
+        assert hunks == [(1, 1, 1, 3)]
+
+    def test_removed_lines(self):
+        hunks = buffers.diff_lines(['a', 'x', 'b', 'y', 'c'], ['a', 'b', 'c'])
+        assert hunks == [(1, 2, 1, 1), (3, 4, 2, 2)]
+
+    def test_moved_line(self):
+        old = ['a', 'b', 'c', 'd']
+        new = ['b', 'c', 'd', 'a']
+        assert buffers.diff_lines(old, new) == [(0, 1, 0, 0), (4, 4, 3, 4)]
+
+
+class Test_patch_buffer:
+    def test_patches_buffer(self):
+        buf = ['a', 'x', 'b', 'c', 'd']
+        lines = ['a', 'b', 'y', 'c', 'z', 'd', 'e']
+        buffers.patch_buffer(buf, lines)
+        assert buf == lines
+
+    def test_returns_lines_changed(self):
+        buf = ['a', 'b', 'c']
+        assert buffers.patch_buffer(buf, ['a', 'B', 'c', 'd']) == 2
+
+    def test_repeated_lines_between_unique_lines(self):
+        buf = ['a', '', '', 'b', '', 'c']
+        lines = ['a', '', 'b', '', '', 'c']
+        assert buffers.patch_buffer(buf, lines) == 2
+        assert buf == lines
+
+    def test_replaces_different_lines(self):
+        buf = ['a', 'b']
+        assert buffers.patch_buffer(buf, ['x', 'y', 'z']) == 3
+        assert buf == ['x', 'y', 'z']
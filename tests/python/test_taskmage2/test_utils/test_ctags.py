@@ -1,6 +1,7 @@
 import os
 import re
 import taskmage2
+from taskmage2.parser import iostream
 from taskmage2.utils import ctags
 
 _taskmagedir = os.path.dirname(os.path.abspath(taskmage2.__file__))
@@ -25,6 +26,17 @@ class Test_CtagsFile:
         )
         assert render == expects
 
+    def test_read_from_file_matches_read_from_text(self):
+        filepath = '{}/mixed_headers.tasklist'.format(_test_resources)
+        with open(filepath, 'r') as fd:
+            text = fd.read()
+        ctagsfile_text = ctags.CtagsFile()
+        ctagsfile_text.load_text(text, filepath)
+
+        ctagsfile = ctags.CtagsFile()
+        ctagsfile.load_file(filepath)
+        assert ctagsfile.render() == ctagsfile_text.render()
+
 
 class Test_CtagsHeaderEntry:
     class Test_match_regex:
@@ -152,6 +164,54 @@ class Test_CtagsHeaderEntry:
             matches = ctags.CtagsHeaderEntry._find_entries(text)
             assert matches == []
 
+    class Test__find_stream_entries:
+        def test_finds_match(self):
+            stream = iostream.TextBuffer(
+                '* task A\n'
+                '{*8ED87AC2D52F4734BAFCB7BDAA923DA4*}My Header\n'
+                '========='
+            )
+            matches = ctags.CtagsHeaderEntry._find_stream_entries(stream)
+            assert len(matches) == 1
+            assert matches[0].name == 'My Header'
+            assert matches[0].uuid == '8ED87AC2D52F4734BAFCB7BDAA923DA4'
+
+        def test_sets_lineno_and_start_pos(self):
+            stream = iostream.TextBuffer(
+                '* task A\n'
+                '\n'
+                'My Header\n'
+                '=========\n'
+                '* task B\n'
+                'Other Header\n'
+                '------------\n'
+            )
+            matches = ctags.CtagsHeaderEntry._find_stream_entries(stream)
+            assert [(m.lineno, m.start_pos) for m in matches] == [(3, 10), (6, 39)]
+
+        def test_no_matches_returns_empty_list(self):
+            stream = iostream.TextBuffer('')
+            matches = ctags.CtagsHeaderEntry._find_stream_entries(stream)
+            assert matches == []
+
+        def test_rejects_headers_without_underline_matching_title_length(self):
+            stream = iostream.TextBuffer(
+                'My Header\n'
+                '====='
+            )
+            matches = ctags.CtagsHeaderEntry._find_stream_entries(stream)
+            assert matches == []
+
+        def test_matches_do_not_overlap(self):
+            stream = iostream.TextBuffer(
+                'abc\n'
+                '===\n'
+                '===\n'
+            )
+            matches = ctags.CtagsHeaderEntry._find_stream_entries(stream)
+            assert len(matches) == 1
+            assert matches[0].name == 'abc'
+
     class Test__set_entries_lineno:
         def test_obtains_first_match_lineno(self):
             text = (
@@ -1,4 +1,6 @@
 from taskmage2.utils import filesystem
+import shutil
+import tempfile
 
 
 class Test_format_path(object):
@@ -33,3 +35,31 @@ class Test_walk_parents(object):
             'C:/Users',
             'C:'
         ]
+
+
+class Test_stat_key(object):
+    def test_missing_file(self):
+        assert filesystem.stat_key('/does/not/exist.mtask') is None
+
+    def test_same_key_while_unchanged(self):
+        tempdir = tempfile.mkdtemp()
+        try:
+            filepath = '{}/file.mtask'.format(tempdir)
+            with open(filepath, 'w') as fd:
+                fd.write('[]')
+            assert filesystem.stat_key(filepath) == filesystem.stat_key(filepath)
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_key_changes_when_file_modified(self):
+        tempdir = tempfile.mkdtemp()
+        try:
+            filepath = '{}/file.mtask'.format(tempdir)
+            with open(filepath, 'w') as fd:
+                fd.write('[]')
+            key = filesystem.stat_key(filepath)
+            with open(filepath, 'w') as fd:
+                fd.write('[\n]')
+            assert filesystem.stat_key(filepath) != key
+        finally:
+            shutil.rmtree(tempdir)
@@ -1,5 +1,6 @@
 import datetime
 import mock
+import pytest
 from taskmage2.utils import timezone
 
 
@@ -10,6 +11,59 @@ class Test_parse_utc_iso8610:
         expected_dt = datetime.datetime(2019, 7, 19, 7, 56, 13, 111111, tzinfo=timezone.UTC())
         assert dt == expected_dt
 
+    def test_utc_date_without_microseconds_succeeds(self):
+        dt = timezone.parse_utc_iso8601('2019-07-19T07:56:13+00:00')
+        expected_dt = datetime.datetime(2019, 7, 19, 7, 56, 13, tzinfo=timezone.UTC())
+        assert dt == expected_dt
+
+    def test_utc_date_with_short_microseconds_succeeds(self):
+        dt = timezone.parse_utc_iso8601('2019-07-19T07:56:13.1+00:00')
+        expected_dt = datetime.datetime(2019, 7, 19, 7, 56, 13, 100000, tzinfo=timezone.UTC())
+        assert dt == expected_dt
+
+    def test_result_is_utc(self):
+        dt = timezone.parse_utc_iso8601('2019-07-19T07:56:13.111111+00:00')
+        assert dt.tzinfo == timezone.UTC()
+
+    def test_non_utc_date_raises_runtimeerror(self):
+        with pytest.raises(RuntimeError):
+            timezone.parse_utc_iso8601('2019-07-19T07:56:13.111111+04:00')
+
+    def test_invalid_date_raises_valueerror(self):
+        with pytest.raises(ValueError):
+            timezone.parse_utc_iso8601('2019-07-19 07:56:13.111111+00:00')
+
+    def test_repeated_date_is_cached(self):
+        datestr = '2019-07-19T07:56:13.222222+00:00'
+        assert timezone.parse_utc_iso8601(datestr) is timezone.parse_utc_iso8601(datestr)
+
+
+class Test_format_local_isodates:
+    def test_matches_astimezone(self):
+        # dates around DST changes in north america, and europe
+        datestrs = []
+        for (month, day) in ((3, 10), (3, 31), (11, 3), (10, 27)):
+            for hour in range(24):
+                datestrs.append('2019-{:02d}-{:02d}T{:02d}:30:00.000000+00:00'.format(month, day, hour))
+
+        fmt = '%Y-%m-%d %H:%M %Z'
+        expects = []
+        for datestr in datestrs:
+            dt = timezone.parse_utc_iso8601(datestr)
+            expects.append(dt.astimezone(timezone.LocalTimezone()).strftime(fmt))
+        assert timezone.format_local_isodates(datestrs, fmt) == expects
+
+    def test_converts_to_local_time(self):
+        offset = datetime.timedelta(hours=-4)
+        with mock.patch.object(timezone.LocalTimezone, 'std_offset', offset):
+            with mock.patch.object(timezone.LocalTimezone, 'dst_offset', offset):
+                datestrs = ['2019-07-19T07:56:13.111111+00:00', '2019-07-19T02:00:00+00:00']
+                result = timezone.format_local_isodates(datestrs)
+        assert result == ['2019-07-19 03:56', '2019-07-18 22:00']
+
+    def test_no_dates(self):
+        assert timezone.format_local_isodates([]) == []
+
 
 class Test_parse_local_isodate:
     def test_succeeds(self):
@@ -39,3 +93,69 @@ class Test_timezones:
         localnow = utcnow.astimezone(timezone.LocalTimezone())
         difference = localnow - utcnow
         assert difference == datetime.timedelta(seconds=0)
+
+    def test_dst_is_checked_once_per_half_hour(self):
+        localtz = timezone.LocalTimezone()
+        dt_a = datetime.datetime(2001, 2, 3, 4, 5, 0)
+        dt_b = datetime.datetime(2001, 2, 3, 4, 25, 0)
+        with mock.patch.object(timezone.LocalTimezone, '_calc_isdst', return_value=False) as calc_isdst:
+            localtz.utcoffset(dt_a)
+            localtz.utcoffset(dt_b)
+        assert calc_isdst.call_count == 1
+
+
+class Test_LazyDatetime:
+    datestr = '2019-07-19T07:56:13.111111+00:00'
+    dt = datetime.datetime(2019, 7, 19, 7, 56, 13, 111111, tzinfo=timezone.UTC())
+
+    def test_isoformat_returns_original_string_without_parsing(self):
+        lazy_dt = timezone.LazyDatetime('2019-07-19T07:56:13.000000+00:00')
+        assert lazy_dt.isoformat() == '2019-07-19T07:56:13.000000+00:00'
+        assert lazy_dt._datetime is None
+
+    def test_non_utc_datestr_raises_runtimeerror(self):
+        with pytest.raises(RuntimeError):
+            timezone.LazyDatetime('2019-07-19T07:56:13.111111+04:00')
+
+    @pytest.mark.parametrize('datestr', [
+        '2019-07-19 07:56:13+00:00',
+        '2019-07-19T07:56+00:00',
+        'tomorrow+00:00',
+    ])
+    def test_malformed_datestr_raises_valueerror(self, datestr):
+        with pytest.raises(ValueError):
+            timezone.LazyDatetime(datestr)
+
+    def test_attributes_are_parsed(self):
+        lazy_dt = timezone.LazyDatetime(self.datestr)
+        assert lazy_dt.year == 2019
+        assert lazy_dt.microsecond == 111111
+        assert lazy_dt.datetime == self.dt
+
+    def test_equals_datetime(self):
+        lazy_dt = timezone.LazyDatetime(self.datestr)
+        assert lazy_dt == self.dt
+        assert self.dt == lazy_dt
+        assert not lazy_dt != self.dt
+
+    def test_equal_strings_are_equal_without_parsing(self):
+        lazy_dt = timezone.LazyDatetime(self.datestr)
+        assert lazy_dt == timezone.LazyDatetime(self.datestr)
+        assert lazy_dt._datetime is None
+
+    def test_does_not_equal_none(self):
+        lazy_dt = timezone.LazyDatetime(self.datestr)
+        assert lazy_dt != None  # noqa: E711
+        assert lazy_dt._datetime is None
+
+    def test_comparisons(self):
+        lazy_dt = timezone.LazyDatetime(self.datestr)
+        later_dt = self.dt + datetime.timedelta(seconds=1)
+        assert lazy_dt < later_dt
+        assert later_dt > lazy_dt
+        assert lazy_dt <= timezone.LazyDatetime(self.datestr)
+        assert later_dt - lazy_dt == datetime.timedelta(seconds=1)
+
+    def test_hash_matches_datetime(self):
+        lazy_dt = timezone.LazyDatetime(self.datestr)
+        assert hash(lazy_dt) == hash(self.dt)